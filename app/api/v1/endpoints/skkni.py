@@ -1,12 +1,33 @@
+from collections.abc import Iterator
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import get_read_db, read_session
 from app.db import crud
+from app.models.skkni import ChangesResponse, UnitLookupRequest, UnitLookupResponse
 
 router = APIRouter(prefix="/skkni", tags=["skkni"])
 
 
+def _parse_facets(facets: str | None) -> list[str]:
+    names = list(dict.fromkeys(f.strip() for f in (facets or "").split(",") if f.strip()))
+    unknown = [f for f in names if f not in crud.FACET_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"facet tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(crud.FACET_FIELDS)})",
+        )
+    return names
+
+
 @router.get("/search-documents")
 def search_documents(
     page_from: int = Query(1, ge=1),
@@ -16,24 +37,36 @@ def search_documents(
     sektor: str | None = None,
     bidang: str | None = None,
     tahun: str | None = None,
+    fuzzy: bool = False,
+    fuzzy_threshold: float = Query(crud.FUZZY_THRESHOLD, ge=0.0, le=1.0),
+    facets: str | None = Query(None, description="mis. sektor,bidang,tahun"),
     force_refresh: bool = False,  # disimpan untuk kompatibilitas; saat ini baca dari cache/DB
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Saat ini endpoint membaca dari DB (cache). force_refresh diabaikan di v1 (sinkronisasi dilakukan via worker terpisah).
+    fuzzy=true: `q` dicocokkan ke judul dokumen secara toleran typo (index trigram), item diberi `score`.
+    facets=sektor,bidang,...: sertakan jumlah per nilai facet atas hasil terfilter (`facets` di response).
     """
+    facet_names = _parse_facets(facets)
     try:
-        total, items = crud.get_documents(
+        total, items, facet_counts = crud.get_documents_with_facets(
             db=db,
             limit=limit,
             q=q,
             sektor=sektor,
             bidang=bidang,
             tahun=tahun,
+            fuzzy=fuzzy,
+            threshold=fuzzy_threshold,
+            facets=facet_names,
         )
-        return {"source": "cache", "count": total, "items": items}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"search-documents failed: {type(e).__name__}") from e
+    resp = {"source": "cache", "count": total, "items": items}
+    if facet_names:
+        resp["facets"] = facet_counts
+    return resp
 
 
 @router.get("/search-units")
@@ -46,14 +79,42 @@ def search_units(
     bidang: str | None = None,
     tahun: str | None = None,
     doc_uuid: str | None = None,
+    fuzzy: bool = False,
+    fuzzy_threshold: float = Query(crud.FUZZY_THRESHOLD, ge=0.0, le=1.0),
+    facets: str | None = Query(None, description="mis. sektor,bidang,tahun"),
+    include_merged: bool = False,
+    sub_bidang: str | None = None,  # hanya untuk include_merged
     force_refresh: bool = False,  # diabaikan, sinkronisasi via worker
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Baca units dari DB (hasil sinkronisasi worker). Jika tidak ada filter, tetap kembalikan data terbatas oleh 'limit'.
+    fuzzy=true: `q` dicocokkan ke judul_unit secara toleran typo (index trigram), item diberi `score`.
+    facets=sektor,bidang,...: sertakan jumlah per nilai facet atas hasil terfilter (`facets` di response).
+    include_merged=true: taxonomy kosong dilengkapi dari dokumen induk (join SQL via join key);
+    filter sektor/bidang/sub_bidang/tahun lalu berupa substring case-insensitive atas nilai hasil merge.
     """
+    facet_names = _parse_facets(facets)
+    if include_merged:
+        if fuzzy or facet_names:
+            raise HTTPException(status_code=422, detail="include_merged belum bisa dikombinasikan dengan fuzzy/facets")
+        try:
+            total, items = crud.get_units_merged(
+                db=db,
+                limit=limit,
+                q=q,
+                sektor=sektor,
+                bidang=bidang,
+                sub_bidang=sub_bidang,
+                tahun=tahun,
+                doc_uuid=doc_uuid,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"search-units failed: {type(e).__name__}") from e
+        return {"source": "cache", "count": total, "items": items}
+
     try:
-        total, items = crud.get_units(
+        total, items, facet_counts = crud.get_units_with_facets(
             db=db,
             limit=limit,
             q=q,
@@ -61,15 +122,43 @@ def search_units(
             bidang=bidang,
             tahun=tahun,
             doc_uuid=doc_uuid,
+            fuzzy=fuzzy,
+            threshold=fuzzy_threshold,
+            facets=facet_names,
         )
-        return {"source": "cache", "count": total, "items": items}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"search-units failed: {type(e).__name__}") from e
+    resp = {"source": "cache", "count": total, "items": items}
+    if facet_names:
+        resp["facets"] = facet_counts
+    return resp
+
+
+@router.post("/units/lookup", response_model=UnitLookupResponse)
+def lookup_units(
+    body: UnitLookupRequest,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Resolve banyak unit sekaligus berdasarkan `kode_unit` dan/atau `unit_xml_id` (ID make_unit_id).
+    Key yang tidak ditemukan dilaporkan eksplisit di `missing`.
+    """
+    try:
+        items, missing_kode, missing_ids = crud.lookup_units(
+            db, kode_units=body.kode_unit, unit_xml_ids=body.unit_xml_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"units lookup failed: {type(e).__name__}") from e
+    return {
+        "count": len(items),
+        "items": items,
+        "missing": {"kode_unit": missing_kode, "unit_xml_id": missing_ids},
+    }
 
 
 @router.get("/sectors")
 def list_sectors(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     try:
         rows = crud.get_distinct_sectors(db)
@@ -80,7 +169,7 @@ def list_sectors(
 
 @router.get("/bidang")
 def list_bidang(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     try:
         rows = crud.get_distinct_bidang(db)
@@ -91,10 +180,158 @@ def list_bidang(
 
 @router.get("/sub-bidang")
 def list_sub_bidang(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     try:
         rows = crud.get_distinct_sub_bidang(db)
         return {"count": len(rows), "items": [{"name": name, "count": cnt} for name, cnt in rows]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"sub-bidang failed: {type(e).__name__}") from e
+
+
+# --------------------------
+# Export (streaming)
+# --------------------------
+
+
+def _ndjson_lines(rows: Iterator[dict]) -> Iterator[str]:
+    for r in rows:
+        yield json.dumps(r, ensure_ascii=False) + "\n"
+
+
+def _csv_lines(rows: Iterator[dict], fields: tuple[str, ...]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for r in rows:
+        writer.writerow(r)
+        # kirim per ~64KB supaya tidak satu baris satu chunk HTTP
+        if buf.tell() >= 65536:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+    if buf.tell():
+        yield buf.getvalue()
+
+
+@router.get("/export")
+def export_catalogue(
+    entity: Literal["documents", "units"] = "units",
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    tahun: str | None = None,
+    doc_uuid: str | None = None,  # hanya berlaku untuk entity=units
+    cursor: str | None = Query(None, description="Resume setelah key ini (uuid dokumen / id unit terakhir)"),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Stream seluruh katalog dokumen/units (opsional terfilter) sebagai NDJSON atau CSV.
+    Dibaca per chunk dengan keyset pagination → memori konstan berapapun ukuran tabel.
+    Untuk resume, kirim `cursor` = `uuid` (documents) atau `id` (units) dari baris terakhir yang diterima.
+    """
+    unit_after: int | None = None
+    if entity == "units" and cursor is not None:
+        try:
+            unit_after = int(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail="cursor untuk units harus berupa id integer") from e
+
+    filters = {"q": q, "sektor": sektor, "bidang": bidang, "tahun": tahun}
+    fields = crud.UNIT_FIELDS if entity == "units" else crud.DOCUMENT_FIELDS
+
+    def rows() -> Iterator[dict]:
+        # Session sendiri: dependency get_read_db bisa sudah ditutup sebelum body selesai di-stream.
+        with read_session() as db:
+            if entity == "units":
+                yield from crud.iter_units(db, doc_uuid=doc_uuid, after=unit_after, chunk_size=chunk_size, **filters)
+            else:
+                yield from crud.iter_documents(db, after=cursor, chunk_size=chunk_size, **filters)
+
+    if fmt == "csv":
+        body, media_type = _csv_lines(rows(), fields), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _ndjson_lines(rows()), "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="skkni_{entity}.{fmt}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+# --------------------------
+# Change feed (replikasi inkremental)
+# --------------------------
+
+
+@router.get("/changes", response_model=ChangesResponse)
+def list_changes(
+    since: int = Query(0, ge=0, description="seq terakhir yang sudah diterapkan replika"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Perubahan documents/units dengan seq > since, urut seq.
+    Ulangi dengan since=next_since selama has_more=true; simpan next_since sebagai cursor replika.
+    """
+    try:
+        items = crud.get_changes(db, since=since, limit=limit + 1)
+        latest = crud.get_latest_change_seq(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"changes failed: {type(e).__name__}") from e
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        "since": since,
+        "next_since": items[-1]["seq"] if items else since,
+        "has_more": has_more,
+        "latest_seq": latest,
+        "items": items,
+    }
+
+
+@router.get("/changes/stream")
+def stream_changes(
+    since: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, description="batas jumlah baris; kosong = sampai habis"),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+):
+    """Stream perubahan seq > since sebagai NDJSON (urut seq); resume dengan since = seq baris terakhir."""
+
+    def rows() -> Iterator[dict]:
+        with read_session() as db:
+            yield from crud.iter_changes(db, since=since, limit=limit, chunk_size=chunk_size)
+
+    return StreamingResponse(_ndjson_lines(rows()), media_type="application/x-ndjson")
+
+
+# --------------------------
+# Snapshot kolumnar (dibangun oleh: python -m app.services.snapshot)
+# --------------------------
+
+
+@router.get("/snapshots/latest")
+def latest_snapshot():
+    from app.services import snapshot  # lazy: modul builder tidak ikut dimuat saat start API
+
+    manifest = snapshot.read_manifest()
+    if not manifest:
+        raise HTTPException(status_code=404, detail="snapshot belum tersedia")
+    return manifest
+
+
+@router.get("/snapshots/latest/{entity}")
+def download_snapshot(entity: Literal["documents", "units"]):
+    from app.services import snapshot
+
+    manifest = snapshot.read_manifest()
+    if not manifest:
+        raise HTTPException(status_code=404, detail="snapshot belum tersedia")
+    info = manifest["files"][entity]
+    path = Path(settings.SNAPSHOT_DIR) / manifest["dir"] / info["file"]
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="file snapshot tidak ditemukan")
+    media_type = (
+        "application/vnd.apache.parquet" if manifest["format"] == "parquet" else "application/vnd.apache.arrow.file"
+    )
+    return FileResponse(
+        path, media_type=media_type, filename=f"skkni_{entity}_gen{manifest['generation']}.{manifest['format']}"
+    )
@@ -0,0 +1,73 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.db import crud
+from app.models.skkni import SyncRunDetailResponse, SyncRunItemsResponse, SyncRunsResponse
+
+# Read-only: ledger ditulis oleh worker (python -m app.worker)
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/runs", response_model=SyncRunsResponse)
+def list_sync_runs(
+    limit: int = Query(20, ge=1, le=500),
+    status: Literal["running", "ok", "failed"] | None = None,
+    db: Session = Depends(get_db),
+):
+    """Run worker terbaru dulu: waktu, total, throughput & durasi upsert."""
+    items = crud.get_sync_runs(db, limit=limit, status=status)
+    return {"count": len(items), "items": items}
+
+
+def _resolve_run_id(db: Session, run_id: str) -> int:
+    # "latest" = run terakhir; selain itu harus id numerik
+    if run_id == "latest":
+        latest = crud.get_latest_sync_run_id(db)
+        if latest is None:
+            raise HTTPException(status_code=404, detail="belum ada run sinkronisasi")
+        return latest
+    if not run_id.isdigit():
+        raise HTTPException(status_code=422, detail="run_id harus angka atau 'latest'")
+    return int(run_id)
+
+
+@router.get("/runs/{run_id}", response_model=SyncRunDetailResponse)
+def get_sync_run(
+    run_id: str,
+    top: int = Query(10, ge=1, le=500, description="jumlah UUID paling lambat / gagal yang ditampilkan"),
+    db: Session = Depends(get_db),
+):
+    """Ringkasan satu run (`latest` = terakhir) beserta UUID paling lambat dan yang gagal."""
+    rid = _resolve_run_id(db, run_id)
+    run = crud.get_sync_run(db, rid)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"run {rid} tidak ditemukan")
+    return {
+        "run": run,
+        "slowest": crud.get_sync_run_items(db, rid, status="ok", order="slowest", limit=top),
+        "failed": crud.get_sync_run_items(db, rid, status="error", order="uuid", limit=top),
+    }
+
+
+@router.get("/runs/{run_id}/items", response_model=SyncRunItemsResponse)
+def list_sync_run_items(
+    run_id: str,
+    status: Literal["ok", "error"] | None = None,
+    order: Literal["slowest", "uuid"] = "slowest",
+    limit: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    """Baris per UUID satu run, bisa difilter status dan diurutkan dari yang paling lambat."""
+    rid = _resolve_run_id(db, run_id)
+    items = crud.get_sync_run_items(db, rid, status=status, order=order, limit=limit)
+    return {"count": len(items), "items": items}
+
+
+@router.get("/documents/{uuid}", response_model=SyncRunItemsResponse)
+def get_uuid_history(uuid: str, limit: int = Query(20, ge=1, le=500), db: Session = Depends(get_db)):
+    """Riwayat satu UUID lintas run (latensi, byte, error), untuk melacak dokumen bermasalah."""
+    items = crud.get_uuid_sync_history(db, uuid, limit=limit)
+    return {"count": len(items), "items": items}
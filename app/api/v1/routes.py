@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from app.api.v1.endpoints.skkni import router as skkni_router
+from app.api.v1.endpoints.sync import router as sync_router
 
 api_router = APIRouter()
 api_router.include_router(skkni_router)
+api_router.include_router(sync_router)
@@ -11,6 +11,8 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     BASE_URL: str = "https://skkni-api.kemnaker.go.id"
+    # Basis API publik dokumen (dipakai scraper untuk unduh_url & enrich)
+    API_BASE: str = "https://skkni-api.kemnaker.go.id"
     DATABASE_URL: str = "sqlite:////data/skkni_cache.db"
 
     # Simpan sebagai STRING agar tidak diparse JSON oleh pydantic-settings.
@@ -24,6 +26,47 @@ class Settings(BaseSettings):
     CACHE_TTL_DAYS: int = 30
     HEADLESS: bool = True
     MAX_CONCURRENCY: int = 2
+    # HTTP/2 untuk client repository (butuh paket h2; otomatis fallback ke HTTP/1.1)
+    HTTP2: bool = True
+
+    # Hedged request: kirim duplikat GET bila attempt pertama melewati persentil latensi ini
+    HEDGE_ENABLED: bool = True
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_MIN_DELAY: float = 0.5
+    HEDGE_MIN_SAMPLES: int = 20
+
+    # Circuit breaker upstream: open bila rasio gagal >= rate dari minimal N panggilan terakhir
+    BREAKER_FAILURE_RATE: float = 0.5
+    BREAKER_MIN_CALLS: int = 10
+    BREAKER_WINDOW: int = 50
+    BREAKER_OPEN_SECONDS: float = 30.0
+
+    # Pool browser Playwright: jumlah context/page paralel & recycle setelah N pemakaian
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_MAX_USES: int = 50
+    # Abort request non-esensial (gambar/font/CSS/media/analytics) saat render
+    BROWSER_BLOCK_RESOURCES: bool = True
+
+    # Profiling SQL (hook engine): statistik per statement & log query lambat beserta EXPLAIN.
+    # Mati secara default: EXPLAIN berjalan di jalur request; nyalakan saat investigasi performa.
+    SQL_PROFILING: bool = False
+    SLOW_QUERY_MS: float = 200.0
+    # Endpoint /debug/* hanya aktif bila diset; kirim lewat header X-API-Key
+    DEBUG_API_KEY: str = ""
+
+    # Metrik worker: file .prom untuk textfile collector node_exporter dan/atau URL Pushgateway
+    METRICS_TEXTFILE: str = ""
+    PUSHGATEWAY_URL: str = ""
+
+    # Snapshot kolumnar (Parquet/Arrow) untuk analitik
+    SNAPSHOT_DIR: str = "/data/snapshots"
+
+    # Read snapshot: salinan SQLite read-only (VACUUM + ANALYZE) yang diterbitkan worker tiap generasi baru.
+    # Kosong = endpoint katalog membaca DB utama langsung.
+    READ_DB_DIR: str = ""
+    READ_DB_CHECK_SECONDS: float = 1.0
+    READ_DB_MMAP_BYTES: int = 256 * 1024 * 1024
+    READ_DB_KEEP: int = 2
 
     # ---- helper ----
     def allowed_origins_list(self) -> list[str]:
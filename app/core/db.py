@@ -3,12 +3,26 @@ from __future__ import annotations
 
 from collections.abc import Generator
 from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+import hashlib
+import json
+import logging
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
-from app.db import models
+from app.db import crud, models
 
 
 def _build_engine():
@@ -20,6 +34,11 @@ def _build_engine():
     return create_engine(url, echo=False, future=True, connect_args=connect_args)
 
 
+logger = logging.getLogger("app.sql")
+
+# Re-export untuk skrip/test (create_all/drop_all)
+Base = models.Base
+
 engine = _build_engine()
 
 # Session factory
@@ -32,9 +51,74 @@ SessionLocal = sessionmaker(
 )
 
 
-def init_db() -> None:
-    """Pastikan semua tabel ada."""
+def _ensure_columns() -> list[str]:
+    """
+    Migrasi ringan: create_all tidak mengubah tabel yang sudah ada, jadi kolom/index baru
+    di models ditambahkan lewat ALTER TABLE ADD COLUMN. Return daftar "tabel.kolom" yang ditambahkan.
+    """
+    insp = inspect(engine)
+    added: list[str] = []
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                ddl_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {ddl_type}"))
+                added.append(f"{table.name}.{col.name}")
+    for table in models.Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(bind=engine, checkfirst=True)
+    return added
+
+
+@lru_cache(maxsize=1)
+def schema_fingerprint() -> str:
+    """Hash struktur models (tabel, kolom + tipe, index); berubah setiap kali skema di kode berubah."""
+    parts = []
+    for table in sorted(models.Base.metadata.sorted_tables, key=lambda t: t.name):
+        cols = ",".join(f"{c.name}:{c.type.compile(dialect=engine.dialect)}" for c in table.columns)
+        idx = ",".join(sorted(i.name or "" for i in table.indexes))
+        parts.append(f"{table.name}({cols})[{idx}]")
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _stored_fingerprint() -> str | None:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                select(models.SchemaVersion.fingerprint).where(models.SchemaVersion.id == 1)
+            ).scalar_one_or_none()
+    except SQLAlchemyError:  # tabel belum ada (DB baru / skema lama)
+        return None
+
+
+def _store_fingerprint(fingerprint: str) -> None:
+    with SessionLocal() as db:
+        db.merge(models.SchemaVersion(id=1, fingerprint=fingerprint, applied_at=datetime.utcnow()))
+        db.commit()
+
+
+def init_db(force: bool = False) -> bool:
+    """
+    Pastikan semua tabel, kolom & index ada; isi kolom turunan yang masih kosong.
+
+    Bila fingerprint skema yang tersimpan di DB sama dengan models, semua itu dilewati (satu
+    SELECT saja), jadi start replika API / job worker tidak mengulang inspeksi skema.
+    Return True bila migrasi dijalankan.
+    """
+    fingerprint = schema_fingerprint()
+    if not force and _stored_fingerprint() == fingerprint:
+        return False
     models.Base.metadata.create_all(bind=engine)
+    added = _ensure_columns()
+    if added:
+        logger.info("[db] kolom ditambahkan: %s", ", ".join(added))
+    with SessionLocal() as db:
+        crud.backfill_derived_columns(db)
+    _store_fingerprint(fingerprint)
+    return True
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -54,3 +138,315 @@ def get_session() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# --------------------------
+# Read snapshot: file SQLite read-only per generasi (dibangun worker, lihat app.services.read_db)
+# --------------------------
+
+READ_MANIFEST_NAME = "latest.json"
+
+
+def _build_read_engine(path: Path) -> Engine:
+    # immutable=1: file tidak pernah diubah setelah terbit -> tanpa lock & tanpa cek journal/WAL
+    url = f"sqlite:///file:{path}?mode=ro&immutable=1&uri=true"
+    eng = create_engine(url, echo=False, future=True, connect_args={"check_same_thread": False})
+
+    @event.listens_for(eng, "connect")
+    def _read_pragmas(dbapi_conn, connection_record):
+        cur = dbapi_conn.cursor()
+        cur.execute(f"PRAGMA mmap_size={int(settings.READ_DB_MMAP_BYTES)}")
+        cur.execute("PRAGMA query_only=1")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.close()
+
+    from app.core.metrics import instrument_engine
+
+    instrument_engine(eng)
+    if settings.SQL_PROFILING:
+        install_profiling(eng)
+    return eng
+
+
+class ReadReplica:
+    """
+    Engine ke read snapshot terbaru di READ_DB_DIR.
+
+    Manifest dicek (stat) paling sering tiap READ_DB_CHECK_SECONDS; saat generasi baru terbit,
+    engine baru dibuat dan session berikutnya memakainya. Session lama tetap selesai di file
+    generasi sebelumnya (inode tetap hidup walau file sudah di-prune), jadi tanpa downtime.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._engine: Engine | None = None
+        self._sessionmaker: sessionmaker | None = None
+        self._manifest_key: tuple[str, int] | None = None
+        self._checked_at = float("-inf")
+        self.generation: int | None = None
+        self.path: str | None = None
+        self.switches = 0
+
+    def _refresh(self) -> bool:
+        """Cek manifest (dibatasi READ_DB_CHECK_SECONDS); True bila engine baru saja diganti."""
+        now = time.monotonic()
+        if now - self._checked_at < settings.READ_DB_CHECK_SECONDS:
+            return False
+        with self._lock:
+            if now - self._checked_at < settings.READ_DB_CHECK_SECONDS:
+                return False
+            self._checked_at = now
+            manifest_path = Path(settings.READ_DB_DIR) / READ_MANIFEST_NAME
+            try:
+                key = (str(manifest_path), manifest_path.stat().st_mtime_ns)
+            except FileNotFoundError:
+                return False
+            if key == self._manifest_key:
+                return False
+            self._manifest_key = key
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            path = manifest_path.parent / manifest["file"]
+            if not path.exists():
+                logger.warning("[read-db] file snapshot tidak ditemukan: %s", path)
+                return False
+            self._switch(path, int(manifest["generation"]))
+            return True
+
+    def _switch(self, path: Path, generation: int) -> None:
+        old = self._engine
+        self._engine = _build_read_engine(path)
+        self._sessionmaker = sessionmaker(bind=self._engine, autoflush=False, class_=Session, future=True)
+        self.path, self.generation = str(path), generation
+        self.switches += 1
+        logger.info("[read-db] pindah ke generation %s (%s)", generation, path)
+        if old is not None:
+            # koneksi idle ditutup sekarang; yang masih dipakai ditutup saat request-nya selesai
+            old.dispose()
+
+    def session(self) -> Session | None:
+        """Session ke snapshot terbaru; None bila read snapshot tidak aktif / belum pernah terbit."""
+        if not settings.READ_DB_DIR:
+            return None
+        from app.core.metrics import record_cache
+
+        reloaded = self._refresh()
+        maker = self._sessionmaker
+        if maker is None:
+            return None
+        # hit: engine generasi yang sama dipakai ulang; miss: generasi baru, engine dibangun ulang
+        record_cache("read_replica", hit=not reloaded)
+        return maker()
+
+    def state(self) -> dict[str, Any]:
+        if settings.READ_DB_DIR:
+            self._refresh()
+        return {
+            "enabled": bool(settings.READ_DB_DIR),
+            "generation": self.generation,
+            "path": self.path,
+            "switches": self.switches,
+        }
+
+    def reset(self) -> None:
+        """Lepas engine & lupakan manifest (test / ganti READ_DB_DIR)."""
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+            self._engine = self._sessionmaker = None
+            self._manifest_key, self._checked_at = None, float("-inf")
+            self.generation = self.path = None
+
+
+read_replica = ReadReplica()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Dependency FastAPI untuk endpoint baca: read snapshot terbaru, fallback ke DB utama."""
+    db = read_replica.session() or SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def read_session() -> Generator[Session, None, None]:
+    """Seperti get_read_db, untuk body yang di-stream (session dibuka di dalam generator)."""
+    db = read_replica.session() or SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# --------------------------
+# Profiling SQL: waktu per statement, statistik per fingerprint, slow-query log + EXPLAIN
+# --------------------------
+
+
+@dataclass
+class RequestQueries:
+    """Akumulator query satu request HTTP (lihat QueryStatsMiddleware)."""
+
+    count: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class StatementStats:
+    fingerprint: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+_request_queries: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+_stmt_stats: dict[str, StatementStats] = {}
+_stats_lock = threading.Lock()
+
+_FP_WS = re.compile(r"\s+")
+_FP_STRING = re.compile(r"'(?:[^']|'')*'")
+_FP_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_FP_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_FP_VALUES = re.compile(r"(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalisasi SQL: literal -> ?, daftar IN (?, ?, ...) -> (?...), supaya query sejenis tergabung."""
+    s = _FP_WS.sub(" ", statement).strip()
+    s = _FP_STRING.sub("?", s)
+    s = _FP_NUMBER.sub("?", s)
+    s = _FP_IN_LIST.sub("(?...)", s)
+    return _FP_VALUES.sub(r"\1, ...", s)
+
+
+def _explain(conn: Any, statement: str, parameters: Any) -> str:
+    # cursor DBAPI mentah: tidak memicu event engine lagi (tidak rekursif)
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cur = conn.connection.dbapi_connection.cursor()
+    try:
+        cur.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(c) for c in row) for row in cur.fetchall())
+    finally:
+        cur.close()
+
+
+def _log_slow(conn: Any, statement: str, parameters: Any, elapsed: float, executemany: bool) -> None:
+    plan = ""
+    if not executemany and statement.lstrip()[:6].upper().startswith(_EXPLAINABLE):
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:  # EXPLAIN gagal tidak boleh mengganggu query aslinya
+            plan = f"(EXPLAIN gagal: {type(e).__name__})"
+    logger.warning(
+        "[sql] slow query %.1f ms: %s | params=%.300r%s",
+        elapsed * 1000,
+        _FP_WS.sub(" ", statement).strip(),
+        parameters,
+        f"\n  plan:\n  {plan.replace(chr(10), chr(10) + '  ')}" if plan else "",
+    )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_prof_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_prof_t0")
+    if not stack:
+        return
+    elapsed = time.perf_counter() - stack.pop()
+
+    rq = _request_queries.get()
+    if rq is not None:
+        rq.count += 1
+        rq.seconds += elapsed
+
+    fp = fingerprint(statement)
+    with _stats_lock:
+        st = _stmt_stats.get(fp)
+        if st is None:
+            st = _stmt_stats[fp] = StatementStats(fp)
+        st.count += 1
+        st.total += elapsed
+        st.max = max(st.max, elapsed)
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        _log_slow(conn, statement, parameters, elapsed, executemany)
+
+
+def install_profiling(target: Engine) -> None:
+    """Pasang hook profiling ke engine (idempoten)."""
+    if event.contains(target, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def get_statement_stats(limit: int = 20, sort: str = "total") -> list[dict[str, Any]]:
+    """Statistik per fingerprint, diurutkan `total` (waktu kumulatif), `count`, `max` atau `avg`."""
+    keys = {
+        "total": lambda s: s.total,
+        "count": lambda s: s.count,
+        "max": lambda s: s.max,
+        "avg": lambda s: s.total / s.count if s.count else 0.0,
+    }
+    with _stats_lock:
+        rows = sorted(_stmt_stats.values(), key=keys.get(sort, keys["total"]), reverse=True)[:limit]
+        return [r.as_dict() for r in rows]
+
+
+def reset_statement_stats() -> None:
+    with _stats_lock:
+        _stmt_stats.clear()
+
+
+@contextmanager
+def track_queries() -> Generator[RequestQueries, None, None]:
+    """Hitung query & waktu DB di dalam blok (dipakai middleware; juga berguna di test/skrip)."""
+    acc = RequestQueries()
+    token = _request_queries.set(acc)
+    try:
+        yield acc
+    finally:
+        _request_queries.reset(token)
+
+
+class QueryStatsMiddleware:
+    """Middleware ASGI: header X-DB-Queries & X-DB-Time (ms) per request.
+    Untuk response streaming, angka mencakup query sebelum header dikirim."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as acc:
+
+            async def _send(message: dict) -> None:
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(acc.count).encode()))
+                    headers.append((b"x-db-time", f"{acc.seconds * 1000:.2f}".encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, _send)
+
+
+if settings.SQL_PROFILING:
+    install_profiling(engine)
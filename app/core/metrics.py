@@ -0,0 +1,191 @@
+# app/core/metrics.py
+"""
+Metrik Prometheus untuk API (GET /metrics) dan worker sinkronisasi.
+
+API memakai registry default: latensi request per route & status, request in-flight,
+durasi query DB (event engine SQLAlchemy) dan rasio hit cache engine read snapshot (engine
+dipakai ulang vs dibangun ulang karena generasi baru). Worker memakai registry sendiri
+(WorkerMetrics) yang ditulis ke textfile collector node_exporter dan/atau di-push ke
+Pushgateway di akhir run; termasuk hit/miss snapshot yang sudah terbit untuk generasi ini.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    push_to_gateway,
+    write_to_textfile,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Bucket latensi (detik): API lokal cepat, upstream Kemnaker bisa sampai timeout 20s
+_HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+_UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0)
+
+HTTP_REQUESTS = Counter("skkni_http_requests_total", "Request HTTP API", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "skkni_http_request_duration_seconds",
+    "Latensi request HTTP API (sampai body terakhir terkirim)",
+    ["method", "route", "status"],
+    buckets=_HTTP_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("skkni_http_requests_in_flight", "Request HTTP yang sedang diproses")
+DB_QUERY_LATENCY = Histogram(
+    "skkni_db_query_duration_seconds", "Durasi statement SQL", ["operation"], buckets=_DB_BUCKETS
+)
+CACHE_REQUESTS = Counter("skkni_cache_requests_total", "Lookup cache di proses API", ["cache", "result"])
+
+# Route yang tidak diukur (scrape Prometheus sendiri)
+_SKIP_PATHS = frozenset({"/metrics"})
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Catat satu lookup cache; rasio hit = rate(result="hit") / rate(total)."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip().split(None, 1)
+    op = head[0].upper() if head else ""
+    return op if op in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Pasang event hook ke engine untuk histogram durasi query (idempoten)."""
+    if getattr(engine, "_skkni_metrics", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_metrics_t0")
+        if stack:
+            DB_QUERY_LATENCY.labels(operation=_operation(statement)).observe(time.perf_counter() - stack.pop())
+
+    engine._skkni_metrics = True  # type: ignore[attr-defined]
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: hitung request per route template (bukan path mentah, supaya kardinalitas
+    label tetap kecil) & status, durasi sampai body selesai di-stream, dan request in-flight.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        t0 = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+        async def _send(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            labels = {
+                "method": scope.get("method", ""),
+                "route": getattr(route, "path", None) or "__unmatched__",
+                "status": str(status),
+            }
+            HTTP_REQUESTS.labels(**labels).inc()
+            HTTP_LATENCY.labels(**labels).observe(time.perf_counter() - t0)
+
+
+class WorkerMetrics:
+    """Metrik satu run worker (registry terpisah), dipublikasikan lewat publish()."""
+
+    def __init__(self) -> None:
+        self.registry = CollectorRegistry()
+        r = self.registry
+        self.upstream_latency = Histogram(
+            "skkni_worker_upstream_request_duration_seconds",
+            "Latensi request ke API Kemnaker",
+            ["endpoint"],
+            buckets=_UPSTREAM_BUCKETS,
+            registry=r,
+        )
+        self.upstream_errors = Counter(
+            "skkni_worker_upstream_errors_total", "Request upstream gagal", ["error"], registry=r
+        )
+        self.upstream_retries = Counter(
+            "skkni_worker_upstream_retries_total", "Request duplikat (hedge) ke upstream", registry=r
+        )
+        self.documents = Counter("skkni_worker_documents_total", "Dokumen yang berhasil diambil", registry=r)
+        self.units = Counter("skkni_worker_units_total", "Unit yang berhasil diambil", registry=r)
+        self.documents_rate = Gauge("skkni_worker_documents_per_second", "Throughput dokumen run terakhir", registry=r)
+        self.units_rate = Gauge("skkni_worker_units_per_second", "Throughput unit run terakhir", registry=r)
+        self.upsert_seconds = Gauge(
+            "skkni_worker_upsert_duration_seconds", "Durasi batch upsert run terakhir", ["entity"], registry=r
+        )
+        self.cache_requests = Counter(
+            "skkni_worker_cache_requests_total",
+            "Snapshot (read_db/snapshot) yang dipakai ulang (hit) vs dibangun (miss)",
+            ["cache", "result"],
+            registry=r,
+        )
+        self.run_seconds = Gauge("skkni_worker_run_duration_seconds", "Durasi run terakhir", registry=r)
+        self.last_success = Gauge(
+            "skkni_worker_last_success_timestamp_seconds", "Waktu run terakhir selesai", registry=r
+        )
+        self._t0 = time.perf_counter()
+
+    def finish(self, documents: int, units: int) -> dict[str, float]:
+        """Set gauge akhir run; return nilai throughput (dipakai juga untuk ledger run)."""
+        elapsed = max(time.perf_counter() - self._t0, 1e-9)
+        rates = {"documents_per_second": documents / elapsed, "units_per_second": units / elapsed}
+        self.run_seconds.set(elapsed)
+        self.documents_rate.set(rates["documents_per_second"])
+        self.units_rate.set(rates["units_per_second"])
+        self.last_success.set_to_current_time()
+        return rates
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        self.cache_requests.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+    def publish(self) -> list[str]:
+        """
+        Tulis ke METRICS_TEXTFILE (textfile collector) dan/atau push ke PUSHGATEWAY_URL.
+        Return tujuan yang berhasil ditulis.
+        """
+        targets: list[str] = []
+        if settings.METRICS_TEXTFILE:
+            os.makedirs(os.path.dirname(settings.METRICS_TEXTFILE) or ".", exist_ok=True)
+            write_to_textfile(settings.METRICS_TEXTFILE, self.registry)  # atomic (tmp + rename)
+            targets.append(settings.METRICS_TEXTFILE)
+        if settings.PUSHGATEWAY_URL:
+            push_to_gateway(settings.PUSHGATEWAY_URL, job="skkni_worker", registry=self.registry)
+            targets.append(settings.PUSHGATEWAY_URL)
+        return targets
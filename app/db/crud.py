@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+import hashlib
+import json
+from typing import Any
 
-from sqlalchemy import and_, func, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, Subquery, and_, delete, exists, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, aliased
 
 from app.db import models
+from app.utils.parsing import build_join_key_nomor, make_unit_id, pdf_doc_key, trigrams
 
 # TTL cache hanya dipakai untuk logika lama (kalau masih ada)
 CACHE_TTL_DAYS = 30
 
+# Batas parameter per statement IN (SQLite lama: 999 variabel)
+LOOKUP_CHUNK = 500
+
 
 def is_expired(ts: datetime | None) -> bool:
     return (not ts) or ((datetime.utcnow() - ts) > timedelta(days=CACHE_TTL_DAYS))
@@ -42,21 +51,157 @@ def _coerce_dt(val) -> datetime | None:
     return None
 
 
+# --------------------------
+# Join key (merge unit ↔ dokumen)
+# --------------------------
+
+
+def _document_join_keys(uuid: str, unduh_url: str | None, nomor_skkni: str | None) -> dict[str, str | None]:
+    # pdf_key selalu terisi (fallback uuid) → sekaligus penanda baris sudah di-backfill
+    return {
+        "pdf_key": pdf_doc_key(unduh_url or "") or uuid.lower(),
+        "nomor_key": build_join_key_nomor(nomor_skkni or "") or None,
+    }
+
+
+def _unit_join_keys(doc_uuid: str, unduh_url: str | None, nomor_skkni: str | None) -> dict[str, str | None]:
+    return {
+        "pdf_key": (pdf_doc_key(unduh_url) if unduh_url else "") or doc_uuid.lower(),
+        "nomor_key": build_join_key_nomor(nomor_skkni or "") or None,
+    }
+
+
+# --------------------------
+# Row hash (sync berbasis diff)
+# --------------------------
+
+DOCUMENT_HASH_FIELDS = (
+    "judul_skkni",
+    "nomor_skkni",
+    "sektor",
+    "bidang",
+    "sub_bidang",
+    "tahun",
+    "nomor_kepmen",
+    "unduh_url",
+    "listing_url",
+)
+UNIT_HASH_FIELDS = ("judul_unit", "sektor", "bidang", "sub_bidang", "nomor_skkni", "tahun", "unduh_url")
+
+
+def _row_hash(row: dict, fields: Sequence[str]) -> str:
+    """Hash isi baris (tanpa updated_at) untuk mendeteksi perubahan."""
+    h = hashlib.blake2b(digest_size=16)
+    for f in fields:
+        v = row.get(f)
+        h.update(b"\x00" if v is None else str(v).encode())
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+# --------------------------
+# Fuzzy search (index trigram)
+# --------------------------
+
+FUZZY_THRESHOLD = 0.3
+
+TrigramModel = type[models.DocumentTrigram] | type[models.UnitTrigram]
+
+
+def _index_trigrams(db: Session, model: TrigramModel, key_col: Any, titles: dict[Any, str]) -> None:
+    """Tulis ulang baris trigram untuk key yang judulnya baru/berubah."""
+    keys = list(titles)
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        db.execute(delete(model).where(key_col.in_(keys[i : i + LOOKUP_CHUNK])))
+    rows: list[dict] = []
+    for key, title in titles.items():
+        grams = trigrams(title)
+        rows.extend({key_col.key: key, "trigram": g, "total": len(grams)} for g in grams)
+    if rows:
+        db.execute(insert(model), rows)
+
+
+def _fuzzy_candidates(model: TrigramModel, key_col: Any, q: str, threshold: float) -> Subquery | None:
+    """
+    Subquery (key, score): key dengan similarity trigram (Jaccard, seperti pg_trgm) >= threshold,
+    dihitung lewat index (trigram, key) tanpa scan seluruh tabel utama. Tanpa LIMIT: pemanggil
+    men-join ke tabel utama & menerapkan filter dulu, jadi total & facet dihitung atas semua kandidat.
+    """
+    grams = trigrams(q)
+    if not grams:
+        return None
+    shared = func.count() * 1.0
+    score = shared / (literal(len(grams)) + func.max(model.total) - shared)
+    return (
+        select(key_col.label("key"), score.label("score"))
+        .where(model.trigram.in_(grams))
+        .group_by(key_col)
+        .having(score >= threshold)
+        .subquery()
+    )
+
+
+# --------------------------
+# Facets
+# --------------------------
+
+FACET_FIELDS = ("sektor", "bidang", "sub_bidang", "tahun")
+
+
+def _facet_lists(acc: dict[str, Counter]) -> dict[str, list[dict]]:
+    return {f: [{"name": name, "count": cnt} for name, cnt in c.most_common()] for f, c in acc.items()}
+
+
+def _facet_counts(db: Session, stmt: Select, facets: Sequence[str]) -> tuple[int, dict[str, list[dict]]]:
+    """
+    Hitung total + jumlah per nilai untuk beberapa facet dalam SATU scan:
+    GROUP BY kombinasi kolom facet atas hasil terfilter, lalu di-rollup per facet di Python
+    (jumlah kombinasi jauh lebih kecil dari jumlah baris).
+    """
+    sub = stmt.subquery()
+    cols = [sub.c[f] for f in facets]
+    acc: dict[str, Counter] = {f: Counter() for f in facets}
+    total = 0
+    for *vals, cnt in db.execute(select(*cols, func.count()).group_by(*cols)).all():
+        total += cnt
+        for f, v in zip(facets, vals, strict=True):
+            if v:
+                acc[f][v] += cnt
+    return total, _facet_lists(acc)
+
+
+def _count_with_facets(db: Session, stmt: Select, facets: Sequence[str]) -> tuple[int, dict[str, list[dict]]]:
+    """Total baris stmt, plus facet bila diminta (satu scan)."""
+    if facets:
+        return _facet_counts(db, stmt, facets)
+    return db.scalar(select(func.count()).select_from(stmt.subquery())) or 0, {}
+
+
 # --------------------------
 # Documents
 # --------------------------
 
 
-def upsert_documents(db: Session, docs: Iterable[dict]) -> None:
+def upsert_documents(db: Session, docs: Iterable[dict]) -> int:
     """
     Upsert daftar dokumen ke tabel documents.
     Field wajib: uuid, judul_skkni, nomor_skkni, sektor, bidang, tahun, unduh_url, listing_url
     sub_bidang boleh None. updated_at akan di-coerce ke datetime jika string.
+    Dokumen yang isinya sama (row_hash) tidak ditulis ulang. Return jumlah dokumen yang ditulis.
     """
+    retitled: dict[str, str] = {}
+    logged: list[tuple[str, models.Document]] = []
+    written = 0
     for d in docs:
         uuid = d["uuid"]
         obj: models.Document | None = db.get(models.Document, uuid)
+        row_hash = _row_hash(d, DOCUMENT_HASH_FIELDS)
+        if obj is not None and obj.row_hash == row_hash:
+            continue
+        written += 1
         upd_at = _coerce_dt(d.get("updated_at"))
+        if obj is None or obj.judul_skkni != d.get("judul_skkni"):
+            retitled[uuid] = d.get("judul_skkni") or ""
 
         if obj is None:
             obj = models.Document(
@@ -70,10 +215,14 @@ def upsert_documents(db: Session, docs: Iterable[dict]) -> None:
                 nomor_kepmen=d.get("nomor_kepmen"),
                 unduh_url=d.get("unduh_url"),
                 listing_url=d.get("listing_url"),
+                row_hash=row_hash,
                 updated_at=upd_at,
+                **_document_join_keys(uuid, d.get("unduh_url"), d.get("nomor_skkni")),
             )
             db.add(obj)
+            logged.append(("insert", obj))
         else:
+            logged.append(("update", obj))
             obj.judul_skkni = d.get("judul_skkni")
             obj.nomor_skkni = d.get("nomor_skkni")
             obj.sektor = d.get("sektor")
@@ -83,21 +232,54 @@ def upsert_documents(db: Session, docs: Iterable[dict]) -> None:
             obj.nomor_kepmen = d.get("nomor_kepmen")
             obj.unduh_url = d.get("unduh_url")
             obj.listing_url = d.get("listing_url")
+            obj.row_hash = row_hash
             obj.updated_at = upd_at
+            for k, v in _document_join_keys(uuid, d.get("unduh_url"), d.get("nomor_skkni")).items():
+                setattr(obj, k, v)
+    db.flush()
+    _index_trigrams(db, models.DocumentTrigram, models.DocumentTrigram.doc_uuid, retitled)
+    _log_changes(db, "document", [(op, o.uuid, _document_to_dict(o)) for op, o in logged])
     db.commit()
+    return written
 
 
-def get_documents(
-    db: Session,
-    limit: int = 20,
+def count_changed_documents(db: Session, docs: Iterable[dict]) -> tuple[int, int]:
+    """Untuk dry-run: (dokumen baru, dokumen berubah) tanpa menulis apa pun."""
+    incoming = {d["uuid"]: _row_hash(d, DOCUMENT_HASH_FIELDS) for d in docs}
+    stored: dict[str, str | None] = {}
+    keys = list(incoming)
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        stmt = select(models.Document.uuid, models.Document.row_hash).where(
+            models.Document.uuid.in_(keys[i : i + LOOKUP_CHUNK])
+        )
+        stored.update(db.execute(stmt).tuples().all())
+    added = sum(1 for k in incoming if k not in stored)
+    changed = sum(1 for k, h in incoming.items() if k in stored and stored[k] != h)
+    return added, changed
+
+
+DOCUMENT_FIELDS = (
+    "uuid",
+    "judul_skkni",
+    "nomor_skkni",
+    "sektor",
+    "bidang",
+    "sub_bidang",
+    "tahun",
+    "nomor_kepmen",
+    "unduh_url",
+    "listing_url",
+    "updated_at",
+)
+
+
+def _documents_stmt(
     q: str | None = None,
     sektor: str | None = None,
     bidang: str | None = None,
     tahun: str | None = None,
-) -> tuple[int, list[dict]]:
-    """
-    Ambil dokumen dari DB dengan optional filter.
-    """
+) -> Select:
+    """Bangun SELECT dokumen beserta filter opsional (dipakai search & export)."""
     stmt = select(models.Document)
     if q:
         like = f"%{q}%"
@@ -116,28 +298,105 @@ def get_documents(
         stmt = stmt.where(models.Document.bidang == bidang)
     if tahun:
         stmt = stmt.where(models.Document.tahun == tahun)
+    return stmt
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+
+def _document_to_dict(r: Any) -> dict:
+    """ORM object / Row dokumen -> dict JSON-friendly."""
+    return {
+        "uuid": r.uuid,
+        "judul_skkni": r.judul_skkni,
+        "nomor_skkni": r.nomor_skkni,
+        "sektor": r.sektor,
+        "bidang": r.bidang,
+        "sub_bidang": r.sub_bidang,
+        "tahun": r.tahun,
+        "nomor_kepmen": r.nomor_kepmen,
+        "unduh_url": r.unduh_url,
+        "listing_url": r.listing_url,
+        "updated_at": r.updated_at.isoformat() if r.updated_at else None,
+    }
+
+
+def get_documents(
+    db: Session,
+    limit: int = 20,
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    tahun: str | None = None,
+    fuzzy: bool = False,
+    threshold: float = FUZZY_THRESHOLD,
+) -> tuple[int, list[dict]]:
+    """
+    Ambil dokumen dari DB dengan optional filter.
+    fuzzy=True: `q` dicocokkan ke judul via index trigram (toleran typo), hasil diurutkan per `score`.
+    """
+    total, items, _ = get_documents_with_facets(
+        db, limit=limit, q=q, sektor=sektor, bidang=bidang, tahun=tahun, fuzzy=fuzzy, threshold=threshold
+    )
+    return total, items
+
+
+def get_documents_with_facets(
+    db: Session,
+    limit: int = 20,
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    tahun: str | None = None,
+    fuzzy: bool = False,
+    threshold: float = FUZZY_THRESHOLD,
+    facets: Sequence[str] = (),
+) -> tuple[int, list[dict], dict[str, list[dict]]]:
+    """Seperti get_documents, plus jumlah per nilai facet (lihat FACET_FIELDS) atas hasil terfilter."""
+    if fuzzy and q:
+        cand = _fuzzy_candidates(models.DocumentTrigram, models.DocumentTrigram.doc_uuid, q, threshold)
+        if cand is None:
+            return 0, [], _facet_lists({f: Counter() for f in facets})
+        stmt = _documents_stmt(sektor=sektor, bidang=bidang, tahun=tahun).join(cand, models.Document.uuid == cand.c.key)
+        total, facet_counts = _count_with_facets(db, stmt, facets)
+        ranked = stmt.add_columns(cand.c.score).order_by(cand.c.score.desc(), models.Document.uuid).limit(limit)
+        items = [_document_to_dict(r) | {"score": round(float(sc), 4)} for r, sc in db.execute(ranked).all()]
+        return total, items, facet_counts
+
+    stmt = _documents_stmt(q=q, sektor=sektor, bidang=bidang, tahun=tahun)
+
+    total, facet_counts = _count_with_facets(db, stmt, facets)
     rows = db.execute(stmt.order_by(models.Document.updated_at.desc().nullslast()).limit(limit)).scalars().all()
 
-    items = []
-    for r in rows:
-        items.append(
-            {
-                "uuid": r.uuid,
-                "judul_skkni": r.judul_skkni,
-                "nomor_skkni": r.nomor_skkni,
-                "sektor": r.sektor,
-                "bidang": r.bidang,
-                "sub_bidang": r.sub_bidang,
-                "tahun": r.tahun,
-                "nomor_kepmen": r.nomor_kepmen,
-                "unduh_url": r.unduh_url,
-                "listing_url": r.listing_url,
-                "updated_at": r.updated_at.isoformat() if r.updated_at else None,
-            }
-        )
-    return total or 0, items
+    items = [_document_to_dict(r) for r in rows]
+    return total, items, facet_counts
+
+
+def iter_documents(
+    db: Session,
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    tahun: str | None = None,
+    after: str | None = None,
+    chunk_size: int = 1000,
+) -> Iterator[dict]:
+    """
+    Stream seluruh dokumen (terfilter) urut uuid, per chunk berukuran `chunk_size`.
+    Keyset pagination (uuid > after) → memori konstan & bisa di-resume dari uuid terakhir.
+    """
+    base = _documents_stmt(q=q, sektor=sektor, bidang=bidang, tahun=tahun)
+    cols = [getattr(models.Document, f) for f in DOCUMENT_FIELDS]
+    cursor = after
+    while True:
+        stmt = base.with_only_columns(*cols).order_by(models.Document.uuid).limit(chunk_size)
+        if cursor is not None:
+            stmt = stmt.where(models.Document.uuid > cursor)
+        rows = db.execute(stmt).all()
+        if not rows:
+            return
+        for r in rows:
+            yield _document_to_dict(r)
+        if len(rows) < chunk_size:
+            return
+        cursor = rows[-1].uuid
 
 
 # --------------------------
@@ -145,58 +404,195 @@ def get_documents(
 # --------------------------
 
 
+@dataclass
+class UnitChangeSet:
+    """Delta unit satu dokumen terhadap isi DB (hasil diff_units)."""
+
+    doc_uuid: str
+    added: list[dict] = field(default_factory=list)
+    changed: list[dict] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    # kode_unit -> id baris yang sudah ada (unit berubah / tombstone yang muncul lagi)
+    existing_ids: dict[str, int] = field(default_factory=dict, repr=False)
+    removed_ids: list[int] = field(default_factory=list, repr=False)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "doc_uuid": self.doc_uuid,
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged,
+        }
+
+
+def diff_units(db: Session, units: Iterable[dict], complete_docs: Iterable[str] = ()) -> dict[str, UnitChangeSet]:
+    """
+    Bandingkan unit masuk dengan baris tersimpan via row_hash, per dokumen.
+
+    Unit yang tersimpan tapi tidak ada di input hanya dianggap `removed` untuk dokumen di
+    `complete_docs` (daftar unitnya lengkap); dokumen lain diperlakukan sebagai upsert parsial.
+    Tombstone yang muncul lagi dihitung `added`.
+    """
+    complete = set(complete_docs)
+    incoming: dict[str, dict[str, dict]] = {doc: {} for doc in complete}
+    for u in units:
+        incoming.setdefault(u["doc_uuid"], {})[u["kode_unit"]] = u  # duplikat: yang terakhir menang
+
+    stored: dict[str, dict[str, tuple[int, str | None, datetime | None]]] = {doc: {} for doc in incoming}
+    doc_keys = list(incoming)
+    for i in range(0, len(doc_keys), LOOKUP_CHUNK):
+        stmt = select(
+            models.Unit.id, models.Unit.doc_uuid, models.Unit.kode_unit, models.Unit.row_hash, models.Unit.deleted_at
+        ).where(models.Unit.doc_uuid.in_(doc_keys[i : i + LOOKUP_CHUNK]))
+        for uid, doc, kode, row_hash, deleted_at in db.execute(stmt).tuples():
+            stored[doc][kode] = (uid, row_hash, deleted_at)
+
+    changes: dict[str, UnitChangeSet] = {}
+    for doc, rows in incoming.items():
+        cs = UnitChangeSet(doc)
+        have = stored[doc]
+        for kode, u in rows.items():
+            prev = have.get(kode)
+            if prev is None:
+                cs.added.append(u)
+                continue
+            uid, row_hash, deleted_at = prev
+            if deleted_at is not None:
+                cs.added.append(u)
+            elif row_hash != _row_hash(u, UNIT_HASH_FIELDS):
+                cs.changed.append(u)
+            else:
+                cs.unchanged += 1
+                continue
+            cs.existing_ids[kode] = uid
+        if doc in complete:
+            for kode, (uid, _, deleted_at) in have.items():
+                if deleted_at is None and kode not in rows:
+                    cs.removed.append(kode)
+                    cs.removed_ids.append(uid)
+        changes[doc] = cs
+    return changes
+
+
+def _unit_values(u: dict) -> dict[str, Any]:
+    """Nilai kolom unit yang ditulis upsert (selain doc_uuid/kode_unit)."""
+    return {
+        "judul_unit": u.get("judul_unit"),
+        "unit_xml_id": make_unit_id(u["kode_unit"] or "", u.get("judul_unit") or "", u.get("nomor_skkni") or ""),
+        "sektor": u.get("sektor"),
+        "bidang": u.get("bidang"),
+        "sub_bidang": u.get("sub_bidang"),
+        "nomor_skkni": u.get("nomor_skkni"),
+        "tahun": u.get("tahun"),
+        "row_hash": _row_hash(u, UNIT_HASH_FIELDS),
+        "deleted_at": None,
+        "updated_at": _coerce_dt(u.get("updated_at")),
+        **_unit_join_keys(u["doc_uuid"], u.get("unduh_url"), u.get("nomor_skkni")),
+    }
+
+
+def apply_unit_changes(db: Session, changes: Iterable[UnitChangeSet]) -> None:
+    """Tulis hanya delta: insert unit baru, update yang berubah, tombstone yang hilang."""
+    changes = list(changes)
+    update_ids = [uid for cs in changes for uid in cs.existing_ids.values()]
+    existing: dict[int, models.Unit] = {}
+    for i in range(0, len(update_ids), LOOKUP_CHUNK):
+        stmt = select(models.Unit).where(models.Unit.id.in_(update_ids[i : i + LOOKUP_CHUNK]))
+        existing.update((o.id, o) for o in db.execute(stmt).scalars())
+
+    retitled: list[models.Unit] = []
+    logged: list[tuple[str, models.Unit]] = []
+    for cs in changes:
+        for u in cs.added + cs.changed:
+            values = _unit_values(u)
+            uid = cs.existing_ids.get(u["kode_unit"])
+            if uid is None:
+                obj = models.Unit(doc_uuid=u["doc_uuid"], kode_unit=u["kode_unit"], **values)
+                db.add(obj)
+                retitled.append(obj)
+                logged.append(("insert", obj))
+                continue
+            obj = existing[uid]
+            # tombstone yang muncul lagi = insert bagi replika (mereka sudah menerima delete)
+            logged.append(("insert" if obj.deleted_at is not None else "update", obj))
+            if obj.judul_unit != values["judul_unit"]:
+                retitled.append(obj)
+            for k, v in values.items():
+                setattr(obj, k, v)
+
+    removed_ids = [uid for cs in changes for uid in cs.removed_ids]
+    now = datetime.utcnow()
+    for i in range(0, len(removed_ids), LOOKUP_CHUNK):
+        db.execute(
+            update(models.Unit)
+            .where(models.Unit.id.in_(removed_ids[i : i + LOOKUP_CHUNK]))
+            .values(deleted_at=now, updated_at=now)
+        )
+    # flush dulu supaya unit baru punya id sebelum index trigram ditulis
+    db.flush()
+    _index_trigrams(db, models.UnitTrigram, models.UnitTrigram.unit_id, {o.id: o.judul_unit or "" for o in retitled})
+    entries = [(op, f"{o.doc_uuid}/{o.kode_unit}", {"id": o.id} | _unit_to_dict(o)) for op, o in logged]
+    entries += [
+        ("delete", f"{cs.doc_uuid}/{kode}", {"id": uid, "doc_uuid": cs.doc_uuid, "kode_unit": kode})
+        for cs in changes
+        for kode, uid in zip(cs.removed, cs.removed_ids, strict=True)
+    ]
+    _log_changes(db, "unit", entries)
+    db.commit()
+
+
 def upsert_units(db: Session, units: Iterable[dict]) -> None:
     """
     Upsert daftar unit ke tabel units.
     Field wajib: doc_uuid, kode_unit, judul_unit
     Field tambahan (opsional): sektor, bidang, sub_bidang, nomor_skkni, tahun, updated_at
+    Unit yang isinya sama (row_hash) tidak ditulis ulang; unit yang tidak dikirim dibiarkan.
     """
-    for u in units:
-        key = (u["doc_uuid"], u["kode_unit"])
-        obj: models.Unit | None = (
-            db.execute(select(models.Unit).where(and_(models.Unit.doc_uuid == key[0], models.Unit.kode_unit == key[1])))
-            .scalars()
-            .first()
-        )
-        upd_at = _coerce_dt(u.get("updated_at"))
+    apply_unit_changes(db, diff_units(db, units).values())
 
-        if obj is None:
-            obj = models.Unit(
-                doc_uuid=u["doc_uuid"],
-                kode_unit=u["kode_unit"],
-                judul_unit=u.get("judul_unit"),
-                sektor=u.get("sektor"),
-                bidang=u.get("bidang"),
-                sub_bidang=u.get("sub_bidang"),
-                nomor_skkni=u.get("nomor_skkni"),
-                tahun=u.get("tahun"),
-                updated_at=upd_at,
-            )
-            db.add(obj)
-        else:
-            obj.judul_unit = u.get("judul_unit")
-            obj.sektor = u.get("sektor")
-            obj.bidang = u.get("bidang")
-            obj.sub_bidang = u.get("sub_bidang")
-            obj.nomor_skkni = u.get("nomor_skkni")
-            obj.tahun = u.get("tahun")
-            obj.updated_at = upd_at
-    db.commit()
+
+def sync_units(db: Session, units_by_doc: dict[str, list[dict]], dry_run: bool = False) -> list[UnitChangeSet]:
+    """
+    Sinkronkan daftar unit LENGKAP per dokumen: tulis delta & tombstone unit yang hilang.
+    dry_run=True hanya menghitung change set tanpa menulis.
+    """
+    units = (u for rows in units_by_doc.values() for u in rows)
+    changes = list(diff_units(db, units, complete_docs=units_by_doc).values())
+    if not dry_run:
+        apply_unit_changes(db, changes)
+    return changes
 
 
-def get_units(
-    db: Session,
-    limit: int = 50,
+UNIT_FIELDS = (
+    "id",
+    "doc_uuid",
+    "kode_unit",
+    "judul_unit",
+    "unit_xml_id",
+    "sektor",
+    "bidang",
+    "sub_bidang",
+    "nomor_skkni",
+    "tahun",
+    "updated_at",
+)
+
+
+def _units_stmt(
     q: str | None = None,
     sektor: str | None = None,
     bidang: str | None = None,
     tahun: str | None = None,
     doc_uuid: str | None = None,
-) -> tuple[int, list[dict]]:
-    """
-    Ambil units dari DB. Jika tanpa filter sekalipun, harus tetap return data (dibatasi 'limit').
-    """
-    stmt = select(models.Unit)
+) -> Select:
+    """Bangun SELECT units beserta filter opsional (dipakai search & export). Tombstone tidak ikut."""
+    stmt = select(models.Unit).where(models.Unit.deleted_at.is_(None))
     if q:
         like = f"%{q}%"
         stmt = stmt.where(
@@ -213,28 +609,224 @@ def get_units(
         stmt = stmt.where(models.Unit.tahun == tahun)
     if doc_uuid:
         stmt = stmt.where(models.Unit.doc_uuid == doc_uuid)
+    return stmt
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+
+def _unit_to_dict(r: Any) -> dict:
+    """ORM object / Row unit -> dict JSON-friendly."""
+    return {
+        "doc_uuid": r.doc_uuid,
+        "kode_unit": r.kode_unit,
+        "judul_unit": r.judul_unit,
+        "unit_xml_id": r.unit_xml_id,
+        "sektor": r.sektor,
+        "bidang": r.bidang,
+        "sub_bidang": r.sub_bidang,
+        "nomor_skkni": r.nomor_skkni,
+        "tahun": r.tahun,
+        "updated_at": r.updated_at.isoformat() if r.updated_at else None,
+    }
+
+
+def get_units(
+    db: Session,
+    limit: int = 50,
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    tahun: str | None = None,
+    doc_uuid: str | None = None,
+    fuzzy: bool = False,
+    threshold: float = FUZZY_THRESHOLD,
+) -> tuple[int, list[dict]]:
+    """
+    Ambil units dari DB. Jika tanpa filter sekalipun, harus tetap return data (dibatasi 'limit').
+    fuzzy=True: `q` dicocokkan ke judul_unit via index trigram, hasil diurutkan per `score`.
+    """
+    total, items, _ = get_units_with_facets(
+        db,
+        limit=limit,
+        q=q,
+        sektor=sektor,
+        bidang=bidang,
+        tahun=tahun,
+        doc_uuid=doc_uuid,
+        fuzzy=fuzzy,
+        threshold=threshold,
+    )
+    return total, items
+
+
+def get_units_with_facets(
+    db: Session,
+    limit: int = 50,
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    tahun: str | None = None,
+    doc_uuid: str | None = None,
+    fuzzy: bool = False,
+    threshold: float = FUZZY_THRESHOLD,
+    facets: Sequence[str] = (),
+) -> tuple[int, list[dict], dict[str, list[dict]]]:
+    """Seperti get_units, plus jumlah per nilai facet (lihat FACET_FIELDS) atas hasil terfilter."""
+    if fuzzy and q:
+        cand = _fuzzy_candidates(models.UnitTrigram, models.UnitTrigram.unit_id, q, threshold)
+        if cand is None:
+            return 0, [], _facet_lists({f: Counter() for f in facets})
+        stmt = _units_stmt(sektor=sektor, bidang=bidang, tahun=tahun, doc_uuid=doc_uuid).join(
+            cand, models.Unit.id == cand.c.key
+        )
+        total, facet_counts = _count_with_facets(db, stmt, facets)
+        ranked = stmt.add_columns(cand.c.score).order_by(cand.c.score.desc(), models.Unit.id).limit(limit)
+        items = [_unit_to_dict(r) | {"score": round(float(sc), 4)} for r, sc in db.execute(ranked).all()]
+        return total, items, facet_counts
+
+    stmt = _units_stmt(q=q, sektor=sektor, bidang=bidang, tahun=tahun, doc_uuid=doc_uuid)
+
+    total, facet_counts = _count_with_facets(db, stmt, facets)
     rows = db.execute(stmt.order_by(models.Unit.updated_at.desc().nullslast()).limit(limit)).scalars().all()
 
+    items = [_unit_to_dict(r) for r in rows]
+    return total, items, facet_counts
+
+
+def iter_units(
+    db: Session,
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    tahun: str | None = None,
+    doc_uuid: str | None = None,
+    after: int | None = None,
+    chunk_size: int = 1000,
+) -> Iterator[dict]:
+    """
+    Stream seluruh units (terfilter) urut id, per chunk berukuran `chunk_size`.
+    Tiap item menyertakan `id` sebagai cursor resume (id > after).
+    """
+    base = _units_stmt(q=q, sektor=sektor, bidang=bidang, tahun=tahun, doc_uuid=doc_uuid)
+    cols = [getattr(models.Unit, f) for f in UNIT_FIELDS]
+    cursor = after
+    while True:
+        stmt = base.with_only_columns(*cols).order_by(models.Unit.id).limit(chunk_size)
+        if cursor is not None:
+            stmt = stmt.where(models.Unit.id > cursor)
+        rows = db.execute(stmt).all()
+        if not rows:
+            return
+        for r in rows:
+            yield {"id": r.id} | _unit_to_dict(r)
+        if len(rows) < chunk_size:
+            return
+        cursor = rows[-1].id
+
+
+MERGE_FIELDS = ("sektor", "bidang", "sub_bidang", "tahun", "nomor_kepmen")
+
+
+def get_units_merged(
+    db: Session,
+    limit: int = 50,
+    q: str | None = None,
+    sektor: str | None = None,
+    bidang: str | None = None,
+    sub_bidang: str | None = None,
+    tahun: str | None = None,
+    doc_uuid: str | None = None,
+    kode_unit: str | None = None,
+    judul_unit: str | None = None,
+    nomor_skkni: str | None = None,
+) -> tuple[int, list[dict]]:
+    """
+    Units yang taxonomy kosongnya dilengkapi dari dokumen induk, dalam satu query ber-index:
+    join prioritas 1 via pdf_key, prioritas 2 via nomor_key (kolom join key diisi saat upsert).
+    Filter sektor/bidang/sub_bidang/tahun: substring case-insensitive atas nilai hasil merge.
+    kode_unit/judul_unit: sama persis; nomor_skkni: dicocokkan lewat nomor_key (format penulisan bebas).
+    """
+    by_pdf = aliased(models.Document)
+    by_nomor = aliased(models.Document)
+    # satu dokumen per unit (uuid terkecil) walau join key tidak unik
+    pdf_match = (
+        select(func.min(models.Document.uuid))
+        .where(models.Document.pdf_key == models.Unit.pdf_key)
+        .correlate(models.Unit)
+        .scalar_subquery()
+    )
+    nomor_match = (
+        select(func.min(models.Document.uuid))
+        .where(models.Document.nomor_key == models.Unit.nomor_key)
+        .correlate(models.Unit)
+        .scalar_subquery()
+    )
+    merged = {
+        f: func.coalesce(func.nullif(getattr(models.Unit, f), ""), getattr(by_pdf, f), getattr(by_nomor, f)).label(f)
+        for f in MERGE_FIELDS
+    }
+
+    stmt = (
+        _units_stmt(q=q, doc_uuid=doc_uuid)
+        .outerjoin(by_pdf, by_pdf.uuid == pdf_match)
+        .outerjoin(by_nomor, and_(by_pdf.uuid.is_(None), by_nomor.uuid == nomor_match))
+    )
+    if kode_unit:
+        stmt = stmt.where(models.Unit.kode_unit == kode_unit)
+    if judul_unit:
+        stmt = stmt.where(models.Unit.judul_unit == judul_unit)
+    if nomor_skkni:
+        stmt = stmt.where(models.Unit.nomor_key == (build_join_key_nomor(nomor_skkni) or nomor_skkni))
+    for f, val in (("sektor", sektor), ("bidang", bidang), ("sub_bidang", sub_bidang), ("tahun", tahun)):
+        if val:
+            stmt = stmt.where(merged[f].ilike(f"%{val}%"))
+
+    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+    rows = db.execute(
+        stmt.add_columns(*merged.values()).order_by(models.Unit.updated_at.desc().nullslast()).limit(limit)
+    ).all()
+
     items = []
-    for r in rows:
-        items.append(
-            {
-                "doc_uuid": r.doc_uuid,
-                "kode_unit": r.kode_unit,
-                "judul_unit": r.judul_unit,
-                "sektor": r.sektor,
-                "bidang": r.bidang,
-                "sub_bidang": r.sub_bidang,
-                "nomor_skkni": r.nomor_skkni,
-                "tahun": r.tahun,
-                "updated_at": r.updated_at.isoformat() if r.updated_at else None,
-            }
-        )
+    for row in rows:
+        item = _unit_to_dict(row[0])
+        item.update({f: row._mapping[f] for f in MERGE_FIELDS})
+        items.append(item)
     return total or 0, items
 
 
+def lookup_units(
+    db: Session,
+    kode_units: Sequence[str] = (),
+    unit_xml_ids: Sequence[str] = (),
+) -> tuple[list[dict], list[str], list[str]]:
+    """
+    Resolve banyak unit sekaligus via kode_unit dan/atau unit_xml_id (query IN ber-index).
+    Returns:
+        (items, kode_unit yang tidak ditemukan, unit_xml_id yang tidak ditemukan)
+    """
+    items: list[dict] = []
+    found_kode: set[str] = set()
+    found_ids: set[str] = set()
+    seen_rows: set[int] = set()
+    for column, keys, found in (
+        (models.Unit.kode_unit, list(dict.fromkeys(kode_units)), found_kode),
+        (models.Unit.unit_xml_id, list(dict.fromkeys(unit_xml_ids)), found_ids),
+    ):
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            stmt = (
+                select(models.Unit)
+                .where(column.in_(keys[i : i + LOOKUP_CHUNK]), models.Unit.deleted_at.is_(None))
+                .order_by(models.Unit.id)
+            )
+            for r in db.execute(stmt).scalars():
+                found.add(getattr(r, column.key))
+                if r.id in seen_rows:
+                    continue
+                seen_rows.add(r.id)
+                items.append(_unit_to_dict(r))
+    missing_kode = [k for k in dict.fromkeys(kode_units) if k not in found_kode]
+    missing_ids = [k for k in dict.fromkeys(unit_xml_ids) if k not in found_ids]
+    return items, missing_kode, missing_ids
+
+
 # --------------------------
 # Taxonomy (distinct)
 # --------------------------
@@ -267,3 +859,273 @@ def get_distinct_sub_bidang(db: Session) -> list[tuple[str, int]]:
         .order_by(func.count(models.Document.uuid).desc())
     )
     return [(name, cnt) for name, cnt in db.execute(stmt).all() if name]
+
+
+# --------------------------
+# Changelog (replikasi inkremental)
+# --------------------------
+
+
+def _log_changes(db: Session, entity: str, entries: Sequence[tuple[str, str, dict | None]]) -> None:
+    """Tambahkan (op, key, data) ke change_log dalam transaksi yang sama dengan perubahan datanya."""
+    if not entries:
+        return
+    now = datetime.utcnow()
+    rows = [
+        {
+            "entity": entity,
+            "op": op,
+            "key": key,
+            "data": None if data is None else json.dumps(data, ensure_ascii=False, default=str),
+            "changed_at": now,
+        }
+        for op, key, data in entries
+    ]
+    for i in range(0, len(rows), LOOKUP_CHUNK):
+        db.execute(insert(models.ChangeLog), rows[i : i + LOOKUP_CHUNK])
+
+
+def _change_to_dict(r: Any) -> dict:
+    return {
+        "seq": r.seq,
+        "entity": r.entity,
+        "op": r.op,
+        "key": r.key,
+        "data": json.loads(r.data) if r.data else None,
+        "changed_at": r.changed_at.isoformat() if r.changed_at else None,
+    }
+
+
+def get_changes(db: Session, since: int = 0, limit: int = 1000) -> list[dict]:
+    """Perubahan dengan seq > since, urut seq (maksimal `limit`)."""
+    stmt = select(models.ChangeLog).where(models.ChangeLog.seq > since).order_by(models.ChangeLog.seq).limit(limit)
+    return [_change_to_dict(r) for r in db.execute(stmt).scalars()]
+
+
+def iter_changes(db: Session, since: int = 0, limit: int | None = None, chunk_size: int = 1000) -> Iterator[dict]:
+    """Stream perubahan seq > since per chunk (keyset pada seq); berhenti setelah `limit` baris bila diisi."""
+    cursor, left = since, limit
+    while left is None or left > 0:
+        n = chunk_size if left is None else min(chunk_size, left)
+        rows = get_changes(db, since=cursor, limit=n)
+        yield from rows
+        if len(rows) < n:
+            return
+        cursor = rows[-1]["seq"]
+        if left is not None:
+            left -= len(rows)
+
+
+def get_latest_change_seq(db: Session) -> int:
+    return int(db.scalar(select(func.max(models.ChangeLog.seq))) or 0)
+
+
+# --------------------------
+# Sync generation
+# --------------------------
+
+
+def get_sync_generation(db: Session) -> int:
+    """Generasi sinkronisasi saat ini (0 bila worker belum pernah jalan)."""
+    obj = db.get(models.SyncState, 1)
+    return int(obj.generation) if obj else 0
+
+
+def bump_sync_generation(db: Session) -> int:
+    """Naikkan generasi sinkronisasi (dipanggil worker setelah upsert selesai)."""
+    obj = db.get(models.SyncState, 1)
+    if obj is None:
+        obj = models.SyncState(id=1, generation=0)
+        db.add(obj)
+    obj.generation = (obj.generation or 0) + 1
+    obj.updated_at = datetime.utcnow()
+    db.commit()
+    return int(obj.generation)
+
+
+# --------------------------
+# Ledger run sinkronisasi (worker)
+# --------------------------
+
+SYNC_RUN_FIELDS = (
+    "id",
+    "status",
+    "dry_run",
+    "started_at",
+    "finished_at",
+    "duration_ms",
+    "total_uuids",
+    "ok_count",
+    "error_count",
+    "documents_written",
+    "units_fetched",
+    "units_added",
+    "units_changed",
+    "units_removed",
+    "bytes",
+    "retries",
+    "documents_upsert_ms",
+    "units_upsert_ms",
+    "documents_per_second",
+    "units_per_second",
+    "error",
+)
+SYNC_ITEM_FIELDS = (
+    "run_id",
+    "uuid",
+    "status",
+    "detail_ms",
+    "units_ms",
+    "total_ms",
+    "bytes",
+    "retries",
+    "unit_count",
+    "units_added",
+    "units_changed",
+    "units_removed",
+    "error_class",
+    "error",
+)
+
+
+def start_sync_run(db: Session, total_uuids: int, dry_run: bool = False) -> int:
+    """Catat run baru berstatus "running"; return id run."""
+    run = models.SyncRun(status="running", dry_run=dry_run, total_uuids=total_uuids, started_at=datetime.utcnow())
+    db.add(run)
+    db.commit()
+    return int(run.id)
+
+
+def add_sync_run_items(db: Session, run_id: int, items: Iterable[dict]) -> int:
+    """Bulk insert baris per UUID (key = SYNC_ITEM_FIELDS); total_ms dihitung bila belum ada."""
+    rows = []
+    for it in items:
+        row = {k: it.get(k) for k in SYNC_ITEM_FIELDS if k in it}
+        row["run_id"] = run_id
+        if row.get("total_ms") is None and (row.get("detail_ms") is not None or row.get("units_ms") is not None):
+            row["total_ms"] = (row.get("detail_ms") or 0.0) + (row.get("units_ms") or 0.0)
+        rows.append(row)
+    if rows:
+        db.execute(insert(models.SyncRunItem), rows)
+        db.commit()
+    return len(rows)
+
+
+def finish_sync_run(db: Session, run_id: int, status: str = "ok", **totals: Any) -> None:
+    """Tutup run: status, finished_at, durasi & total (kolom SyncRun yang dikenal saja)."""
+    run = db.get(models.SyncRun, run_id)
+    if run is None:
+        return
+    run.status = status
+    run.finished_at = datetime.utcnow()
+    run.duration_ms = (run.finished_at - run.started_at).total_seconds() * 1000
+    for k, v in totals.items():
+        if k in SYNC_RUN_FIELDS and k not in ("id", "started_at", "finished_at", "status"):
+            setattr(run, k, v)
+    db.commit()
+
+
+def _to_dict(r: Any, fields: Sequence[str]) -> dict:
+    return {k: getattr(r, k) for k in fields}
+
+
+def get_sync_runs(db: Session, limit: int = 20, status: str | None = None) -> list[dict]:
+    """Run terbaru dulu."""
+    stmt = select(models.SyncRun).order_by(models.SyncRun.id.desc()).limit(limit)
+    if status:
+        stmt = stmt.where(models.SyncRun.status == status)
+    return [_to_dict(r, SYNC_RUN_FIELDS) for r in db.execute(stmt).scalars()]
+
+
+def get_sync_run(db: Session, run_id: int) -> dict | None:
+    run = db.get(models.SyncRun, run_id)
+    return _to_dict(run, SYNC_RUN_FIELDS) if run is not None else None
+
+
+def get_latest_sync_run_id(db: Session) -> int | None:
+    return db.execute(select(func.max(models.SyncRun.id))).scalar()
+
+
+def get_sync_run_items(
+    db: Session,
+    run_id: int,
+    status: str | None = None,
+    order: str = "slowest",
+    limit: int = 20,
+) -> list[dict]:
+    """
+    Baris per UUID satu run. order="slowest" (total_ms menurun) atau "uuid".
+    status="error" untuk UUID yang gagal.
+    """
+    item = models.SyncRunItem
+    stmt = select(item).where(item.run_id == run_id)
+    if status:
+        stmt = stmt.where(item.status == status)
+    if order == "slowest":
+        stmt = stmt.order_by(item.total_ms.is_(None), item.total_ms.desc(), item.id)
+    else:
+        stmt = stmt.order_by(item.uuid)
+    return [_to_dict(r, SYNC_ITEM_FIELDS) for r in db.execute(stmt.limit(limit)).scalars()]
+
+
+def get_uuid_sync_history(db: Session, uuid: str, limit: int = 20) -> list[dict]:
+    """Riwayat satu UUID lintas run (terbaru dulu) untuk melacak regresi dokumen tertentu."""
+    item = models.SyncRunItem
+    stmt = select(item).where(item.uuid == uuid).order_by(item.run_id.desc()).limit(limit)
+    return [_to_dict(r, SYNC_ITEM_FIELDS) for r in db.execute(stmt).scalars()]
+
+
+# --------------------------
+# Kolom turunan (backfill untuk baris lama)
+# --------------------------
+
+
+def backfill_derived_columns(db: Session, chunk_size: int = 1000) -> int:
+    """
+    Isi kolom/index turunan yang belum ada (mis. baris dari versi sebelum fitur ditambahkan):
+    unit_xml_id, join key (pdf_key/nomor_key) dan index trigram judul. Return jumlah baris yang diperbarui.
+    """
+    n = 0
+    while True:
+        rows = (
+            db.execute(select(models.Unit).where(models.Unit.unit_xml_id.is_(None)).limit(chunk_size)).scalars().all()
+        )
+        if not rows:
+            break
+        for r in rows:
+            r.unit_xml_id = make_unit_id(r.kode_unit or "", r.judul_unit or "", r.nomor_skkni or "")
+        db.commit()
+        n += len(rows)
+
+    for model, keys_for in (
+        (models.Document, lambda r: _document_join_keys(r.uuid, r.unduh_url, r.nomor_skkni)),
+        (models.Unit, lambda r: _unit_join_keys(r.doc_uuid, None, r.nomor_skkni)),
+    ):
+        while True:
+            rows = db.execute(select(model).where(model.pdf_key.is_(None)).limit(chunk_size)).scalars().all()
+            if not rows:
+                break
+            for r in rows:
+                for k, v in keys_for(r).items():
+                    setattr(r, k, v)
+            db.commit()
+            n += len(rows)
+
+    # judul tanpa trigram sama sekali (judul kosong) ikut terpilih lagi → iterasi keyset, bukan loop "sampai habis"
+    for pk, title, tri_model, tri_key in (
+        (models.Unit.id, models.Unit.judul_unit, models.UnitTrigram, models.UnitTrigram.unit_id),
+        (models.Document.uuid, models.Document.judul_skkni, models.DocumentTrigram, models.DocumentTrigram.doc_uuid),
+    ):
+        cursor = None
+        while True:
+            stmt = select(pk, title).where(~exists().where(tri_key == pk)).order_by(pk).limit(chunk_size)
+            if cursor is not None:
+                stmt = stmt.where(pk > cursor)
+            rows = db.execute(stmt).all()
+            if not rows:
+                break
+            _index_trigrams(db, tri_model, tri_key, {k: t or "" for k, t in rows})
+            db.commit()
+            n += len(rows)
+            cursor = rows[-1][0]
+    return n
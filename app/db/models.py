@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, declarative_base, relationship
 
 if TYPE_CHECKING:
@@ -36,6 +36,13 @@ class Document(Base):
     unduh_url = Column(Text, nullable=True)
     listing_url = Column(Text, nullable=True)
 
+    # Join key (utils.parsing), dihitung saat upsert untuk merge unit↔dokumen via SQL
+    pdf_key = Column(String, nullable=True, index=True)
+    nomor_key = Column(String, nullable=True, index=True)
+
+    # Hash isi baris (crud._row_hash); upsert melewati dokumen yang tidak berubah
+    row_hash = Column(String(32), nullable=True)
+
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # relasi ke units
@@ -51,6 +58,9 @@ class Unit(Base):
     kode_unit = Column(String, nullable=False, index=True)
     judul_unit = Column(Text, nullable=False)
 
+    # ID deterministik (make_unit_id), diisi saat upsert; dipakai untuk lookup batch / Odoo XML ID
+    unit_xml_id = Column(String, nullable=True, index=True)
+
     nomor_skkni = Column(String, nullable=True)
     sektor = Column(String, nullable=True, index=True)
     bidang = Column(String, nullable=True, index=True)
@@ -59,6 +69,14 @@ class Unit(Base):
     tahun = Column(String, nullable=True)
     nomor_kepmen = Column(String, nullable=True)
 
+    # Join key ke documents.pdf_key / documents.nomor_key
+    pdf_key = Column(String, nullable=True, index=True)
+    nomor_key = Column(String, nullable=True, index=True)
+
+    # Hash isi baris untuk sync berbasis diff; deleted_at terisi = tombstone (unit hilang di upstream)
+    row_hash = Column(String(32), nullable=True)
+    deleted_at = Column(DateTime, nullable=True, index=True)
+
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     document: Mapped[Document] = relationship("Document", back_populates="units")
@@ -68,6 +86,28 @@ class Unit(Base):
     )
 
 
+# Index trigram judul (pengganti pg_trgm di SQLite) untuk pencarian fuzzy; diisi saat upsert.
+class UnitTrigram(Base):
+    __tablename__ = "unit_trigrams"
+
+    unit_id = Column(Integer, ForeignKey("units.id", ondelete="CASCADE"), primary_key=True)
+    trigram = Column(String(3), primary_key=True)
+    # jumlah trigram unik pada judul (penyebut similarity)
+    total = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_unit_trigrams_trigram_unit", "trigram", "unit_id"),)
+
+
+class DocumentTrigram(Base):
+    __tablename__ = "document_trigrams"
+
+    doc_uuid = Column(String, ForeignKey("documents.uuid", ondelete="CASCADE"), primary_key=True)
+    trigram = Column(String(3), primary_key=True)
+    total = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_document_trigrams_trigram_doc", "trigram", "doc_uuid"),)
+
+
 class Sector(Base):
     __tablename__ = "sectors"
 
@@ -93,3 +133,110 @@ class SubBidang(Base):
     name = Column(String, unique=True, nullable=False, index=True)
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class SyncState(Base):
+    """Satu baris (id=1): generasi sinkronisasi, dinaikkan worker setiap selesai upsert."""
+
+    __tablename__ = "sync_state"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class SchemaVersion(Base):
+    """Satu baris (id=1): fingerprint skema models yang terakhir diterapkan init_db ke DB ini."""
+
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String(32), nullable=False)
+
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ChangeLog(Base):
+    """
+    Changelog append-only: setiap insert/update/delete documents & units oleh crud.
+    `seq` monotonic (AUTOINCREMENT: tidak pernah dipakai ulang) → cursor replikasi inkremental.
+    """
+
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(16), nullable=False)  # "document" | "unit"
+    op = Column(String(8), nullable=False)  # "insert" | "update" | "delete"
+    # uuid dokumen / "<doc_uuid>/<kode_unit>" untuk unit
+    key = Column(String, nullable=False, index=True)
+    # JSON baris setelah perubahan (delete: hanya kolom identitas)
+    data = Column(Text, nullable=True)
+
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+
+class SyncRun(Base):
+    """Ledger satu run worker: waktu, total, throughput & durasi upsert."""
+
+    __tablename__ = "sync_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # "running" | "ok" | "failed"; run yang mati di tengah jalan tetap "running"
+    status = Column(String(16), nullable=False, default="running", index=True)
+    dry_run = Column(Boolean, nullable=False, default=False)
+
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+
+    total_uuids = Column(Integer, nullable=False, default=0)
+    ok_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    documents_written = Column(Integer, nullable=False, default=0)
+    units_fetched = Column(Integer, nullable=False, default=0)
+    units_added = Column(Integer, nullable=False, default=0)
+    units_changed = Column(Integer, nullable=False, default=0)
+    units_removed = Column(Integer, nullable=False, default=0)
+    bytes = Column(Integer, nullable=False, default=0)
+    retries = Column(Integer, nullable=False, default=0)
+
+    # upsert dijalankan per batch (semua dokumen sekaligus), jadi durasinya dicatat per run
+    documents_upsert_ms = Column(Float, nullable=True)
+    units_upsert_ms = Column(Float, nullable=True)
+    documents_per_second = Column(Float, nullable=True)
+    units_per_second = Column(Float, nullable=True)
+
+    error = Column(Text, nullable=True)
+
+
+class SyncRunItem(Base):
+    """Satu UUID dalam satu run: latensi fetch detail/units, byte, retry (hedge), hasil & kelas error."""
+
+    __tablename__ = "sync_run_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey("sync_runs.id", ondelete="CASCADE"), nullable=False)
+    uuid = Column(String, nullable=False, index=True)
+    status = Column(String(8), nullable=False)  # "ok" | "error"
+
+    detail_ms = Column(Float, nullable=True)
+    units_ms = Column(Float, nullable=True)
+    # detail_ms + units_ms; diindeks untuk query "UUID paling lambat"
+    total_ms = Column(Float, nullable=True)
+    bytes = Column(Integer, nullable=False, default=0)
+    retries = Column(Integer, nullable=False, default=0)
+    unit_count = Column(Integer, nullable=True)
+    units_added = Column(Integer, nullable=True)
+    units_changed = Column(Integer, nullable=True)
+    units_removed = Column(Integer, nullable=True)
+
+    error_class = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_sync_run_items_run_total", "run_id", "total_ms"),
+        Index("ix_sync_run_items_run_status", "run_id", "status"),
+    )
@@ -1,10 +1,21 @@
 # app/main.py
-from fastapi import FastAPI
+import secrets
+import sys
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.routes import api_router
 from app.core.config import settings
-from app.core.db import init_db
+from app.core.db import (
+    QueryStatsMiddleware,
+    engine,
+    get_statement_stats,
+    init_db,
+    read_replica,
+    reset_statement_stats,
+)
+from app.core.metrics import MetricsMiddleware, instrument_engine, render_latest
 
 app = FastAPI(title="SKKNI Scraper API", version="1.0.0")
 
@@ -17,6 +28,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.SQL_PROFILING:
+    # tanpa hook profiling header X-DB-* selalu 0, jadi middleware hanya dipasang bila aktif
+    app.add_middleware(QueryStatsMiddleware)
+# paling luar: ukur seluruh request termasuk CORS
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
 
 
 @app.on_event("startup")
@@ -24,9 +41,66 @@ def on_startup():
     init_db()
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    # pool browser hanya ditutup bila modul Playwright memang pernah dimuat
+    helper = sys.modules.get("app.utils.playwright_helper")
+    if helper is not None:
+        await helper.close_browser_pool()
+    # begitu juga client HTTP bersama milik repository
+    repo = sys.modules.get("app.repositories.skkni_repository")
+    if repo is not None:
+        repo.close_client()
+        await repo.aclose_client()
+
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+def require_debug_key(x_api_key: str | None = Header(None)) -> None:
+    # endpoint debug tidak ada sama sekali bila DEBUG_API_KEY kosong
+    if not settings.DEBUG_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest((x_api_key or "").encode(), settings.DEBUG_API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="X-API-Key tidak valid")
+
+
+@app.get("/debug/sql-stats", include_in_schema=False, dependencies=[Depends(require_debug_key)])
+def sql_stats(
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = Query("total", pattern="^(total|count|max|avg)$"),
+):
+    # statistik per fingerprint statement sejak start / reset terakhir
+    items = get_statement_stats(limit=limit, sort=sort)
+    return {"count": len(items), "items": items}
+
+
+@app.post("/debug/sql-stats/reset", include_in_schema=False, dependencies=[Depends(require_debug_key)])
+def sql_stats_reset():
+    reset_statement_stats()
+    return {"status": "ok"}
+
+
+@app.get("/healthz/read-db")
+def healthz_read_db():
+    # generasi read snapshot yang sedang dilayani proses ini (lihat app.services.read_db)
+    return read_replica.state()
+
+
+@app.get("/healthz/upstream")
+def healthz_upstream():
+    # state circuit breaker & hedging ke API Kemnaker (untuk monitoring)
+    from app.repositories.skkni_repository import upstream_state
+
+    return upstream_state()
+
+
 app.include_router(api_router)
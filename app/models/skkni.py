@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
 
 
 class DocumentItem(BaseModel):
@@ -19,6 +22,7 @@ class UnitItem(BaseModel):
     doc_uuid: str
     kode_unit: str
     judul_unit: str
+    unit_xml_id: str | None = None
     nomor_skkni: str | None = None
     sektor: str | None = None
     bidang: str | None = None
@@ -40,3 +44,93 @@ class SearchUnitsResponse(BaseModel):
     count: int
     items: list[UnitItem]
     source: str
+
+
+class UnitLookupRequest(BaseModel):
+    kode_unit: list[str] = Field(default_factory=list, max_length=1000)
+    unit_xml_id: list[str] = Field(default_factory=list, max_length=1000)
+
+
+class UnitLookupMissing(BaseModel):
+    kode_unit: list[str]
+    unit_xml_id: list[str]
+
+
+class UnitLookupResponse(BaseModel):
+    count: int
+    items: list[UnitItem]
+    missing: UnitLookupMissing
+
+
+class ChangeItem(BaseModel):
+    seq: int
+    entity: Literal["document", "unit"]
+    op: Literal["insert", "update", "delete"]
+    key: str
+    data: dict[str, Any] | None = None
+    changed_at: str | None = None
+
+
+class ChangesResponse(BaseModel):
+    since: int
+    next_since: int
+    has_more: bool
+    latest_seq: int
+    items: list[ChangeItem]
+
+
+class SyncRunItem(BaseModel):
+    run_id: int
+    uuid: str
+    status: Literal["ok", "error"]
+    detail_ms: float | None = None
+    units_ms: float | None = None
+    total_ms: float | None = None
+    bytes: int = 0
+    retries: int = 0
+    unit_count: int | None = None
+    units_added: int | None = None
+    units_changed: int | None = None
+    units_removed: int | None = None
+    error_class: str | None = None
+    error: str | None = None
+
+
+class SyncRun(BaseModel):
+    id: int
+    status: Literal["running", "ok", "failed"]
+    dry_run: bool
+    started_at: datetime
+    finished_at: datetime | None = None
+    duration_ms: float | None = None
+    total_uuids: int
+    ok_count: int
+    error_count: int
+    documents_written: int
+    units_fetched: int
+    units_added: int
+    units_changed: int
+    units_removed: int
+    bytes: int
+    retries: int
+    documents_upsert_ms: float | None = None
+    units_upsert_ms: float | None = None
+    documents_per_second: float | None = None
+    units_per_second: float | None = None
+    error: str | None = None
+
+
+class SyncRunsResponse(BaseModel):
+    count: int
+    items: list[SyncRun]
+
+
+class SyncRunDetailResponse(BaseModel):
+    run: SyncRun
+    slowest: list[SyncRunItem]
+    failed: list[SyncRunItem]
+
+
+class SyncRunItemsResponse(BaseModel):
+    count: int
+    items: list[SyncRunItem]
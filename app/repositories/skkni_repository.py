@@ -1,13 +1,35 @@
 # app/repositories/skkni_repository.py
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import importlib.util
+import json
 import logging
 import re
+import threading
+import time
 from typing import Any
 
 import httpx
 
 from app.core.config import settings
+from app.utils.resilience import CircuitBreaker, LatencyTracker, ahedged_call, hedged_call
+
+# Opsional: ijson (decode units secara streaming) & orjson (decode penuh yang cepat).
+# Tanpa keduanya repository tetap jalan dengan json stdlib.
+try:
+    import ijson
+except ImportError:  # pragma: no cover - tergantung environment
+    ijson = None
+try:
+    import orjson
+except ImportError:  # pragma: no cover - tergantung environment
+    orjson = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
@@ -16,22 +38,309 @@ BASE = settings.BASE_URL.rstrip("/")
 
 # ---------- HTTP helpers ----------
 
+_HEADERS = {
+    "Accept": "application/json, */*;q=0.1",
+    "User-Agent": "skkni-http-scraper/1.0",
+}
+_TIMEOUT = httpx.Timeout(20.0)
+
+
+@dataclass
+class ClientStats:
+    """Statistik pemakaian pool koneksi (dibaca via client_stats())."""
+
+    requests: int = 0
+    connections: int = 0
+    http2_responses: int = 0
+    hedges: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        reused = max(0, self.requests - self.connections)
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": reused,
+            "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+            "http2_responses": self.http2_responses,
+            "hedges": self.hedges,
+        }
+
+
+_stats = ClientStats()
+_lock = threading.Lock()
+_sync_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+_async_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _http2_available() -> bool:
+    # HTTP/2 butuh paket `h2` (httpx[http2]); tanpa itu jatuh ke HTTP/1.1 keep-alive
+    return settings.HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _limits() -> httpx.Limits:
+    n = max(1, settings.MAX_CONCURRENCY)
+    # headroom untuk hedge: tanpa multiplexing HTTP/2, duplikat request butuh koneksi sendiri; bila pool
+    # hanya n, hedge menunggu slot yang masih dipegang request lambat dan tail latency tidak terpotong
+    total = 2 * n if settings.HEDGE_ENABLED else n
+    return httpx.Limits(max_connections=total, max_keepalive_connections=n, keepalive_expiry=30.0)
+
+
+def _trace(event: str, info: dict[str, Any]) -> None:
+    if event == "connection.connect_tcp.complete":
+        _stats.connections += 1
+
+
+async def _atrace(event: str, info: dict[str, Any]) -> None:
+    _trace(event, info)
+
+
+def _on_request(request: httpx.Request) -> None:
+    _stats.requests += 1
+    request.extensions["trace"] = _trace
+
+
+async def _aon_request(request: httpx.Request) -> None:
+    _stats.requests += 1
+    request.extensions["trace"] = _atrace
+
+
+def _on_response(response: httpx.Response) -> None:
+    if response.http_version == "HTTP/2":
+        _stats.http2_responses += 1
+
+
+async def _aon_response(response: httpx.Response) -> None:
+    _on_response(response)
+
+
+def _client_kwargs() -> dict[str, Any]:
+    return {
+        "timeout": _TIMEOUT,
+        "headers": _HEADERS,
+        "follow_redirects": True,
+        "limits": _limits(),
+        "http2": _http2_available(),
+    }
+
+
+def get_client() -> httpx.Client:
+    """Client sync bersama per proses (keep-alive + HTTP/2 bila tersedia)."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(
+                **_client_kwargs(), event_hooks={"request": [_on_request], "response": [_on_response]}
+            )
+        return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Client async bersama; dibuat ulang bila dipanggil dari event loop lain."""
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    with _lock:
+        if _async_client is None or _async_client.is_closed or _async_loop is not loop:
+            _async_client = httpx.AsyncClient(
+                **_client_kwargs(), event_hooks={"request": [_aon_request], "response": [_aon_response]}
+            )
+            _async_loop = loop
+        return _async_client
+
+
+def close_client() -> None:
+    """Tutup client sync (dipanggil worker/app saat shutdown)."""
+    global _sync_client
+    with _lock:
+        client, _sync_client = _sync_client, None
+    if client is not None:
+        client.close()
+
+
+async def aclose_client() -> None:
+    """Tutup client async milik event loop yang sedang berjalan."""
+    global _async_client, _async_loop
+    with _lock:
+        client, loop = _async_client, _async_loop
+        _async_client, _async_loop = None, None
+    if client is not None and loop is asyncio.get_running_loop():
+        await client.aclose()
+
+
+@dataclass
+class FetchTrace:
+    """Jejak satu blok fetch (lihat track_fetch): request, byte terunduh, hedge."""
+
+    requests: int = 0
+    bytes: int = 0
+    hedges: int = 0
+
+
+_fetch_trace: ContextVar[FetchTrace | None] = ContextVar("fetch_trace", default=None)
+
+
+@contextmanager
+def track_fetch() -> Iterator[FetchTrace]:
+    """Ukur fetch di dalam blok (dipakai worker untuk ledger per UUID)."""
+    trace = FetchTrace()
+    token = _fetch_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _fetch_trace.reset(token)
+
+
+def _trace_request() -> None:
+    # dipanggil di thread/coroutine pemanggil: attempt hedge di executor tidak membawa contextvar
+    trace = _fetch_trace.get()
+    if trace is not None:
+        trace.requests += 1
+
+
+def _trace_bytes(r: httpx.Response) -> None:
+    trace = _fetch_trace.get()
+    if trace is not None:
+        trace.bytes += r.num_bytes_downloaded
+
+
+def client_stats() -> dict[str, Any]:
+    return _stats.as_dict()
 
-def _client() -> httpx.Client:
-    return httpx.Client(
-        timeout=httpx.Timeout(20.0),
-        headers={
-            "Accept": "application/json, */*;q=0.1",
-            "User-Agent": "skkni-http-scraper/1.0",
-        },
-        follow_redirects=True,
-    )
+
+def reset_client_stats() -> None:
+    global _stats
+    _stats = ClientStats()
+
+
+# ---------- Hedged request & circuit breaker ----------
+
+breaker = CircuitBreaker(
+    "kemnaker-api",
+    failure_rate=settings.BREAKER_FAILURE_RATE,
+    min_calls=settings.BREAKER_MIN_CALLS,
+    window=settings.BREAKER_WINDOW,
+    open_seconds=settings.BREAKER_OPEN_SECONDS,
+)
+_latency = LatencyTracker()
+_hedge_pool: ThreadPoolExecutor | None = None
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(
+                max_workers=max(2, 2 * settings.MAX_CONCURRENCY), thread_name_prefix="repo-hedge"
+            )
+        return _hedge_pool
+
+
+def _hedge_delay() -> float | None:
+    """Ambang hedge = persentil latensi terakhir (None bila hedge mati / sampel belum cukup)."""
+    if not settings.HEDGE_ENABLED or len(_latency) < settings.HEDGE_MIN_SAMPLES:
+        return None
+    p = _latency.percentile(settings.HEDGE_PERCENTILE)
+    return None if p is None else max(settings.HEDGE_MIN_DELAY, p)
+
+
+def _is_upstream_failure(r: httpx.Response) -> bool:
+    return r.status_code >= 500 or r.status_code == 429
+
+
+def _count_hedge() -> None:
+    _stats.hedges += 1
+    trace = _fetch_trace.get()
+    if trace is not None:
+        trace.hedges += 1
+
+
+def _record_outcome(r: httpx.Response) -> None:
+    if _is_upstream_failure(r):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def _send(url: str, stream: bool = False) -> httpx.Response:
+    """
+    GET lewat client bersama dengan circuit breaker + hedged request.
+
+    Raises:
+        CircuitOpenError: breaker open (gagal cepat; pemanggil boleh memakai data cache).
+    """
+    breaker.before_call()
+    _trace_request()
+    client = get_client()
+
+    def attempt() -> httpx.Response:
+        t0 = time.perf_counter()
+        r = client.send(client.build_request("GET", url), stream=stream)
+        if not _is_upstream_failure(r):
+            _latency.record(time.perf_counter() - t0)
+        return r
+
+    try:
+        r = hedged_call(attempt, _hedge_delay(), _hedge_executor(), cleanup=httpx.Response.close, on_hedge=_count_hedge)
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # CancelledError / KeyboardInterrupt: tanpa hasil, lepas slot probe half-open
+        breaker.release()
+        raise
+    _record_outcome(r)
+    return r
+
+
+async def _asend(url: str, stream: bool = False) -> httpx.Response:
+    """Versi async _send (attempt yang kalah di-cancel)."""
+    breaker.before_call()
+    _trace_request()
+    client = get_async_client()
+
+    async def attempt() -> httpx.Response:
+        t0 = time.perf_counter()
+        r = await client.send(client.build_request("GET", url), stream=stream)
+        if not _is_upstream_failure(r):
+            _latency.record(time.perf_counter() - t0)
+        return r
+
+    try:
+        r = await ahedged_call(attempt, _hedge_delay(), cleanup=httpx.Response.aclose, on_hedge=_count_hedge)
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # CancelledError / KeyboardInterrupt: tanpa hasil, lepas slot probe half-open
+        breaker.release()
+        raise
+    _record_outcome(r)
+    return r
+
+
+def upstream_state() -> dict[str, Any]:
+    """State breaker + ambang hedge + statistik koneksi, untuk monitoring."""
+    delay = _hedge_delay()
+    return {
+        "breaker": breaker.snapshot(),
+        "hedge_delay": round(delay, 4) if delay is not None else None,
+        "latency_samples": len(_latency),
+        "http": client_stats(),
+    }
+
+
+def _loads(content: bytes) -> Any:
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+def _is_json(r: httpx.Response) -> bool:
+    return "application/json" in r.headers.get("content-type", "")
 
 
 def _json_or_raise(r: httpx.Response) -> Any:
     ctype = r.headers.get("content-type", "")
-    if "application/json" in ctype:
-        return r.json()
+    if _is_json(r):
+        return _loads(r.content)
     snippet = r.text[:200].replace("\n", "")
     raise ValueError(f"Non-JSON response for {r.request.url}. content-type={ctype} body~200='{snippet}'")
 
@@ -100,7 +409,7 @@ def normalize_document(
     }
 
 
-def normalize_units(doc_uuid: str, raw_units: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def normalize_units(doc_uuid: str, raw_units: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
     """
     Konversi list unit mentah => {doc_uuid,kode_unit,judul_unit}.
     Kunci fleksibel: kode_unit/unitCode/code/kode dan judul_unit/nama/title/name.
@@ -124,11 +433,22 @@ def fetch_document_detail(uuid: str) -> dict[str, Any]:
     Worker yang akan memanggil normalize_document(raw, listing_url=...).
     """
     url = f"{BASE}/v1/public/documents/{uuid}"
-    with _client() as c:
-        r = c.get(url)
-        r.raise_for_status()
-        raw = _json_or_raise(r)
+    r = _send(url)
+    _trace_bytes(r)
+    r.raise_for_status()
+    return _document_from_payload(_json_or_raise(r), uuid)
+
+
+async def afetch_document_detail(uuid: str) -> dict[str, Any]:
+    """Versi async fetch_document_detail (memakai get_async_client)."""
+    url = f"{BASE}/v1/public/documents/{uuid}"
+    r = await _asend(url)
+    _trace_bytes(r)
+    r.raise_for_status()
+    return _document_from_payload(_json_or_raise(r), uuid)
+
 
+def _document_from_payload(raw: Any, uuid: str) -> dict[str, Any]:
     # Banyak API membungkus di "data"
     if isinstance(raw, dict) and "data" in raw and isinstance(raw["data"], dict):
         raw = raw["data"]
@@ -157,14 +477,214 @@ def _extract_list_from_payload(payload: Any, uuid: str, url: str) -> list[dict[s
     return []
 
 
+# ---------- Streaming decode (payload units) ----------
+
+# Body di bawah ukuran ini cukup di-decode penuh; di atasnya (atau tanpa Content-Length) di-stream
+STREAM_MIN_BYTES = 256 * 1024
+
+# Lokasi list unit yang dikenal (prefix ijson) -> prioritas, sama dengan urutan _extract_list_from_payload
+_UNIT_LIST_RANK = {
+    "": 0,
+    "data": 1,
+    "items": 2,
+    "result": 3,
+    "rows": 4,
+    "data.items": 5,
+    "data.result": 6,
+    "data.rows": 7,
+}
+_DATA_CHILDREN = ("data.items", "data.result", "data.rows")
+_START_EVENTS = frozenset({"start_map", "start_array"})
+_END_EVENTS = frozenset({"end_map", "end_array"})
+_NOTHING = object()
+
+
+class _UnitListScanner:
+    """
+    Terima event ijson satu per satu dan keluarkan elemen list unit dengan prioritas yang sama
+    seperti _extract_list_from_payload (data, items, result, rows, lalu data.items/result/rows).
+
+    Elemen di-stream langsung bila tidak ada lagi key berprioritas lebih tinggi yang mungkin
+    muncul; selain itu ditahan dulu, dan dibuang bila list berprioritas lebih tinggi ternyata ada.
+    """
+
+    def __init__(self) -> None:
+        self.item_prefix: str | None = None
+        self.rank: int | None = None
+        self.buffer: list[Any] | None = None
+        # prefix kandidat yang sudah pasti bukan list (atau tidak mungkin muncul lagi)
+        self.settled: set[str] = set()
+        self.builder: Any = None
+        self.depth = 0
+
+    @property
+    def found(self) -> bool:
+        return self.item_prefix is not None
+
+    def _settle(self, prefix: str, event: str) -> None:
+        if prefix in _UNIT_LIST_RANK and event != "start_array":
+            self.settled.add(prefix)
+        if prefix == "data" and event not in ("start_map", "map_key"):
+            self.settled.update(_DATA_CHILDREN)  # data bukan object, atau object-nya sudah selesai
+        elif prefix == "" and event in _END_EVENTS:
+            self.settled.update(_UNIT_LIST_RANK)
+
+    def _outranked(self) -> bool:
+        """Masih mungkinkah list berprioritas lebih tinggi dari kandidat sekarang muncul?"""
+        rank = self.rank if self.rank is not None else len(_UNIT_LIST_RANK)
+        return any(r < rank and p not in self.settled for p, r in _UNIT_LIST_RANK.items())
+
+    def _build(self, event: str, value: Any) -> Any:
+        if self.builder is None:
+            self.builder = ijson.ObjectBuilder()
+            self.builder.event(event, value)
+            self.depth = 1
+            return _NOTHING
+        self.builder.event(event, value)
+        if event in _START_EVENTS:
+            self.depth += 1
+        elif event in _END_EVENTS:
+            self.depth -= 1
+            if self.depth == 0:
+                item, self.builder = self.builder.value, None
+                return item
+        return _NOTHING
+
+    def feed(self, prefix: str, event: str, value: Any) -> list[Any]:
+        """Proses satu event; return elemen yang sudah boleh dikeluarkan (bisa kosong)."""
+        out: list[Any] = []
+        rank = _UNIT_LIST_RANK.get(prefix)
+        if event == "start_array" and rank is not None and (self.rank is None or rank < self.rank):
+            # list berprioritas lebih tinggi: kandidat lama (dan elemen tertahannya) dibuang
+            self.rank, self.item_prefix = rank, f"{prefix}.item" if prefix else "item"
+            self.builder, self.buffer = None, []
+        elif self.builder is not None or (prefix == self.item_prefix and event in _START_EVENTS):
+            item = self._build(event, value)
+            if item is not _NOTHING:
+                (out if self.buffer is None else self.buffer).append(item)
+        self._settle(prefix, event)
+        if self.buffer is not None and not self._outranked():
+            out.extend(self.buffer)
+            self.buffer = None
+        return out
+
+    def finish(self) -> list[Any]:
+        """Elemen yang masih tertahan di akhir body."""
+        items, self.buffer = self.buffer or [], None
+        return items
+
+
+class _ChunkReader:
+    """File-like minimal di atas iterator bytes (untuk ijson); read() tidak melebihi `size`."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._it = iter(chunks)
+        self._buf = b""
+
+    def _take(self, size: int) -> bytes:
+        if size < 0 or size >= len(self._buf):
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._buf:
+            chunk = next(self._it, None)
+            if chunk is None:
+                return b""
+            self._buf = chunk
+        return self._take(size)
+
+
+class _AsyncChunkReader(_ChunkReader):
+    def __init__(self, chunks: AsyncIterator[bytes]) -> None:
+        self._ait = chunks.__aiter__()
+        self._buf = b""
+
+    async def read(self, size: int = -1) -> bytes:  # type: ignore[override]
+        while not self._buf:
+            try:
+                self._buf = await self._ait.__anext__()
+            except StopAsyncIteration:
+                return b""
+        return self._take(size)
+
+
+def iter_units_payload(chunks: Iterable[bytes], uuid: str = "", url: str = "") -> Iterator[dict[str, Any]]:
+    """Stream elemen list unit dari potongan body JSON tanpa menyimpan seluruh body/tree."""
+    scanner = _UnitListScanner()
+    for prefix, event, value in ijson.parse(_ChunkReader(chunks), use_float=True):
+        for item in scanner.feed(prefix, event, value):
+            if isinstance(item, dict):
+                yield item
+    for item in scanner.finish():
+        if isinstance(item, dict):
+            yield item
+    if not scanner.found:
+        logger.warning("Unexpected units payload for %s: no list found (url=%s)", uuid, url)
+
+
+async def aiter_units_payload(
+    chunks: AsyncIterator[bytes], uuid: str = "", url: str = ""
+) -> AsyncIterator[dict[str, Any]]:
+    scanner = _UnitListScanner()
+    async for prefix, event, value in ijson.parse_async(_AsyncChunkReader(chunks), use_float=True):
+        for item in scanner.feed(prefix, event, value):
+            if isinstance(item, dict):
+                yield item
+    for item in scanner.finish():
+        if isinstance(item, dict):
+            yield item
+    if not scanner.found:
+        logger.warning("Unexpected units payload for %s: no list found (url=%s)", uuid, url)
+
+
+def _should_stream(r: httpx.Response) -> bool:
+    if ijson is None or not _is_json(r):
+        return False
+    length = r.headers.get("content-length", "")
+    return not (length.isdigit() and int(length) < STREAM_MIN_BYTES)
+
+
+def _log_units(uuid: str, units: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    logger.info("[repo] units %s: %d", uuid, len(units))
+    return units
+
+
 def fetch_units_for_document(uuid: str) -> list[dict[str, Any]]:
     url = f"{BASE}/v1/public/documents/{uuid}/units?limit=1000"
-    with _client() as c:
-        r = c.get(url)
+    r = _send(url, stream=True)
+    try:
         r.raise_for_status()
-        payload = _json_or_raise(r)
+        if _should_stream(r):
+            return _log_units(uuid, normalize_units(uuid, iter_units_payload(r.iter_bytes(), uuid, url)))
+        r.read()
+    finally:
+        r.close()
+        _trace_bytes(r)
+    return _units_from_payload(_json_or_raise(r), uuid, url)
 
+
+async def afetch_units_for_document(uuid: str) -> list[dict[str, Any]]:
+    """Versi async fetch_units_for_document."""
+    url = f"{BASE}/v1/public/documents/{uuid}/units?limit=1000"
+    r = await _asend(url, stream=True)
+    try:
+        r.raise_for_status()
+        if _should_stream(r):
+            units: list[dict[str, Any]] = []
+            # normalisasi per elemen: list mentah tidak pernah ditahan utuh
+            async for u in aiter_units_payload(r.aiter_bytes(), uuid, url):
+                units.extend(normalize_units(uuid, (u,)))
+            return _log_units(uuid, units)
+        await r.aread()
+    finally:
+        await r.aclose()
+        _trace_bytes(r)
+    return _units_from_payload(_json_or_raise(r), uuid, url)
+
+
+def _units_from_payload(payload: Any, uuid: str, url: str) -> list[dict[str, Any]]:
     units_raw = _extract_list_from_payload(payload, uuid, url)
-    units = normalize_units(uuid, units_raw)
-    logger.info("[repo] units %s: %d", uuid, len(units))
-    return units
+    return _log_units(uuid, normalize_units(uuid, units_raw))
@@ -0,0 +1,142 @@
+# app/services/read_db.py
+"""
+Read snapshot: salinan SQLite read-only dari DB utama untuk endpoint katalog.
+
+Jalankan:  python -m app.services.read_db [--force]
+
+DB utama di-`VACUUM INTO` file sementara (snapshot konsisten satu transaksi baca, index ikut
+tersalin & halaman dipadatkan), lalu di-ANALYZE, dicek integritasnya, di-fsync dan diterbitkan
+atomik: os.replace ke READ_DB_DIR/skkni-read-gen-<generation>.db, kemudian manifest latest.json.
+Proses API (app.core.db.read_replica) melihat manifest baru dan pindah ke file tersebut;
+worker tidak pernah menulis ke file yang sedang dibaca API.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import UTC, datetime
+import json
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import time
+
+from app.core.config import settings
+from app.core.db import READ_MANIFEST_NAME, engine, get_session, init_db
+from app.db import crud, models
+
+logger = logging.getLogger(__name__)
+
+FILE_PREFIX = "skkni-read-gen-"
+
+
+def read_manifest(out_dir: str | None = None) -> dict | None:
+    """Manifest read snapshot terbaru (None jika belum pernah diterbitkan)."""
+    path = Path(out_dir or settings.READ_DB_DIR) / READ_MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _publish_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / f".{READ_MANIFEST_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, root / READ_MANIFEST_NAME)
+
+
+def _prune(root: Path, keep: int, current: str) -> None:
+    # Aman walau API masih membaca file lama: inode tetap hidup sampai koneksinya ditutup
+    files = sorted(p for p in root.glob(f"{FILE_PREFIX}*.db") if p.name != current)
+    for p in files[: max(0, len(files) - (keep - 1))]:
+        p.unlink(missing_ok=True)
+
+
+def _finalize(path: Path) -> int:
+    """Siapkan salinan untuk dibaca saja: journal DELETE, statistik planner, cek integritas. Return generasi."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("ANALYZE")
+        check = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            raise RuntimeError(f"read snapshot rusak: {check}")
+        row = conn.execute(f"SELECT generation FROM {models.SyncState.__tablename__} WHERE id = 1").fetchone()
+    finally:
+        conn.close()
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+    return int(row[0]) if row else 0
+
+
+def build_read_db(out_dir: str | None = None, force: bool = False, keep: int | None = None) -> tuple[dict, bool]:
+    """
+    Bangun & terbitkan read snapshot untuk generasi sinkronisasi saat ini.
+
+    Returns:
+        (manifest, built) — built=False bila snapshot generasi ini sudah terbit (kecuali force).
+
+    Raises:
+        RuntimeError: DATABASE_URL bukan SQLite, atau salinan gagal quick_check.
+    """
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError("read snapshot hanya didukung untuk DATABASE_URL SQLite")
+    directory = out_dir or settings.READ_DB_DIR
+    if not directory:
+        raise RuntimeError("READ_DB_DIR belum diset")
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+
+    with get_session() as db:
+        generation = crud.get_sync_generation(db)
+    current = read_manifest(str(root))
+    if not force and current and current.get("generation") == generation and (root / current["file"]).exists():
+        return current, False
+
+    t0 = time.perf_counter()
+    tmp = root / f".read-{os.getpid()}.db.tmp"
+    tmp.unlink(missing_ok=True)
+    try:
+        # VACUUM tidak boleh di dalam transaksi
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM INTO ?", (str(tmp),))
+        # generasi dibaca dari salinannya: sync yang commit di sela-sela tetap tercatat benar
+        generation = _finalize(tmp)
+        name = f"{FILE_PREFIX}{generation:06d}.db"
+        os.replace(tmp, root / name)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    manifest = {
+        "generation": generation,
+        "file": name,
+        "bytes": (root / name).stat().st_size,
+        "build_ms": round((time.perf_counter() - t0) * 1000, 3),
+        "created_at": datetime.now(UTC).isoformat(),
+    }
+    _publish_manifest(root, manifest)
+    _prune(root, keep or settings.READ_DB_KEEP, current=name)
+    logger.info("[read-db] generation %s diterbitkan ke %s", generation, root / name)
+    return manifest, True
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Bangun & terbitkan read snapshot SQLite untuk API")
+    parser.add_argument("--out", default=None, help="default: READ_DB_DIR")
+    parser.add_argument("--force", action="store_true", help="bangun ulang walau generasi sama")
+    args = parser.parse_args(argv)
+
+    init_db()
+    manifest, built = build_read_db(out_dir=args.out, force=args.force)
+    state = "diterbitkan" if built else "sudah terbaru"
+    mb = manifest["bytes"] / 1e6
+    print(f"[read-db] generation {manifest['generation']} {state} ({manifest['file']}, {mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
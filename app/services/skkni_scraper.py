@@ -1,8 +1,10 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
 import re
-from typing import cast
 
-from bs4 import BeautifulSoup
 import httpx
+from lxml import html as lxml_html
 
 from app.core.config import settings
 
@@ -11,6 +13,13 @@ API_DOC_URL = settings.API_BASE.rstrip("/") + "/v1/public/documents/{uuid}"
 
 
 _uuid_re = re.compile(r"/documents/([0-9a-fA-F-]+)/download")
+_year_re = re.compile(r"(\d{4})")
+
+# Satu pass XPath: hanya <a> yang mengarah ke endpoint download dokumen
+_XP_DOWNLOAD_LINKS = "//a[@href][contains(@href, '/documents/') and contains(@href, '/download')]"
+# Parent card terdekat & heading pertama di dalamnya (heuristik, bisa berubah)
+_XP_CARD = "ancestor::*[self::div or self::article or self::li][1]"
+_XP_HEADING = "(.//*[self::h1 or self::h2 or self::h3 or self::h4])[1]"
 
 
 def _extract_uuid(href: str) -> str | None:
@@ -18,56 +27,228 @@ def _extract_uuid(href: str) -> str | None:
     return m.group(1) if m else None
 
 
+def _text(el) -> str:
+    # setara BeautifulSoup get_text(strip=True): potongan teks di-strip lalu digabung tanpa spasi;
+    # isi <script>/<style> (dan komentar) bukan teks yang tampil, jadi dilewati
+    return "".join(t.strip() for t in el.xpath(".//text()[not(ancestor::script or ancestor::style)]"))
+
+
+def parse_listing_page(content: str | bytes, listing_url: str) -> Iterator[dict]:
+    """
+    Ekstrak item (uuid, judul_skkni, unduh_url, listing_url) dari satu halaman listing
+    dengan lxml + XPath terarah (tanpa membangun pohon BeautifulSoup).
+    """
+    if not content:
+        return
+    root = lxml_html.fromstring(content)
+    api_base = settings.API_BASE.rstrip("/")
+    for a in root.xpath(_XP_DOWNLOAD_LINKS):
+        href = a.get("href")
+        uuid = _extract_uuid(href)
+        if not uuid:
+            continue
+
+        title = None
+        cards = a.xpath(_XP_CARD)
+        if cards:
+            heads = cards[0].xpath(_XP_HEADING)
+            if heads:
+                title = _text(heads[0]) or None
+        if not title:
+            # fallback: text link
+            title = _text(a) or f"Dokumen {uuid}"
+
+        yield {
+            "uuid": uuid,
+            "judul_skkni": title,
+            "unduh_url": href if href.startswith("http") else api_base + href,
+            "listing_url": listing_url,
+        }
+
+
+async def _fetch_listing_page(client: httpx.AsyncClient, sem: asyncio.Semaphore, url: str) -> bytes:
+    async with sem:
+        resp = await client.get(url)
+        resp.raise_for_status()
+        return resp.content
+
+
+async def aiter_document_listing(
+    page_from: int,
+    page_to: int,
+    limit: int,
+    client: httpx.AsyncClient | None = None,
+    concurrency: int | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Stream item listing dokumen halaman page_from..page_to.
+    Halaman diambil paralel (dibatasi `concurrency`, default MAX_CONCURRENCY), tetapi item
+    di-yield berurutan per halaman dan langsung di-dedupe by uuid (kemunculan pertama menang).
+    """
+    own_client = client is None
+    if client is None:
+        client = _async_client(max(1, concurrency or settings.MAX_CONCURRENCY))
+    sem = asyncio.Semaphore(max(1, concurrency or settings.MAX_CONCURRENCY))
+    urls = [f"{LIST_URL}?limit={limit}&page={page}" for page in range(page_from, page_to + 1)]
+    tasks = [asyncio.create_task(_fetch_listing_page(client, sem, url)) for url in urls]
+    seen: set[str] = set()
+    try:
+        for url, task in zip(urls, tasks, strict=True):
+            content = await task
+            for it in parse_listing_page(content, url):
+                if it["uuid"] in seen:
+                    continue
+                seen.add(it["uuid"])
+                yield it
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own_client:
+            await client.aclose()
+
+
 def scrape_document_listing(page_from: int, page_to: int, limit: int) -> list[dict]:
     """
     Scrape halaman listing dokumen SKKNI.
     Hasil mentah: hanya judul & unduh_url + uuid + listing_url.
     Detail (sektor/bidang/tahun/nomor) akan diisi di langkah enrich.
     """
-    items: list[dict] = []
-    with httpx.Client(timeout=30.0) as client:
-        for page in range(page_from, page_to + 1):
-            url = f"{LIST_URL}?limit={limit}&page={page}"
-            resp = client.get(url)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "lxml")
-
-            # heuristik: cari tautan unduh (href mengandung '/v1/public/documents/<uuid>/download')
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                uuid = _extract_uuid(href)
-                if not uuid:
-                    continue
 
-                # naik ke parent card untuk ambil judul (heuristik, bisa berubah)
-                title = None
-                card = a.find_parent(["div", "article", "li"])
-                if card:
-                    # cari elemen text besar
-                    h = card.find(["h1", "h2", "h3", "h4"])
-                    if h and h.get_text(strip=True):
-                        title = h.get_text(strip=True)
-                if not title:
-                    # fallback: text link
-                    title = a.get_text(strip=True) or f"Dokumen {uuid}"
-
-                items.append(
-                    {
-                        "uuid": uuid,
-                        "judul_skkni": title,
-                        "unduh_url": href if href.startswith("http") else settings.API_BASE.rstrip("/") + href,
-                        "listing_url": url,
-                    }
-                )
-    # de-dupe by uuid (ambil pertama)
-    seen = set()
-    deduped = []
-    for it in items:
-        if it["uuid"] in seen:
-            continue
-        seen.add(it["uuid"])
-        deduped.append(it)
-    return deduped
+    async def _collect() -> list[dict]:
+        return [it async for it in aiter_document_listing(page_from, page_to, limit)]
+
+    return asyncio.run(_collect())
+
+
+def _nomor_skkni(number, tahun) -> str | None:
+    return f"Nomor {number} Tahun {tahun}" if number and tahun else (number or None)
+
+
+def _from_api(d: dict, js: dict) -> tuple[dict, list[dict]]:
+    """Payload `data` API dokumen -> (dokumen lengkap, daftar unit)."""
+    uuid = d["uuid"]
+
+    # ambil taxonomy
+    sektor = None
+    bidang = None
+    sub_bidang = None
+
+    core = js.get("core_category") or {}
+    cat = core.get("category") or {}
+    if cat.get("name"):
+        sektor = cat["name"]
+    if core.get("name"):
+        bidang = core["name"]
+
+    # meta dokumen
+    nomor_kepmen = js.get("number_kepmen")
+    number = js.get("number")
+    title = js.get("title") or d.get("judul_skkni")
+    published_at = js.get("published_at") or js.get("created_at")
+    # tahun dari nomor/ published_at (fallback sederhana)
+    tahun = None
+    if number:
+        m = _year_re.search(str(number))
+        if m:
+            tahun = m.group(1)
+    if not tahun and published_at:
+        m = _year_re.search(str(published_at))
+        if m:
+            tahun = m.group(1)
+
+    nomor_skkni = _nomor_skkni(number, tahun)
+    listing_url = d.get("listing_url")
+    doc = {
+        "uuid": uuid,
+        "judul_skkni": title,
+        "nomor_skkni": nomor_skkni,
+        "sektor": sektor,
+        "bidang": bidang,
+        "sub_bidang": sub_bidang,
+        "tahun": tahun,
+        "nomor_kepmen": nomor_kepmen,
+        "unduh_url": d.get("unduh_url"),
+        "listing_url": listing_url,
+    }
+
+    # units
+    unit_listing_url = listing_url.replace("/dokumen", "/dokumen-unit") if listing_url else None
+    units = [
+        {
+            "doc_uuid": uuid,
+            "kode_unit": u.get("code"),
+            "judul_unit": (u.get("title") or "").strip(),
+            "nomor_skkni": nomor_skkni,
+            "sektor": sektor,
+            "bidang": bidang,
+            "sub_bidang": sub_bidang,
+            "tahun": tahun,
+            "nomor_kepmen": nomor_kepmen,
+            "unduh_url": d.get("unduh_url"),
+            "listing_url": unit_listing_url,
+        }
+        for u in js.get("units") or []
+    ]
+    return doc, units
+
+
+def _async_client(concurrency: int) -> httpx.AsyncClient:
+    # satu pool koneksi keep-alive dipakai bersama listing & enrich
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(timeout=30.0, limits=limits)
+
+
+async def _enrich_one(client: httpx.AsyncClient, sem: asyncio.Semaphore, d: dict) -> tuple[dict, list[dict]]:
+    async with sem:
+        r = await client.get(API_DOC_URL.format(uuid=d["uuid"]))
+    if r.status_code != 200:
+        # tetap push data minimal, biar tidak blank total
+        return d | {"nomor_skkni": None, "tahun": None}, []
+    return _from_api(d, r.json().get("data", {}))
+
+
+async def _aiter_items(docs: Iterable[dict] | AsyncIterable[dict]) -> AsyncIterator[dict]:
+    if isinstance(docs, AsyncIterable):
+        async for d in docs:
+            yield d
+    else:
+        for d in docs:
+            yield d
+
+
+async def aiter_enriched_documents(
+    docs: Iterable[dict] | AsyncIterable[dict],
+    client: httpx.AsyncClient | None = None,
+    concurrency: int | None = None,
+) -> AsyncIterator[tuple[dict, list[dict]]]:
+    """
+    Enrich dokumen via API publik (/v1/public/documents/{uuid}) secara paralel.
+
+    Maksimal `concurrency` request berjalan bersamaan (default MAX_CONCURRENCY). Hasil
+    `(doc, units)` di-yield sesuai urutan input begitu siap, dan input boleh berupa async
+    iterable (mis. `aiter_document_listing`) sehingga enrich mulai sebelum listing selesai.
+    """
+    limit = max(1, concurrency or settings.MAX_CONCURRENCY)
+    own_client = client is None
+    if client is None:
+        client = _async_client(limit)
+    sem = asyncio.Semaphore(limit)
+    # jendela task in-flight dibatasi supaya input besar tidak menumpuk di memori
+    window: deque[asyncio.Task] = deque()
+    try:
+        async for d in _aiter_items(docs):
+            window.append(asyncio.create_task(_enrich_one(client, sem, d)))
+            if len(window) >= limit * 2:
+                yield await window.popleft()
+        while window:
+            yield await window.popleft()
+    finally:
+        for t in window:
+            t.cancel()
+        await asyncio.gather(*window, return_exceptions=True)
+        if own_client:
+            await client.aclose()
 
 
 def enrich_documents_from_api(docs: list[dict]) -> tuple[list[dict], list[dict]]:
@@ -77,91 +258,32 @@ def enrich_documents_from_api(docs: list[dict]) -> tuple[list[dict], list[dict]]
       - daftar dokumen lengkap (dengan sektor/bidang/tahun/nomor_kepmen)
       - daftar unit yang ditarik dari 'units' pada response API
     """
-    full_docs: list[dict] = []
-    units: list[dict] = []
 
-    with httpx.Client(timeout=30.0) as client:
-        for d in docs:
-            uuid = d["uuid"]
-            url = API_DOC_URL.format(uuid=uuid)
-            r = client.get(url)
-            if r.status_code != 200:
-                # tetap push data minimal, biar tidak blank total
-                full_docs.append(d | {"nomor_skkni": None, "tahun": None})
-                continue
-
-            js = r.json().get("data", {})
-
-            # ambil taxonomy
-            sektor = None
-            bidang = None
-            sub_bidang = None
-
-            core = js.get("core_category") or {}
-            cat = core.get("category") or {}
-            if cat.get("name"):
-                sektor = cat["name"]
-            if core.get("name"):
-                bidang = core["name"]
-
-            # meta dokumen
-            nomor_kepmen = js.get("number_kepmen")
-            number = js.get("number")
-            title = js.get("title") or d.get("judul_skkni")
-            published_at = js.get("published_at") or js.get("created_at")
-            # tahun dari nomor/ published_at (fallback sederhana)
-            tahun = None
-            if number:
-                m = re.search(r"(\d{4})", str(number))
-                if m:
-                    tahun = m.group(1)
-            if not tahun and published_at:
-                m = re.search(r"(\d{4})", str(published_at))
-                if m:
-                    tahun = m.group(1)
-
-            full_docs.append(
-                {
-                    "uuid": uuid,
-                    "judul_skkni": title,
-                    "nomor_skkni": f"Nomor {number} Tahun {tahun}" if number and tahun else (number or None),
-                    "sektor": sektor,
-                    "bidang": bidang,
-                    "sub_bidang": sub_bidang,
-                    "tahun": tahun,
-                    "nomor_kepmen": nomor_kepmen,
-                    "unduh_url": d.get("unduh_url"),
-                    "listing_url": d.get("listing_url"),
-                }
-            )
-
-            # units
-            for u in js.get("units") or []:
-                units.append(
-                    {
-                        "doc_uuid": uuid,
-                        "kode_unit": u.get("code"),
-                        "judul_unit": (u.get("title") or "").strip(),
-                        "nomor_skkni": f"Nomor {number} Tahun {tahun}" if number and tahun else (number or None),
-                        "sektor": sektor,
-                        "bidang": bidang,
-                        "sub_bidang": sub_bidang,
-                        "tahun": tahun,
-                        "nomor_kepmen": nomor_kepmen,
-                        "unduh_url": d.get("unduh_url"),
-                        "listing_url": cast(str, d.get("listing_url")).replace("/dokumen", "/dokumen-unit")
-                        if d.get("listing_url")
-                        else None,
-                    }
-                )
-
-    return full_docs, units
+    async def _collect() -> tuple[list[dict], list[dict]]:
+        full_docs: list[dict] = []
+        units: list[dict] = []
+        async for doc, doc_units in aiter_enriched_documents(docs):
+            full_docs.append(doc)
+            units.extend(doc_units)
+        return full_docs, units
+
+    return asyncio.run(_collect())
 
 
 def scrape_documents_and_units(page_from: int, page_to: int, limit: int) -> tuple[list[dict], list[dict]]:
     """
     Kombinasi: scrape listing -> enrich ke API -> return (docs, units)
+    Listing & enrich berjalan sebagai satu pipeline di atas satu client (pool koneksi dipakai ulang).
     """
-    base_docs = scrape_document_listing(page_from, page_to, limit)
-    full_docs, units = enrich_documents_from_api(base_docs)
-    return full_docs, units
+
+    async def _run() -> tuple[list[dict], list[dict]]:
+        full_docs: list[dict] = []
+        units: list[dict] = []
+        async with _async_client(max(1, settings.MAX_CONCURRENCY)) as client:
+            listing = aiter_document_listing(page_from, page_to, limit, client=client)
+            async for doc, doc_units in aiter_enriched_documents(listing, client=client):
+                full_docs.append(doc)
+                units.extend(doc_units)
+        return full_docs, units
+
+    return asyncio.run(_run())
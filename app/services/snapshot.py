@@ -0,0 +1,231 @@
+# app/services/snapshot.py
+"""
+Snapshot kolumnar (Parquet / Arrow IPC) dari tabel documents & units untuk analitik.
+
+Jalankan:  python -m app.services.snapshot [--format parquet|arrow] [--force]
+
+Snapshot ditulis per batch (memori konstan) ke SNAPSHOT_DIR/gen-<generation>-<format>/
+dan hanya dibangun ulang bila generasi sinkronisasi (lihat crud.bump_sync_generation) berubah.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Literal
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import get_session, init_db
+from app.db import crud
+
+logger = logging.getLogger(__name__)
+
+SnapshotFormat = Literal["parquet", "arrow"]
+
+MANIFEST_NAME = "latest.json"
+ENTITIES = ("documents", "units")
+
+
+def _pyarrow() -> Any:
+    # Import lazy: pyarrow berat & hanya dibutuhkan di jalur snapshot
+    try:
+        import pyarrow as pa
+    except ImportError as e:  # pragma: no cover - tergantung environment
+        raise RuntimeError("pyarrow belum terpasang (pip install pyarrow)") from e
+    return pa
+
+
+def _schema(pa: Any, entity: str) -> Any:
+    fields = crud.UNIT_FIELDS if entity == "units" else crud.DOCUMENT_FIELDS
+    types = {"id": pa.int64(), "updated_at": pa.timestamp("us")}
+    return pa.schema([(f, types.get(f, pa.string())) for f in fields])
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    buf: list[dict] = []
+    for r in rows:
+        buf.append(r)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def _coerce_row(r: dict) -> dict:
+    ts = r.get("updated_at")
+    if isinstance(ts, str):
+        r["updated_at"] = datetime.fromisoformat(ts)
+    return r
+
+
+def _write_entity(
+    path: Path,
+    rows: Iterable[dict],
+    schema: Any,
+    fmt: SnapshotFormat,
+    compression: str | None,
+    batch_size: int,
+) -> int:
+    """Tulis rows ke satu file kolumnar, batch demi batch. Return jumlah baris."""
+    pa = _pyarrow()
+    sink = None
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(str(path), schema, compression=compression or "none")
+    else:
+        sink = pa.OSFile(str(path), "wb")
+        options = pa.ipc.IpcWriteOptions(compression=compression) if compression else None
+        writer = pa.ipc.new_file(sink, schema, options=options)
+
+    total = 0
+    try:
+        for chunk in _chunks(rows, batch_size):
+            batch = pa.RecordBatch.from_pylist([_coerce_row(r) for r in chunk], schema=schema)
+            writer.write_batch(batch)
+            total += batch.num_rows
+    finally:
+        writer.close()
+        if sink is not None:
+            sink.close()
+    return total
+
+
+def read_manifest(out_dir: str | None = None) -> dict | None:
+    """Manifest snapshot terbaru (None jika belum pernah dibuat)."""
+    path = Path(out_dir or settings.SNAPSHOT_DIR) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _publish_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / f".{MANIFEST_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, root / MANIFEST_NAME)
+
+
+def _prune(root: Path, keep: int, current: str) -> None:
+    gens = sorted(p for p in root.glob("gen-*") if p.is_dir() and p.name != current)
+    for p in gens[: max(0, len(gens) - (keep - 1))]:
+        shutil.rmtree(p, ignore_errors=True)
+
+
+def _begin_read(db: Session) -> None:
+    """Mulai transaksi baca eksplisit: semua chunk keyset melihat satu versi DB yang sama."""
+    if db.get_bind().dialect.name == "sqlite":
+        # pysqlite tidak mengirim BEGIN untuk SELECT (tiap statement autocommit sendiri)
+        db.execute(text("BEGIN"))
+    else:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+def build_snapshot(
+    out_dir: str | None = None,
+    fmt: SnapshotFormat = "parquet",
+    compression: str | None = "zstd",
+    batch_size: int = 10_000,
+    force: bool = False,
+    keep: int = 2,
+) -> tuple[dict, bool]:
+    """
+    Bangun snapshot kolumnar documents & units untuk generasi sinkronisasi saat ini.
+
+    Generasi, documents & units dibaca dalam satu transaksi baca, jadi sync yang commit di
+    tengah ekspor tidak membuat documents/units saling tidak cocok.
+
+    Returns:
+        (manifest, built) — built=False bila snapshot generasi ini sudah ada (kecuali force).
+    """
+    root = Path(out_dir or settings.SNAPSHOT_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    pa = _pyarrow()
+
+    with get_session() as db:
+        _begin_read(db)
+        generation = crud.get_sync_generation(db)
+        current = read_manifest(str(root))
+        if (
+            not force
+            and current
+            and current.get("generation") == generation
+            and current.get("format") == fmt
+            and (root / current["dir"]).is_dir()
+        ):
+            return current, False
+
+        name = f"gen-{generation:06d}-{fmt}"
+        tmp_dir = root / f".{name}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        files: dict[str, dict] = {}
+        try:
+            for entity in ENTITIES:
+                filename = f"{entity}.{fmt}"
+                rows = (
+                    crud.iter_units(db, chunk_size=batch_size)
+                    if entity == "units"
+                    else crud.iter_documents(db, chunk_size=batch_size)
+                )
+                n = _write_entity(tmp_dir / filename, rows, _schema(pa, entity), fmt, compression, batch_size)
+                files[entity] = {"file": filename, "rows": n, "bytes": (tmp_dir / filename).stat().st_size}
+
+            final_dir = root / name
+            shutil.rmtree(final_dir, ignore_errors=True)
+            os.replace(tmp_dir, final_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    manifest = {
+        "generation": generation,
+        "format": fmt,
+        "compression": compression,
+        "dir": name,
+        "created_at": datetime.now(UTC).isoformat(),
+        "files": files,
+    }
+    _publish_manifest(root, manifest)
+    _prune(root, keep, current=name)
+    logger.info("[snapshot] generation %s (%s) ditulis ke %s", generation, fmt, final_dir)
+    return manifest, True
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Snapshot kolumnar documents & units")
+    parser.add_argument("--format", dest="fmt", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--compression", default="zstd", help="zstd/lz4/snappy/none")
+    parser.add_argument("--out", default=None, help="default: SNAPSHOT_DIR")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--force", action="store_true", help="bangun ulang walau generasi sama")
+    args = parser.parse_args(argv)
+
+    init_db()
+    compression = None if args.compression == "none" else args.compression
+    manifest, built = build_snapshot(
+        out_dir=args.out,
+        fmt=args.fmt,
+        compression=compression,
+        batch_size=args.batch_size,
+        force=args.force,
+    )
+    state = "dibuat" if built else "sudah terbaru"
+    rows = ", ".join(f"{k}: {v['rows']}" for k, v in manifest["files"].items())
+    print(f"[snapshot] generation {manifest['generation']} {state} ({manifest['dir']}; {rows})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,177 @@
-"""File IO helpers for saving CSV/XLSX if needed later."""
+"""
+File IO helpers: writer CSV/XLSX/Odoo yang streaming.
 
-import pandas as pd
+Semua writer menerima iterable apa pun (list, generator, `crud.iter_units(db)`, atau hasil
+`Session.execute(...)`) dan menulis baris demi baris, jadi memori konstan berapa pun jumlah baris.
+Tanpa `fields` header diambil dari key baris pertama plus kolom overflow `OVERFLOW_COLUMN`: key yang baru
+muncul di baris belakang ditulis ke sana sebagai objek JSON, bukan dibuang diam-diam.
+"""
 
+from __future__ import annotations
 
-def save_csv(records: list[dict], path: str) -> None:
-    pd.DataFrame(records).to_csv(path, index=False)
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+import csv
+from itertools import chain
+import json
+from typing import Any
+from xml.sax.saxutils import escape, quoteattr
 
+from app.db import crud
+from app.utils.parsing import make_unit_id
 
-def save_xlsx(records: list[dict], path: str) -> None:
-    pd.DataFrame(records).to_excel(path, index=False)
+# Kolom Odoo (field model) -> key sumber di dict unit
+ODOO_UNIT_COLUMNS: dict[str, str] = {
+    "name": "judul_unit",
+    "code": "kode_unit",
+    "nomor_skkni": "nomor_skkni",
+    "sektor": "sektor",
+    "bidang": "bidang",
+    "sub_bidang": "sub_bidang",
+    "tahun": "tahun",
+}
+ODOO_UNIT_MODEL = "skkni.unit"
+
+# Kolom terakhir saat `fields` tidak diberikan: key di luar header baris pertama, sebagai objek JSON
+OVERFLOW_COLUMN = "_extra"
+
+
+def _as_mapping(row: Any, fields: Sequence[str] | None) -> Mapping[str, Any]:
+    """Dict / SQLAlchemy Row / tuple (cursor DB-API, butuh `fields`) -> Mapping."""
+    if isinstance(row, Mapping):
+        return row
+    mapping = getattr(row, "_mapping", None)
+    if mapping is not None:
+        return mapping
+    if fields is not None and isinstance(row, Sequence) and not isinstance(row, str):
+        return dict(zip(fields, row, strict=False))
+    raise TypeError(f"Baris tidak didukung: {type(row).__name__}")
+
+
+def _prepare(records: Iterable[Any], fields: Sequence[str] | None) -> tuple[list[str], Iterator[Mapping[str, Any]]]:
+    """
+    Tentukan header (dari `fields` atau key baris pertama + `OVERFLOW_COLUMN`) tanpa me-materialisasi iterable.
+
+    Dengan `fields`, key lain di baris diabaikan (kolom dipilih eksplisit oleh pemanggil).
+    """
+    it = iter(records)
+    if fields is not None:
+        return list(fields), (_as_mapping(r, fields) for r in it)
+    first = next(it, None)
+    if first is None:
+        return [], iter(())
+    head = _as_mapping(first, None)
+    base = list(head.keys())
+    rows = chain([head], (_as_mapping(r, None) for r in it))
+    return [*base, OVERFLOW_COLUMN], _with_overflow(rows, frozenset(base))
+
+
+def _with_overflow(rows: Iterator[Mapping[str, Any]], base: frozenset[str]) -> Iterator[Mapping[str, Any]]:
+    """Pindahkan key di luar `base` ke `OVERFLOW_COLUMN` (JSON), baris demi baris."""
+    for r in rows:
+        extra = {k: r[k] for k in r.keys() if k not in base}
+        if extra:
+            yield {**r, OVERFLOW_COLUMN: json.dumps(extra, ensure_ascii=False, default=str)}
+        else:
+            yield r
+
+
+def _cell(v: Any) -> Any:
+    return "" if v is None else v
+
+
+def write_csv(records: Iterable[Any], path: str, fields: Sequence[str] | None = None) -> int:
+    """
+    Tulis records ke CSV secara incremental.
+
+    Args:
+        records: Iterable dict/Row/tuple. Tuple wajib disertai `fields`.
+        path: Lokasi file output.
+        fields: Urutan kolom; default key baris pertama + `OVERFLOW_COLUMN`.
+
+    Returns:
+        Jumlah baris data yang ditulis.
+    """
+    header, rows = _prepare(records, fields)
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(header)
+        for r in rows:
+            writer.writerow([_cell(r.get(k)) for k in header])
+            n += 1
+    return n
+
+
+def write_xlsx(records: Iterable[Any], path: str, fields: Sequence[str] | None = None, sheet: str = "data") -> int:
+    """
+    Tulis records ke XLSX memakai workbook write-only openpyxl (baris di-flush ke disk, bukan ditahan di memori).
+
+    Returns:
+        Jumlah baris data yang ditulis.
+    """
+    # Import lazy: openpyxl hanya dibutuhkan di jalur ekspor XLSX
+    from openpyxl import Workbook
+
+    header, rows = _prepare(records, fields)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet)
+    if header:
+        ws.append(header)
+    n = 0
+    for r in rows:
+        ws.append([r.get(k) for k in header])
+        n += 1
+    wb.save(path)
+    return n
+
+
+def save_csv(records: Iterable[Any], path: str, fields: Sequence[str] = crud.UNIT_FIELDS) -> None:
+    write_csv(records, path, fields=fields)
+
+
+def save_xlsx(records: Iterable[Any], path: str, fields: Sequence[str] = crud.UNIT_FIELDS) -> None:
+    write_xlsx(records, path, fields=fields)
+
+
+# --- Odoo import ---
+
+
+def odoo_unit_rows(units: Iterable[Any]) -> Iterator[dict[str, Any]]:
+    """Unit (dict/Row) -> baris import Odoo dengan kolom `id` = XML ID dari make_unit_id."""
+    for u in units:
+        m = _as_mapping(u, None)
+        row: dict[str, Any] = {
+            "id": make_unit_id(m.get("kode_unit") or "", m.get("judul_unit") or "", m.get("nomor_skkni") or "")
+        }
+        for col, key in ODOO_UNIT_COLUMNS.items():
+            row[col] = m.get(key)
+        yield row
+
+
+def write_odoo_csv(units: Iterable[Any], path: str) -> int:
+    """CSV siap import Odoo (Import → kolom `id` sebagai External ID)."""
+    return write_csv(odoo_unit_rows(units), path, fields=["id", *ODOO_UNIT_COLUMNS])
+
+
+def write_odoo_xml(units: Iterable[Any], path: str, model: str = ODOO_UNIT_MODEL) -> int:
+    """
+    File data XML Odoo (`<odoo><record id=... model=...>`), ditulis per record.
+
+    Returns:
+        Jumlah record yang ditulis.
+    """
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<odoo>\n  <data noupdate="0">\n')
+        for row in odoo_unit_rows(units):
+            f.write(f"    <record id={quoteattr(row['id'])} model={quoteattr(model)}>\n")
+            for col in ODOO_UNIT_COLUMNS:
+                val = row.get(col)
+                if val is None or val == "":
+                    continue
+                f.write(f"      <field name={quoteattr(col)}>{escape(str(val))}</field>\n")
+            f.write("    </record>\n")
+            n += 1
+        f.write("  </data>\n</odoo>\n")
+    return n
@@ -1,7 +1,27 @@
-"""Parsing helpers & normalizers."""
+"""
+Parsing helpers & normalizers.
 
+Semua pattern dikompilasi sekali di level modul. Varian `*_batch` menerima sequence dan
+menjalankan tiap langkah normalisasi satu kali atas seluruh batch (digabung dengan separator
+yang tidak mungkin ikut ter-match), dengan output identik dengan versi per-item.
+"""
+
+from collections.abc import Callable, Iterable, Sequence
 import re
 
+_NON_WORD_RE = re.compile(r"[^\w]+")
+_NON_WORD_KEEP_SEP_RE = re.compile(r"[^\w\x00]+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_NON_ALNUM_KEEP_SEP_RE = re.compile(r"[^a-z0-9\x00]+")
+
+# \w untuk karakter ASCII = [A-Za-z0-9_]; translate jauh lebih cepat dari regex untuk input ASCII
+_ASCII_NON_WORD = "".join(c for c in map(chr, range(128)) if not (c.isalnum() or c == "_"))
+_DELETE_ASCII_NON_WORD = str.maketrans("", "", _ASCII_NON_WORD)
+_DELETE_ASCII_NON_WORD_KEEP_SEP = str.maketrans("", "", _ASCII_NON_WORD.replace("\x00", ""))
+
+# Separator batch: bukan bagian dari stopword/token mana pun dan termasuk non-word (\b tetap sama)
+_SEP = "\x00"
+
 # --- String cleaners (untuk tampilan) ---
 
 
@@ -10,12 +30,60 @@ def norm(s: str) -> str:
     Rapikan whitespace (termasuk newline) dan pertahankan case asli.
     Contoh: "ABC \n DEF " -> "ABC DEF"
     """
-    return re.sub(r"\s+", " ", (s or "").strip())
+    # str.split() memakai definisi whitespace yang sama dengan \s (str.isspace)
+    return " ".join((s or "").split())
+
+
+def norm_batch(values: Iterable[str]) -> list[str]:
+    """norm() untuk banyak string sekaligus."""
+    return [" ".join((s or "").split()) for s in values]
 
 
 def slug(s: str) -> str:
     """Slug alfanumerik lowercase (untuk ID)."""
-    return re.sub(r"[^a-z0-9]+", "_", (s or "").lower()).strip("_")
+    return _NON_ALNUM_RE.sub("_", (s or "").lower()).strip("_")
+
+
+def slug_batch(values: Iterable[str]) -> list[str]:
+    """slug() untuk banyak string sekaligus."""
+    items = [v or "" for v in values]
+    if not items:
+        return []
+    blob = _join_batch(items)
+    if blob is None:
+        return [slug(v) for v in items]
+    return [p.strip("_") for p in _NON_ALNUM_KEEP_SEP_RE.sub("_", blob.lower()).split(_SEP)]
+
+
+def _strip_non_word(s: str) -> str:
+    return s.translate(_DELETE_ASCII_NON_WORD) if s.isascii() else _NON_WORD_RE.sub("", s)
+
+
+def _join_batch(values: Sequence[str]) -> str | None:
+    """Gabungkan batch dengan _SEP; None bila ada item yang memuat _SEP (pakai jalur per-item)."""
+    blob = _SEP.join(values)
+    return blob if blob.count(_SEP) == len(values) - 1 else None
+
+
+def _remove_then_strip_batch(values: Iterable[str], words: Sequence[str], one: Callable[[str], str]) -> list[str]:
+    """
+    Batch: lowercase, hapus `words` berurutan (semantik str.replace yang sama dengan versi per-item),
+    lalu buang non-word — masing-masing satu kali atas seluruh batch.
+    """
+    items = [v or "" for v in values]
+    if not items:
+        return []
+    blob = _join_batch(items)
+    if blob is None:
+        return [one(v) for v in items]
+    blob = blob.lower()
+    for w in words:
+        blob = blob.replace(w, "")
+    if blob.isascii():
+        blob = blob.translate(_DELETE_ASCII_NON_WORD_KEEP_SEP)
+    else:
+        blob = _NON_WORD_KEEP_SEP_RE.sub("", blob)
+    return blob.split(_SEP)
 
 
 # --- Join-key builders (selalu normalized lowercase) ---
@@ -43,6 +111,11 @@ PHRASES_JUDUL = (
 )
 
 
+# Catatan: penghapusan stopword/frasa sengaja tetap berurutan (bukan satu regex alternation):
+# hasilnya bergantung urutan (mis. "no" dihapus sebelum "no.", "menteri" sebelum "kementerian"),
+# dan key yang sudah tersimpan di DB harus tetap identik.
+
+
 def build_join_key_nomor(nomor: str) -> str:
     """
     Normalisasi nomor SKKNI untuk join:
@@ -53,8 +126,12 @@ def build_join_key_nomor(nomor: str) -> str:
     s = (nomor or "").lower()
     for w in STOPWORDS_NOMOR:
         s = s.replace(w, "")
-    s = re.sub(r"[^\w]+", "", s)
-    return s
+    return _strip_non_word(s)
+
+
+def build_join_key_nomor_batch(values: Iterable[str]) -> list[str]:
+    """build_join_key_nomor() untuk banyak nomor sekaligus."""
+    return _remove_then_strip_batch(values, STOPWORDS_NOMOR, build_join_key_nomor)
 
 
 def build_join_key_judul(judul: str) -> str:
@@ -64,8 +141,15 @@ def build_join_key_judul(judul: str) -> str:
     s = (judul or "").lower()
     for p in PHRASES_JUDUL:
         s = s.replace(p, "")
-    s = re.sub(r"[^\w]+", "", s)
-    return s
+    return _strip_non_word(s)
+
+
+def build_join_key_judul_batch(values: Iterable[str]) -> list[str]:
+    """build_join_key_judul() untuk banyak judul sekaligus."""
+    return _remove_then_strip_batch(values, PHRASES_JUDUL, build_join_key_judul)
+
+
+_PDF_KEY_RE = re.compile(r"/documents/([^/]+)/download")
 
 
 def pdf_doc_key(url: str) -> str:
@@ -76,17 +160,55 @@ def pdf_doc_key(url: str) -> str:
     -> ekstrak <UUID>
     """
     u = (url or "").strip()
-    m = re.search(r"/documents/([^/]+)/download", u)
+    m = _PDF_KEY_RE.search(u)
     if m:
         return m.group(1).lower()
     # fallback: pakai keseluruhan path huruf/angka saja
-    return re.sub(r"[^a-z0-9]+", "", u.lower())
+    return _NON_ALNUM_RE.sub("", u.lower())
+
+
+# --- Trigram (pencarian fuzzy, gaya pg_trgm) ---
+
+_TRGM_SPLIT = re.compile(r"[\W_]+")
+
+
+def trigrams(s: str) -> set[str]:
+    """
+    Himpunan trigram per kata (lowercase, dipadding "  kata " seperti pg_trgm).
+    Contoh: "Kopi" -> {"  k", " ko", "kop", "opi", "pi "}
+    """
+    out: set[str] = set()
+    for w in _TRGM_SPLIT.split((s or "").lower()):
+        if not w:
+            continue
+        padded = f"  {w} "
+        out.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return out
 
 
 # --- Status cleaner & deterministic ID ---
 
 STATUS_TOKENS = ("BERLAKU", "DICABUT", "DIUBAH", "TIDAK BERLAKU")
 
+# Per token: (" XXX", "-XXX", \bXXX\b case-insensitive, "xxx") — urutan langkah dipertahankan
+_STATUS_STEPS = tuple(
+    (f" {tok}", f"-{tok}", re.compile(rf"\b{tok}\b", re.IGNORECASE), tok.lower()) for tok in STATUS_TOKENS
+)
+# Prefilter: tanpa token apa pun (case-insensitive) semua langkah di atas no-op
+_STATUS_ANY_RE = re.compile("|".join(map(re.escape, STATUS_TOKENS)), re.IGNORECASE)
+
+
+def _strip_status_steps(t: str) -> str:
+    is_ascii = t.isascii()
+    for spaced, dashed, rx, lowered in _STATUS_STEPS:
+        # hilangkan varian " XXX" dan "-XXX", lalu token berdiri sendiri
+        t = t.replace(spaced, "").replace(dashed, "")
+        # teks ASCII: tanpa substring token (case-insensitive) regex pasti no-op → lewati scan \b yang mahal
+        if is_ascii and lowered not in t.lower():
+            continue
+        t = rx.sub("", t)
+    return t
+
 
 def strip_status_tokens(s: str) -> str:
     """
@@ -94,13 +216,22 @@ def strip_status_tokens(s: str) -> str:
     Case-insensitive dan tetap mempertahankan case asli selain tokennya.
     """
     t = s or ""
-    for tok in STATUS_TOKENS:
-        # hilangkan varian " XXX" dan "-XXX"
-        t = t.replace(f" {tok}", "").replace(f"-{tok}", "")
-        t = re.sub(rf"\b{tok}\b", "", t, flags=re.IGNORECASE)
+    if _STATUS_ANY_RE.search(t):
+        t = _strip_status_steps(t)
     return norm(t)
 
 
+def strip_status_tokens_batch(values: Iterable[str]) -> list[str]:
+    """strip_status_tokens() untuk banyak string sekaligus."""
+    items = [v or "" for v in values]
+    if not items:
+        return []
+    blob = _join_batch(items)
+    if blob is None:
+        return [strip_status_tokens(v) for v in items]
+    return norm_batch(_strip_status_steps(blob).split(_SEP))
+
+
 def make_unit_id(kode_unit: str = "", judul_unit: str = "", nomor_skkni: str = "") -> str:
     """
     Buat ID deterministik untuk unit (stabil dipakai di downstream, mis. Odoo XML ID).
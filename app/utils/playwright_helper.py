@@ -1,10 +1,28 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Collection
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import logging
 import os
-
-from playwright.async_api import async_playwright
+import re
+from typing import TYPE_CHECKING, Any, Literal
 
 from app.core.config import settings
 
+# Playwright (+ driver Node-nya) berat: hanya di-import saat browser benar-benar di-launch
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright, Request, Response, Route
+
+    # substring URL, regex, atau predicate atas response
+    ResponseMatcher = str | re.Pattern[str] | Callable[[Response], bool]
+
+# nilai ``wait_until`` yang diterima ``Page.goto`` Playwright
+WaitUntil = Literal["commit", "domcontentloaded", "load", "networkidle"]
+
+logger = logging.getLogger(__name__)
+
 
 def _candidate_executables() -> list[str]:
     # Urutan kandidat path chromium di Debian/Ubuntu
@@ -18,15 +36,8 @@ def _candidate_executables() -> list[str]:
     return [p for p in cands if os.path.exists(p)]
 
 
-@asynccontextmanager
-async def chromium_page():
-    """
-    Membuka Playwright Chromium menggunakan:
-    - executable_path -> Chromium sistem (jika tersedia)
-    - fallback -> bundling Playwright (jika kebetulan image punya, tapi kita tidak mengandalkannya)
-    """
-    p = await async_playwright().start()
-    launch_kwargs = {
+def _launch_kwargs() -> dict[str, Any]:
+    launch_kwargs: dict[str, Any] = {
         "headless": settings.HEADLESS,
         "args": [
             "--no-sandbox",
@@ -39,11 +50,291 @@ async def chromium_page():
     exes = _candidate_executables()
     if exes:
         launch_kwargs["executable_path"] = exes[0]
+    return launch_kwargs
 
-    browser = await p.chromium.launch(**launch_kwargs)
-    page = await browser.new_page()
-    try:
+
+# Tipe resource yang tidak dibutuhkan untuk ambil teks DOM / JSON
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet", "texttrack", "manifest"})
+# Potongan URL tracker/analytics (dicocokkan sebagai substring)
+BLOCKED_URL_PATTERNS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook",
+    "hotjar.com",
+    "clarity.ms",
+)
+
+
+def should_block(
+    request: Request,
+    resource_types: Collection[str] = BLOCKED_RESOURCE_TYPES,
+    url_patterns: Collection[str] = BLOCKED_URL_PATTERNS,
+) -> bool:
+    if request.resource_type in resource_types:
+        return True
+    url = request.url
+    return any(p in url for p in url_patterns)
+
+
+def make_route_handler(
+    resource_types: Collection[str] = BLOCKED_RESOURCE_TYPES,
+    url_patterns: Collection[str] = BLOCKED_URL_PATTERNS,
+) -> Callable[[Route], Awaitable[None]]:
+    """Handler `route("**/*", ...)`: abort resource non-esensial, lanjutkan sisanya."""
+
+    async def _handle(route: Route) -> None:
+        if should_block(route.request, resource_types, url_patterns):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    return _handle
+
+
+async def block_resources(
+    target: BrowserContext | Page,
+    resource_types: Collection[str] = BLOCKED_RESOURCE_TYPES,
+    url_patterns: Collection[str] = BLOCKED_URL_PATTERNS,
+) -> None:
+    """Pasang aturan blokir resource pada context (berlaku untuk semua page-nya) atau satu page."""
+    await target.route("**/*", make_route_handler(resource_types, url_patterns))
+
+
+@dataclass
+class _Slot:
+    context: BrowserContext | None = None
+    page: Page | None = None
+    uses: int = 0
+    broken: bool = False
+
+
+class BrowserPool:
+    """
+    Pool Chromium yang hidup selama proses: satu browser, `size` context (masing-masing satu page).
+
+    - acquire()/release() atau `async with pool.page() as page:`
+    - bila `block` aktif, tiap context memblokir resource non-esensial (lihat block_resources)
+    - slot di-recycle (context baru) setelah `max_uses` pemakaian, bila page tertutup/crash,
+      atau bila pemakai menandai broken; browser di-launch ulang bila koneksinya putus.
+    """
+
+    def __init__(self, size: int | None = None, max_uses: int | None = None, block: bool | None = None) -> None:
+        self.size = max(1, size or settings.BROWSER_POOL_SIZE)
+        self.max_uses = max(1, max_uses or settings.BROWSER_MAX_USES)
+        self.block = settings.BROWSER_BLOCK_RESOURCES if block is None else block
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._idle: asyncio.Queue[_Slot] | None = None
+        self._in_use: dict[int, _Slot] = {}
+        self._lock = asyncio.Lock()
+        self._closed = False
+        self.launches = 0
+        self.recycles = 0
+
+    async def _launch_browser(self) -> Browser:
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(**_launch_kwargs())
+
+    async def _ensure_browser(self) -> Browser:
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._browser is not None:
+                    logger.warning("[browser-pool] browser terputus, launch ulang")
+                self._browser = await self._launch_browser()
+                self.launches += 1
+            return self._browser
+
+    async def start(self) -> None:
+        if self._idle is not None:
+            return
+        self._closed = False
+        await self._ensure_browser()
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(_Slot())
+
+    def _healthy(self, slot: _Slot) -> bool:
+        return (
+            not slot.broken
+            and slot.page is not None
+            and not slot.page.is_closed()
+            and slot.uses < self.max_uses
+            and self._browser is not None
+            and self._browser.is_connected()
+        )
+
+    async def _close_slot(self, slot: _Slot) -> None:
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:  # context milik browser yang sudah mati
+                pass
+        slot.context, slot.page, slot.uses, slot.broken = None, None, 0, False
+
+    async def _renew_slot(self, slot: _Slot) -> None:
+        if slot.context is not None:
+            self.recycles += 1
+        await self._close_slot(slot)
+        browser = await self._ensure_browser()
+        slot.context = await browser.new_context()
+        if self.block:
+            await block_resources(slot.context)
+        slot.page = await slot.context.new_page()
+
+    async def acquire(self) -> Page:
+        """Pinjam satu page (menunggu bila semua slot sedang dipakai)."""
+        if self._closed:
+            raise RuntimeError("BrowserPool sudah ditutup")
+        await self.start()
+        assert self._idle is not None
+        slot = await self._idle.get()
+        try:
+            if not self._healthy(slot):
+                await self._renew_slot(slot)
+        except BaseException:
+            await self._close_slot(slot)
+            self._idle.put_nowait(slot)
+            raise
+        assert slot.page is not None
+        slot.uses += 1
+        self._in_use[id(slot.page)] = slot
+        return slot.page
+
+    async def release(self, page: Page, broken: bool = False) -> None:
+        """Kembalikan page ke pool; broken=True memaksa recycle pada acquire berikutnya."""
+        slot = self._in_use.pop(id(page), None)
+        if slot is None or self._idle is None:
+            return
+        slot.broken = slot.broken or broken
+        if self._closed:
+            await self._close_slot(slot)
+        self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def page(self):
+        page = await self.acquire()
+        broken = False
+        try:
+            yield page
+        except BaseException:
+            # state page tidak jelas setelah error -> recycle
+            broken = True
+            raise
+        finally:
+            await self.release(page, broken=broken)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "in_use": len(self._in_use),
+            "launches": self.launches,
+            "recycles": self.recycles,
+        }
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._idle is not None:
+            while not self._idle.empty():
+                await self._close_slot(self._idle.get_nowait())
+            self._idle = None
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+_pool: BrowserPool | None = None
+_pool_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Pool bersama per event loop (objek Playwright terikat ke loop yang membuatnya)."""
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop or _pool._closed:
+        _pool = BrowserPool()
+        _pool_loop = loop
+    return _pool
+
+
+async def close_browser_pool() -> None:
+    global _pool, _pool_loop
+    if _pool is not None and _pool_loop is asyncio.get_running_loop():
+        await _pool.close()
+    _pool, _pool_loop = None, None
+
+
+@asynccontextmanager
+async def chromium_page():
+    """
+    Pinjam page Chromium dari pool bersama (browser di-launch sekali per proses):
+    - executable_path -> Chromium sistem (jika tersedia)
+    - fallback -> bundling Playwright (jika kebetulan image punya, tapi kita tidak mengandalkannya)
+    """
+    async with get_browser_pool().page() as page:
         yield page
+
+
+def _matches(response: Response, match: ResponseMatcher) -> bool:
+    if callable(match) and not isinstance(match, re.Pattern):
+        return match(response)
+    if isinstance(match, re.Pattern):
+        return match.search(response.url) is not None
+    return match in response.url
+
+
+async def capture_json_responses(
+    page: Page,
+    url: str,
+    match: ResponseMatcher,
+    wait_until: WaitUntil = "networkidle",
+    timeout: float = 30_000,
+) -> list[dict[str, Any]]:
+    """
+    Navigasi ke `url` sambil menangkap response JSON milik situs yang cocok dengan `match`
+    (substring URL, regex, atau predicate). Return [{url, status, data}] sesuai urutan datang,
+    sehingga parsing DOM bisa dilewati bila halaman di-render dari API JSON.
+    """
+    pending: list[asyncio.Task] = []
+
+    async def _read(resp: Response) -> dict[str, Any] | None:
+        try:
+            return {"url": resp.url, "status": resp.status, "data": await resp.json()}
+        except Exception:  # body bukan JSON / koneksi ditutup
+            return None
+
+    def _on_response(resp: Response) -> None:
+        if resp.request.resource_type not in ("xhr", "fetch"):
+            return
+        if not _matches(resp, match):
+            return
+        ctype = (resp.headers or {}).get("content-type", "")
+        if "json" not in ctype:
+            return
+        pending.append(asyncio.ensure_future(_read(resp)))
+
+    page.on("response", _on_response)
+    try:
+        await page.goto(url, wait_until=wait_until, timeout=timeout)
+        results = await asyncio.gather(*pending)
     finally:
-        await browser.close()
-        await p.stop()
+        page.remove_listener("response", _on_response)
+    return [r for r in results if r is not None]
+
+
+async def fetch_rendered_json(
+    url: str, match: ResponseMatcher, wait_until: WaitUntil = "networkidle"
+) -> list[dict[str, Any]]:
+    """Render `url` dengan page dari pool dan kembalikan response JSON API yang tertangkap."""
+    async with chromium_page() as page:
+        return await capture_json_responses(page, url, match, wait_until=wait_until)
@@ -0,0 +1,250 @@
+"""
+Primitif ketahanan untuk panggilan upstream: pelacak latensi, hedged request, circuit breaker.
+
+- LatencyTracker: jendela latensi terakhir -> ambang hedge (persentil, mis. p95).
+- hedged_call / ahedged_call: bila attempt pertama belum selesai setelah `delay`, kirim duplikat
+  dan pakai yang selesai duluan (hanya untuk request idempoten, mis. GET).
+- CircuitBreaker: closed -> open saat rasio gagal melewati batas; setelah cooldown satu probe
+  half-open dibiarkan lewat, sukses menutup kembali, gagal membuka lagi.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait
+import math
+import threading
+import time
+from typing import Any
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Upstream dianggap down (breaker open); panggilan ditolak tanpa menyentuh jaringan."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"circuit '{name}' open; coba lagi dalam {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class LatencyTracker:
+    """Jendela geser latensi (detik) untuk menghitung persentil."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            data = sorted(self._samples)
+        idx = min(len(data) - 1, max(0, math.ceil(p * len(data)) - 1))
+        return data[idx]
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window: int = 50,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._results: deque[bool] = deque(maxlen=window)  # True = gagal
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError bila panggilan tidak boleh lewat."""
+        with self._lock:
+            if self._state == OPEN:
+                if self._retry_in() > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, self._retry_in())
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == HALF_OPEN:
+                # probe yang menggantung lebih dari cooldown dianggap hilang; izinkan probe baru
+                if self._probe_in_flight and self._clock() - self._probe_started < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probe_in_flight = True
+                self._probe_started = self._clock()
+
+    def release(self) -> None:
+        """
+        Panggilan selesai tanpa hasil (mis. di-cancel): bukan sukses maupun gagal upstream,
+        tapi slot probe half-open harus dilepas supaya breaker tidak macet menolak semua panggilan.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+        self.opened += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._results.clear()
+            self._results.append(False)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._results.append(True)
+            if len(self._results) >= self.min_calls and self._rate() >= self.failure_rate:
+                self._open()
+
+    def _rate(self) -> float:
+        return sum(self._results) / len(self._results) if self._results else 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._retry_in() <= 0:
+                return HALF_OPEN
+            return self._state
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state,
+                "failure_rate": round(self._rate(), 4),
+                "calls": len(self._results),
+                "retry_in": round(self._retry_in(), 3) if self._state == OPEN else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._state = CLOSED
+            self._probe_in_flight = False
+
+
+def _pick_winner(done: set, cleanup: Callable[[Any], None] | None) -> tuple[bool, Any, list[BaseException]]:
+    winner: Any = None
+    found = False
+    errors: list[BaseException] = []
+    for f in done:
+        exc = f.exception()
+        if exc is not None:
+            errors.append(exc)
+        elif not found:
+            winner, found = f.result(), True
+        elif cleanup is not None:
+            cleanup(f.result())
+    return found, winner, errors
+
+
+def _cleanup_late(f: Future, cleanup: Callable[[Any], None]) -> None:
+    if f.exception() is None:
+        cleanup(f.result())
+
+
+def hedged_call(
+    fn: Callable[[], Any],
+    delay: float | None,
+    executor: ThreadPoolExecutor,
+    cleanup: Callable[[Any], None] | None = None,
+    on_hedge: Callable[[], None] | None = None,
+) -> Any:
+    """
+    Jalankan fn(); bila belum selesai setelah `delay` detik, jalankan duplikat dan kembalikan
+    hasil sukses pertama. Hasil attempt yang kalah diberikan ke `cleanup` (mis. response.close).
+    delay=None -> tanpa hedge (panggil langsung).
+    """
+    if delay is None:
+        return fn()
+    first = executor.submit(fn)
+    try:
+        return first.result(timeout=delay)
+    except FuturesTimeout:
+        pass
+    if on_hedge is not None:
+        on_hedge()
+    pending: set[Future] = {first, executor.submit(fn)}
+    errors: list[BaseException] = []
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        found, winner, errs = _pick_winner(done, cleanup)
+        errors += errs
+        if found:
+            if cleanup is not None:
+                # attempt sync tidak bisa di-cancel; bersihkan hasilnya begitu selesai
+                for f in pending:
+                    f.add_done_callback(lambda f: _cleanup_late(f, cleanup))
+            return winner
+    raise errors[0]
+
+
+async def ahedged_call(
+    fn: Callable[[], Awaitable[Any]],
+    delay: float | None,
+    cleanup: Callable[[Any], Awaitable[None]] | None = None,
+    on_hedge: Callable[[], None] | None = None,
+) -> Any:
+    """Versi async hedged_call; attempt yang kalah di-cancel."""
+    if delay is None:
+        return await fn()
+    first = asyncio.ensure_future(fn())
+    finished, _ = await asyncio.wait({first}, timeout=delay)
+    if finished:
+        return first.result()
+    if on_hedge is not None:
+        on_hedge()
+    pending: set[asyncio.Future] = {first, asyncio.ensure_future(fn())}
+    errors: list[BaseException] = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            losers: list[Any] = []
+            found, winner, errs = _pick_winner(done, losers.append)
+            errors += errs
+            if cleanup is not None:
+                for r in losers:
+                    await cleanup(r)
+            if found:
+                return winner
+    finally:
+        for f in pending:
+            f.cancel()
+    raise errors[0]
@@ -1,16 +1,26 @@
 # app/worker.py
 from __future__ import annotations
 
+import argparse
 from datetime import UTC, datetime
 import os
+import time
 
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
 from app.core.db import get_session, init_db
+from app.core.metrics import WorkerMetrics
 from app.db import crud
 from app.repositories.skkni_repository import (
+    close_client,
     fetch_document_detail,
     fetch_units_for_document,
     normalize_document,
+    track_fetch,
+    upstream_state,
 )
+from app.services.read_db import build_read_db
 
 
 def read_seed_uuids() -> list[str]:
@@ -29,50 +39,183 @@ def read_seed_uuids() -> list[str]:
     return uuids
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Sinkronisasi dokumen & unit SKKNI dari API Kemnaker")
+    parser.add_argument("--dry-run", action="store_true", help="tampilkan change set tanpa menulis ke DB")
+    args = parser.parse_args(argv)
+    try:
+        _run(dry_run=args.dry_run)
+    finally:
+        close_client()
+
+
+def _print_changes(changes: list[crud.UnitChangeSet], verbose: bool) -> None:
+    totals = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    for cs in changes:
+        s = cs.summary()
+        for k in totals:
+            totals[k] += s[k]
+        if verbose and not cs.is_empty:
+            print(f"[worker]   {cs.doc_uuid}: +{s['added']} ~{s['changed']} -{s['removed']} (tetap {s['unchanged']})")
+            for kode in cs.removed:
+                print(f"[worker]     - {kode}")
+    print(
+        f"[worker] unit: {totals['added']} baru, {totals['changed']} berubah, "
+        f"{totals['removed']} dihapus (tombstone), {totals['unchanged']} tidak berubah"
+    )
+
+
+def _ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 3)
+
+
+def _run(dry_run: bool = False) -> None:
     uuids = read_seed_uuids()
     print(f"[worker] total UUID yang akan diproses: {len(uuids)}")
 
+    # Ledger dibuka di awal supaya run yang crash tetap tercatat (status "failed")
+    init_db()
+    with get_session() as db:
+        run_id = crud.start_sync_run(db, total_uuids=len(uuids), dry_run=dry_run)
+    try:
+        _sync(run_id, uuids, dry_run)
+    except BaseException as e:
+        with get_session() as db:
+            crud.finish_sync_run(db, run_id, status="failed", error=f"{type(e).__name__}: {e}"[:2000])
+        raise
+
+
+def _sync(run_id: int, uuids: list[str], dry_run: bool) -> None:
     docs_payload: list[dict] = []
-    units_payload: list[dict] = []
+    units_by_doc: dict[str, list[dict]] = {}
+    items: dict[str, dict] = {}
+    metrics = WorkerMetrics()
 
     for idx, uuid in enumerate(uuids, start=1):
+        item: dict = {"uuid": uuid, "status": "error"}
+        items[uuid] = item
         try:
-            # Ambil detail mentah dari API Kemnaker.
-            raw_detail = fetch_document_detail(uuid)
-
-            # Normalisasi sekali di worker; listing_url kita kosongkan (tidak wajib).
-            doc_row = normalize_document(raw_detail, listing_url="")
-
-            # Guard: pastikan listing_url selalu string
-            if not isinstance(doc_row.get("listing_url", ""), str):
-                doc_row["listing_url"] = ""
-
-            # updated_at harus timezone-aware datetime (menghindari DeprecationWarning)
-            doc_row["updated_at"] = datetime.now(UTC)
+            with track_fetch() as trace:
+                try:
+                    # Ambil detail mentah dari API Kemnaker.
+                    t0 = time.perf_counter()
+                    with metrics.upstream_latency.labels(endpoint="detail").time():
+                        raw_detail = fetch_document_detail(uuid)
+                    item["detail_ms"] = _ms(t0)
+
+                    # Normalisasi sekali di worker; listing_url kita kosongkan (tidak wajib).
+                    doc_row = normalize_document(raw_detail, listing_url="")
+
+                    # Guard: pastikan listing_url selalu string
+                    if not isinstance(doc_row.get("listing_url", ""), str):
+                        doc_row["listing_url"] = ""
+
+                    # updated_at harus timezone-aware datetime (menghindari DeprecationWarning)
+                    doc_row["updated_at"] = datetime.now(UTC)
+
+                    # Ambil & normalisasi units; tambahkan updated_at timezone-aware
+                    t0 = time.perf_counter()
+                    with metrics.upstream_latency.labels(endpoint="units").time():
+                        ulist = fetch_units_for_document(uuid)
+                    item["units_ms"] = _ms(t0)
+                finally:
+                    item["bytes"], item["retries"] = trace.bytes, trace.hedges
             docs_payload.append(doc_row)
-
-            # Ambil & normalisasi units; tambahkan updated_at timezone-aware
-            ulist = fetch_units_for_document(uuid)
+            metrics.documents.inc()
+            metrics.units.inc(len(ulist))
             for r in ulist:
                 r["updated_at"] = datetime.now(UTC)
-            units_payload.extend(ulist)
+            # list kosong bisa berarti payload tak dikenali -> jangan tombstone semua unit dokumen ini
+            if ulist:
+                units_by_doc[uuid] = ulist
+            item["status"], item["unit_count"] = "ok", len(ulist)
 
             print(f"[worker] {idx}/{len(uuids)} OK: {uuid} (units: {len(ulist)})")
         except Exception as e:
+            metrics.upstream_errors.labels(error=type(e).__name__).inc()
+            item["error_class"], item["error"] = type(e).__name__, str(e)[:2000]
             print(f"[worker] {idx}/{len(uuids)} SKIP {uuid}: {e}")
 
-    print(f"[worker] dokumen siap upsert: {len(docs_payload)}, unit siap upsert: {len(units_payload)}")
-
-    # Init DB & upsert
-    init_db()
+    upstream = upstream_state()
+    stats, cb = upstream["http"], upstream["breaker"]
+    metrics.upstream_retries.inc(stats["hedges"])
+    print(
+        f"[worker] HTTP: {stats['requests']} request, {stats['connections']} koneksi baru "
+        f"(reuse {stats['reuse_ratio']:.0%}, HTTP/2: {stats['http2_responses']}, hedge: {stats['hedges']}); "
+        f"breaker {cb['state']} (ditolak: {cb['rejected']})"
+    )
+    n_units = sum(len(v) for v in units_by_doc.values())
+    print(f"[worker] dokumen siap upsert: {len(docs_payload)}, unit siap upsert: {n_units}")
+
+    totals: dict = {
+        "ok_count": sum(1 for it in items.values() if it["status"] == "ok"),
+        "error_count": sum(1 for it in items.values() if it["status"] != "ok"),
+        "units_fetched": n_units,
+        "bytes": sum(it.get("bytes", 0) for it in items.values()),
+        "retries": sum(it.get("retries", 0) for it in items.values()),
+    }
+
+    # Tulis delta saja
     with get_session() as db:
-        if docs_payload:
-            crud.upsert_documents(db, docs_payload)
-        if units_payload:
-            crud.upsert_units(db, units_payload)
-
-    print("[worker] upsert selesai.")
+        if dry_run:
+            added, changed = crud.count_changed_documents(db, docs_payload)
+            print(f"[worker] DRY RUN dokumen: {added} baru, {changed} berubah")
+            changes = crud.sync_units(db, units_by_doc, dry_run=True)
+            _print_changes(changes, verbose=True)
+            _finish_ledger(db, run_id, items, changes, totals)
+            print("[worker] DRY RUN: tidak ada yang ditulis.")
+            return
+
+        t0 = time.perf_counter()
+        with metrics.upsert_seconds.labels(entity="documents").time():
+            docs_written = crud.upsert_documents(db, docs_payload) if docs_payload else 0
+        totals["documents_upsert_ms"] = _ms(t0)
+        t0 = time.perf_counter()
+        with metrics.upsert_seconds.labels(entity="units").time():
+            changes = crud.sync_units(db, units_by_doc)
+        totals["units_upsert_ms"] = _ms(t0)
+        totals["documents_written"] = docs_written
+        _print_changes(changes, verbose=False)
+        if docs_written or any(not cs.is_empty for cs in changes):
+            generation = crud.bump_sync_generation(db)
+            print(f"[worker] upsert selesai ({docs_written} dokumen ditulis, generation {generation}).")
+        else:
+            print(f"[worker] tidak ada perubahan (generation tetap {crud.get_sync_generation(db)}).")
+
+        totals.update(metrics.finish(documents=len(docs_payload), units=n_units))
+        _finish_ledger(db, run_id, items, changes, totals)
+
+    if settings.READ_DB_DIR:
+        # terbitkan setelah semua commit: API tidak pernah melihat sync setengah jalan
+        try:
+            manifest, built = build_read_db()
+            metrics.record_cache("read_db", hit=not built)
+            state = "diterbitkan" if built else "sudah terbaru"
+            print(f"[worker] read snapshot generation {manifest['generation']} {state} ({manifest['file']})")
+        except Exception as e:  # API tetap melayani snapshot sebelumnya
+            print(f"[worker] gagal membangun read snapshot: {e}")
+
+    try:
+        for target in metrics.publish():
+            print(f"[worker] metrik ditulis ke {target}")
+    except Exception as e:  # metrik tidak boleh menggagalkan sync
+        print(f"[worker] gagal publish metrik: {e}")
+
+
+def _finish_ledger(
+    db: Session, run_id: int, items: dict[str, dict], changes: list[crud.UnitChangeSet], totals: dict
+) -> None:
+    for cs in changes:
+        if cs.doc_uuid in items:
+            items[cs.doc_uuid].update(
+                units_added=len(cs.added), units_changed=len(cs.changed), units_removed=len(cs.removed)
+            )
+    totals["units_added"] = sum(len(cs.added) for cs in changes)
+    totals["units_changed"] = sum(len(cs.changed) for cs in changes)
+    totals["units_removed"] = sum(len(cs.removed) for cs in changes)
+    crud.add_sync_run_items(db, run_id, items.values())
+    crud.finish_sync_run(db, run_id, status="ok", **totals)
+    print(f"[worker] ledger run #{run_id} tersimpan (GET /sync/runs/{run_id})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Benchmark scripts (tidak ikut dijalankan oleh pytest default)."""
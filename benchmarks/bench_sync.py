@@ -0,0 +1,135 @@
+"""
+Throughput sinkronisasi end-to-end secara offline: worker (app.worker) dan pipeline scraper
+(listing + enrich) melawan mock Kemnaker lokal (benchmarks.mock_kemnaker).
+
+Jalankan:  python -m benchmarks.bench_sync --docs 500 --latency lognormal:80,0.5 --rate-5xx 0.01
+           python -m benchmarks.bench_sync --docs 2000 --concurrency 8 --json sync.json
+
+DB ditulis ke file sementara (atau --db); hasil worker dibaca dari ledger run (GET /sync/runs).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--units-per-doc", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", default="lognormal:80,0.5", help="lihat benchmarks.mock_kemnaker")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-timeout", type=float, default=0.0)
+    parser.add_argument("--rate-html", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=None, help="MAX_CONCURRENCY untuk pipeline scraper")
+    parser.add_argument("--page-size", type=int, default=50, help="dokumen per halaman listing")
+    parser.add_argument("--skip-scraper", action="store_true")
+    parser.add_argument("--db", help="file SQLite tujuan (default: file sementara baru)")
+    parser.add_argument("--json", help="tulis hasil sebagai JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="skkni-bench-sync-")
+    # Engine app & settings dibaca saat import: set env sebelum modul app dimuat
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db or os.path.join(tmp, 'sync.db')}"
+    os.environ["SEED_FILE"] = os.path.join(tmp, "seed_uuids.txt")
+    if args.concurrency:
+        os.environ["MAX_CONCURRENCY"] = str(args.concurrency)
+
+    from app import worker
+    from app.core.db import get_session
+    from app.db import crud
+    from app.repositories import skkni_repository as repo
+    from app.services import skkni_scraper
+    from benchmarks.mock_kemnaker import Faults, MockKemnaker, serve_in_thread
+
+    faults = Faults(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_timeout=args.rate_timeout,
+        rate_html=args.rate_html,
+        timeout_seconds=25.0,  # di atas timeout client repository (20s)
+    )
+    mock = MockKemnaker(args.docs, args.units_per_doc, args.seed, faults)
+    result: dict = {"docs": args.docs, "units": sum(mock.unit_counts.values()), "faults": vars(faults)}
+
+    with serve_in_thread(mock) as base:
+        repo.BASE = base
+        skkni_scraper.LIST_URL = f"{base}/dokumen"
+        skkni_scraper.API_DOC_URL = base + "/v1/public/documents/{uuid}"
+        with open(os.environ["SEED_FILE"], "w", encoding="utf-8") as f:
+            f.writelines(f"{d['uuid']}\n" for d in mock.documents)
+
+        worker_error = None
+        try:
+            worker.main([])
+        except Exception as e:
+            worker_error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        with get_session() as db:
+            run_id = crud.get_latest_sync_run_id(db)
+            run = crud.get_sync_run(db, run_id) if run_id is not None else None
+            slowest = crud.get_sync_run_items(db, run_id, status="ok", limit=5) if run_id is not None else []
+        if run is None:
+            # worker gagal sebelum ledger dibuka (mis. DB tidak bisa diinisialisasi)
+            result["worker"] = {"error": worker_error or "no run recorded"}
+        else:
+            result["worker"] = {
+                k: run[k]
+                for k in ("status", "duration_ms", "ok_count", "error_count", "units_fetched", "bytes", "retries")
+                + ("documents_upsert_ms", "units_upsert_ms", "documents_per_second", "units_per_second")
+            }
+            result["worker"]["slowest_ms"] = [i["total_ms"] for i in slowest]
+            if worker_error:
+                result["worker"]["error"] = worker_error
+
+        if not args.skip_scraper:
+            pages = -(-args.docs // args.page_size)
+            t0 = time.perf_counter()
+            try:
+                docs, units = skkni_scraper.scrape_documents_and_units(1, pages, args.page_size)
+            except Exception as e:
+                # listing belum punya retry: satu halaman gagal menggagalkan seluruh pipeline
+                result["scraper"] = {
+                    "seconds": round(time.perf_counter() - t0, 3),
+                    "error": f"{type(e).__name__}: {str(e).splitlines()[0]}",
+                }
+            else:
+                dt = time.perf_counter() - t0
+                result["scraper"] = {
+                    "seconds": round(dt, 3),
+                    "documents": len(docs),
+                    "units": len(units),
+                    "documents_per_second": round(len(docs) / dt, 1),
+                    "units_per_second": round(len(units) / dt, 1),
+                }
+        result["mock"] = {f"{r}:{o}": n for (r, o), n in sorted(mock.stats.items())}
+
+    w = result["worker"]
+    if w.get("status") != "ok":
+        print(f"[bench] worker: {w.get('status', 'tanpa run')} ({w.get('error') or 'lihat ledger'})")
+    else:
+        print(
+            f"[bench] worker: {w['ok_count']} ok / {w['error_count']} gagal dalam {w['duration_ms'] / 1000:.1f}s "
+            f"({w['documents_per_second']:.1f} dok/s, {w['units_per_second']:.0f} unit/s, retry {w['retries']})"
+        )
+    s = result.get("scraper")
+    if s and "error" in s:
+        print(f"[bench] scraper: gagal setelah {s['seconds']:.1f}s ({s['error']})")
+    elif s:
+        print(
+            f"[bench] scraper: {s['documents']} dok, {s['units']} unit dalam {s['seconds']:.1f}s "
+            f"({s['documents_per_second']} dok/s)"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Bangun DB SQLite katalog sintetis (benchmarks.synthetic.catalogue) lewat jalur tulis yang sama
+dengan worker: crud.upsert_documents + crud.sync_units per batch dokumen.
+
+Jalankan:  python -m benchmarks.catalogue --docs 100000 --units-per-doc 50 --out-dir /tmp/skkni-bench
+
+File diberi nama menurut skala, seed & versi katalog dan ditulis ke `.tmp` lalu di-rename, jadi DB
+yang sudah jadi dipakai ulang oleh benchmark (test_bench_catalogue.py) dan build yang terputus tidak
+pernah terbaca sebagai katalog lengkap. Versi katalog = `CATALOGUE_VERSION` + hash `synthetic.py` +
+fingerprint skema models: generator/skema berubah -> nama file baru -> katalog dibangun ulang (file
+versi lama boleh dihapus manual).
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from functools import lru_cache
+import hashlib
+import os
+from pathlib import Path
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db import crud, models
+from benchmarks import synthetic
+
+# Naikkan bila isi katalog berubah di luar synthetic.py/skema (mis. jalur build);
+# 2: katalog lama bisa tercemar tulisan benchmark (write_db sebelum BEGIN eksplisit)
+CATALOGUE_VERSION = 2
+
+
+@lru_cache(maxsize=1)
+def catalogue_version() -> str:
+    """Hash pendek CATALOGUE_VERSION + sumber generator + skema models."""
+    h = hashlib.blake2b(digest_size=4)
+    h.update(str(CATALOGUE_VERSION).encode())
+    h.update(Path(synthetic.__file__).read_bytes())
+    # DDL dikompilasi langsung (bukan app.core.db.schema_fingerprint): app.core.db membuat engine dari
+    # DATABASE_URL, yang baru diarahkan ke katalog setelah path-nya diketahui
+    dialect = sqlite.dialect()
+    for table in models.Base.metadata.sorted_tables:
+        h.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            h.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return h.hexdigest()
+
+
+def db_path(docs: int, units_per_doc: float, seed: int = 42, out_dir: str | os.PathLike = ".") -> Path:
+    return Path(out_dir) / f"skkni-catalogue-{docs}x{units_per_doc:g}-s{seed}-v{catalogue_version()}.db"
+
+
+def build_catalogue(
+    path: str | os.PathLike, docs: int, units_per_doc: float = 50, seed: int = 42, batch: int = 500
+) -> dict:
+    """
+    Tulis katalog ke `path` (ditimpa). Return statistik build (baris & rows/s per entitas).
+    """
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{tmp}", future=True)
+    models.Base.metadata.create_all(engine)
+
+    stats = {"documents": 0, "units": 0, "documents_seconds": 0.0, "units_seconds": 0.0}
+    ts = datetime(2025, 1, 1)
+    docs_batch: list[dict] = []
+    units_by_doc: dict[str, list[dict]] = {}
+
+    def flush(db: Session) -> None:
+        t0 = time.perf_counter()
+        stats["documents"] += crud.upsert_documents(db, docs_batch)
+        t1 = time.perf_counter()
+        crud.sync_units(db, units_by_doc)
+        stats["documents_seconds"] += t1 - t0
+        stats["units_seconds"] += time.perf_counter() - t1
+        stats["units"] += sum(len(v) for v in units_by_doc.values())
+        docs_batch.clear()
+        units_by_doc.clear()
+
+    with Session(engine) as db:
+        for doc, units in synthetic.catalogue(docs, units_per_doc, seed):
+            docs_batch.append(doc | {"updated_at": ts})
+            units_by_doc[doc["uuid"]] = [u | {"updated_at": ts} for u in units]
+            if len(docs_batch) >= batch:
+                flush(db)
+        if docs_batch:
+            flush(db)
+        crud.bump_sync_generation(db)
+    engine.dispose()
+    os.replace(tmp, path)
+
+    for entity in ("documents", "units"):
+        secs = stats[f"{entity}_seconds"]
+        stats[f"{entity}_per_second"] = round(stats[entity] / secs) if secs else 0
+    stats["size_mib"] = round(path.stat().st_size / 2**20, 1)
+    return stats
+
+
+def ensure_catalogue(docs: int, units_per_doc: float = 50, seed: int = 42, out_dir: str | os.PathLike = ".") -> Path:
+    """Path katalog untuk skala ini; dibangun dulu bila belum ada."""
+    path = db_path(docs, units_per_doc, seed, out_dir)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        build_catalogue(path, docs, units_per_doc, seed)
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--units-per-doc", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=500, help="dokumen per batch upsert")
+    parser.add_argument("--out-dir", default=os.getenv("BENCH_DB_DIR", "."))
+    args = parser.parse_args(argv)
+
+    path = db_path(args.docs, args.units_per_doc, args.seed, args.out_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    s = build_catalogue(path, args.docs, args.units_per_doc, args.seed, args.batch)
+    print(
+        f"{path}: {s['documents']} dokumen ({s['documents_per_second']:,}/s), "
+        f"{s['units']} unit ({s['units_per_second']:,}/s), {s['size_mib']} MiB, "
+        f"total {time.perf_counter() - t0:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Load test API: campuran request realistis (search-documents, search-units, taxonomy, lookup)
+pada concurrency target terhadap app yang dijalankan uvicorn (multi-worker), disapu lintas
+ukuran DB, jumlah worker uvicorn, concurrency dan beban tulis paralel (biaya lock SQLite).
+
+Jalankan:  python -m benchmarks.loadtest --sizes 1000,10000 --workers 1,2,4 --concurrency 8,32 \\
+               --duration 20 --writer-rate 0,2 --out loadtest.json
+
+Katalog per ukuran dibangun/dipakai ulang lewat benchmarks.catalogue (BENCH_DB_DIR).
+Hasil (JSON): per run p50/p95/p99/max latency, throughput, error rate, rata-rata waktu DB per
+request (header X-DB-Time) — total dan per skenario — serta latensi transaksi writer bila aktif.
+
+Generator beban closed-loop: `concurrency` koroutin, masing-masing kirim request berikutnya
+begitu jawaban sebelumnya diterima. Periode --warmup tidak dihitung.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any
+
+import httpx
+
+from benchmarks.catalogue import ensure_catalogue
+from benchmarks.report import percentile
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    weight: float
+    method: str
+    path: str
+    # (rng, nilai sampel dari DB) -> kwargs httpx (params / json)
+    build: Callable[[random.Random, dict], dict]
+
+
+def _words(rnd: random.Random, s: dict) -> str:
+    return rnd.choice(s["words"])
+
+
+# Bobot kira-kira lalu lintas UI: pencarian unit dominan, taxonomy di-cache klien tapi tetap sering
+MIX: tuple[Scenario, ...] = (
+    Scenario("units", 20, "GET", "/skkni/search-units", lambda r, s: {"params": {"limit": 50}}),
+    Scenario("units-q", 20, "GET", "/skkni/search-units", lambda r, s: {"params": {"limit": 50, "q": _words(r, s)}}),
+    Scenario(
+        "units-filter",
+        15,
+        "GET",
+        "/skkni/search-units",
+        lambda r, s: {"params": {"limit": 50, "sektor": r.choice(s["sektor"]), "tahun": r.choice(s["tahun"])}},
+    ),
+    Scenario(
+        "units-doc",
+        10,
+        "GET",
+        "/skkni/search-units",
+        lambda r, s: {"params": {"limit": 200, "doc_uuid": r.choice(s["doc_uuid"])}},
+    ),
+    Scenario(
+        "units-facets",
+        5,
+        "GET",
+        "/skkni/search-units",
+        lambda r, s: {"params": {"limit": 20, "sektor": r.choice(s["sektor"]), "facets": "bidang,tahun"}},
+    ),
+    Scenario(
+        "documents-q",
+        10,
+        "GET",
+        "/skkni/search-documents",
+        lambda r, s: {"params": {"limit": 20, "q": _words(r, s)}},
+    ),
+    Scenario(
+        "documents-filter",
+        5,
+        "GET",
+        "/skkni/search-documents",
+        lambda r, s: {"params": {"limit": 20, "sektor": r.choice(s["sektor"])}},
+    ),
+    Scenario("sectors", 5, "GET", "/skkni/sectors", lambda r, s: {}),
+    Scenario("bidang", 4, "GET", "/skkni/bidang", lambda r, s: {}),
+    Scenario("sub-bidang", 2, "GET", "/skkni/sub-bidang", lambda r, s: {}),
+    Scenario(
+        "lookup",
+        4,
+        "POST",
+        "/skkni/units/lookup",
+        lambda r, s: {"json": {"kode_unit": r.sample(s["kode_unit"], min(100, len(s["kode_unit"])))}},
+    ),
+)
+
+
+def sample_values(db_path: Path) -> dict[str, list[str]]:
+    """Nilai filter nyata dari katalog (sqlite3 langsung: harness tidak memuat engine app)."""
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+
+        def col(sql: str) -> list[str]:
+            return [r[0] for r in con.execute(sql) if r[0]]
+
+        titles = col("SELECT judul_unit FROM units ORDER BY random() LIMIT 500")
+        return {
+            "sektor": col("SELECT DISTINCT sektor FROM documents"),
+            "tahun": col("SELECT DISTINCT tahun FROM documents"),
+            "doc_uuid": col("SELECT uuid FROM documents ORDER BY random() LIMIT 200"),
+            "kode_unit": col("SELECT kode_unit FROM units ORDER BY random() LIMIT 2000"),
+            # 1-2 kata dari judul nyata, mis. "Mutu Produk"
+            "words": sorted({" ".join(t.split()[1:3]) for t in titles} | {t.split()[1] for t in titles}),
+        }
+    finally:
+        con.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(db_path: Path, workers: int, startup_timeout: float = 120.0) -> Iterator[str]:
+    """Jalankan `uvicorn app.main:app --workers N` pada DB katalog; yield base URL."""
+    port = _free_port()
+    # slow-query log (app.core.db) dimatikan kecuali diminta: di bawah beban ia membanjiri konsol
+    env = {"SQL_PROFILING": "true", "SLOW_QUERY_MS": "600000"} | os.environ | {"DATABASE_URL": f"sqlite:///{db_path}"}
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    cmd += ["--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, env=env)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn berhenti saat start (exit {proc.returncode})")
+            try:
+                if httpx.get(f"{base}/healthz", timeout=1.0).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn tidak siap dalam batas waktu")
+            time.sleep(0.2)
+        yield base
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+class Writer(threading.Thread):
+    """
+    Beban tulis paralel seperti worker sync: `rate` transaksi/detik, tiap transaksi UPDATE 500 unit.
+    Mengukur lama transaksi (termasuk menunggu lock) & kegagalan "database is locked".
+    """
+
+    def __init__(self, db_path: Path, rate: float, batch: int = 500) -> None:
+        super().__init__(daemon=True)
+        self.db_path, self.rate, self.batch = db_path, rate, batch
+        self.stop = threading.Event()
+        self.latencies: list[float] = []
+        self.errors = 0
+
+    def run(self) -> None:
+        con = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        max_id = con.execute("SELECT max(id) FROM units").fetchone()[0] or 0
+        rnd = random.Random(0)
+        try:
+            while not self.stop.wait(1.0 / self.rate):
+                ids = [rnd.randint(1, max_id) for _ in range(self.batch)]
+                t0 = time.perf_counter()
+                try:
+                    con.execute("BEGIN IMMEDIATE")
+                    con.execute(
+                        f"UPDATE units SET updated_at = datetime('now') WHERE id IN ({','.join('?' * len(ids))})", ids
+                    )
+                    con.execute("COMMIT")
+                    self.latencies.append(time.perf_counter() - t0)
+                except sqlite3.OperationalError:
+                    self.errors += 1
+                    if con.in_transaction:
+                        con.execute("ROLLBACK")
+        finally:
+            con.close()
+
+    def summary(self) -> dict[str, Any]:
+        return {"rate": self.rate, "errors": self.errors} | _latency_summary(self.latencies)
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, Any]:
+    data = sorted(latencies)
+    if not data:
+        return {"count": 0}
+    return {
+        "count": len(data),
+        "p50_ms": round(percentile(data, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(data, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(data, 0.99) * 1000, 2),
+        "max_ms": round(data[-1] * 1000, 2),
+    }
+
+
+async def run_load(
+    base: str,
+    sample: dict,
+    concurrency: int,
+    duration: float,
+    warmup: float = 3.0,
+    seed: int = 0,
+    mix: tuple[Scenario, ...] = MIX,
+) -> dict[str, Any]:
+    """Closed-loop load; return ringkasan keseluruhan & per skenario."""
+    weights = [s.weight for s in mix]
+    # per skenario: latensi (detik) sukses, jumlah error, waktu DB (ms, header X-DB-Time)
+    lat: dict[str, list[float]] = defaultdict(list)
+    db_ms: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    measure_from, stop_at = start + warmup, start + warmup + duration
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60.0) as client:
+
+        async def user(i: int) -> None:
+            rnd = random.Random(seed * 1_000_003 + i)
+            while (now := loop.time()) < stop_at:
+                sc = rnd.choices(mix, weights)[0]
+                t0 = time.perf_counter()
+                try:
+                    r = await client.request(sc.method, sc.path, **sc.build(rnd, sample))
+                    ok = r.status_code < 400
+                except httpx.HTTPError:
+                    r, ok = None, False
+                if now < measure_from:
+                    continue
+                if ok:
+                    lat[sc.name].append(time.perf_counter() - t0)
+                    if r is not None and "x-db-time" in r.headers:
+                        db_ms[sc.name].append(float(r.headers["x-db-time"]))
+                else:
+                    errors[sc.name] += 1
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+
+    def summarize(latencies: list[float], n_err: int, dbs: list[float]) -> dict[str, Any]:
+        total = len(latencies) + n_err
+        return {
+            "requests": total,
+            "rps": round(total / duration, 2),
+            "error_rate": round(n_err / total, 4) if total else 0.0,
+            "db_ms_avg": round(sum(dbs) / len(dbs), 3) if dbs else None,
+        } | _latency_summary(latencies)
+
+    names = [s.name for s in mix]
+    return {
+        "overall": summarize(
+            [x for n in names for x in lat[n]], sum(errors.values()), [x for n in names for x in db_ms[n]]
+        ),
+        "scenarios": {n: summarize(lat[n], errors[n], db_ms[n]) for n in names if lat[n] or errors[n]},
+    }
+
+
+def _ints(s: str) -> list[int]:
+    return [int(x) for x in s.split(",") if x.strip()]
+
+
+def _floats(s: str) -> list[float]:
+    return [float(x) for x in s.split(",") if x.strip()]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000", help="jumlah dokumen katalog, dipisah koma")
+    parser.add_argument("--units-per-doc", type=float, default=50)
+    parser.add_argument("--workers", default="1,2", help="jumlah worker uvicorn, dipisah koma")
+    parser.add_argument("--concurrency", default="8,32", help="user paralel, dipisah koma")
+    parser.add_argument("--writer-rate", default="0", help="transaksi tulis/detik paralel (0 = tanpa), dipisah koma")
+    parser.add_argument("--duration", type=float, default=20.0, help="detik pengukuran per run")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument(
+        "--db-dir", default=os.getenv("BENCH_DB_DIR", os.path.join(tempfile.gettempdir(), "skkni-bench"))
+    )
+    parser.add_argument("--out", default="loadtest.json")
+    args = parser.parse_args(argv)
+
+    runs: list[dict] = []
+    for size in _ints(args.sizes):
+        db_path = ensure_catalogue(size, args.units_per_doc, out_dir=args.db_dir)
+        sample = sample_values(db_path)
+        for workers in _ints(args.workers):
+            with serve(db_path, workers) as base:
+                for concurrency in _ints(args.concurrency):
+                    for rate in _floats(args.writer_rate):
+                        writer = Writer(db_path, rate) if rate > 0 else None
+                        if writer is not None:
+                            writer.start()
+                        try:
+                            res = asyncio.run(run_load(base, sample, concurrency, args.duration, args.warmup))
+                        finally:
+                            if writer is not None:
+                                writer.stop.set()
+                                writer.join()
+                        run = {
+                            "documents": size,
+                            "units_per_doc": args.units_per_doc,
+                            "workers": workers,
+                            "concurrency": concurrency,
+                            "writer": writer.summary() if writer is not None else None,
+                        } | res
+                        runs.append(run)
+                        o = res["overall"]
+                        print(
+                            f"docs={size:<7} workers={workers:<2} conc={concurrency:<4} writer={rate:<4g} "
+                            f"rps={o['rps']:>8.1f} p50={o.get('p50_ms', 0):>8.1f}ms p95={o.get('p95_ms', 0):>8.1f}ms "
+                            f"p99={o.get('p99_ms', 0):>8.1f}ms err={o['error_rate']:.2%}"
+                        )
+
+    meta = {
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "mix": {s.name: s.weight for s in MIX},
+        "cpus": os.cpu_count(),
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "runs": runs}, f, indent=2)
+    print(f"hasil: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
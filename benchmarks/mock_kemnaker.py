@@ -0,0 +1,313 @@
+"""
+Mock upstream Kemnaker lokal: API dokumen/unit & halaman listing dari katalog sintetis,
+dengan latensi yang bisa diatur dan injeksi gangguan (429, 5xx, timeout, halaman error HTML).
+
+Jalankan:  python -m benchmarks.mock_kemnaker --docs 1000 --port 8900 --latency lognormal:80,0.5 --rate-5xx 0.02
+Arahkan:   BASE_URL=http://127.0.0.1:8900 API_BASE=http://127.0.0.1:8900 python -m app.worker
+
+Endpoint (meniru bentuk payload asli yang dibaca repository & scraper):
+  GET /v1/public/documents/{uuid}             {"data": {uuid, title, number, number_kepmen, core_category, units}}
+  GET /v1/public/documents/{uuid}/units       {"data": [{code, title}, ...]}
+  GET /v1/public/documents/{uuid}/download    PDF kecil
+  GET /dokumen?limit=&page=                   HTML listing (kartu <h3> + link download)
+Kontrol:
+  GET /__mock__/uuids?limit=                  UUID katalog (untuk SEED_FILE worker)
+  GET/PUT /__mock__/faults                    baca / ubah konfigurasi gangguan saat berjalan
+  GET /__mock__/stats                         jumlah request per route & hasil
+
+Dataset dibangun ulang per dokumen (synthetic.document_units), jadi katalog besar tidak ditahan di memori.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+import html
+import random
+import socket
+import threading
+import time
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
+
+from benchmarks import synthetic
+
+# Halaman error yang biasa dikirim gateway/WAF: status 200 tapi bukan JSON (dijaga _json_or_raise)
+MAINTENANCE_PAGE = (
+    "<!DOCTYPE html><html><head><title>Sedang Pemeliharaan</title></head>"
+    "<body><h1>Layanan sedang dalam pemeliharaan</h1><p>Silakan coba beberapa saat lagi.</p></body></html>"
+)
+BAD_GATEWAY_PAGE = (
+    "<html><head><title>502 Bad Gateway</title></head><body><center><h1>502 Bad Gateway</h1></center></body></html>"
+)
+PDF_STUB = b"%PDF-1.4\n1 0 obj<</Type/Catalog>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+
+
+def parse_latency(spec: str) -> tuple[str, tuple[float, ...]]:
+    """
+    "50" (tetap, ms) | "uniform:20,200" (ms) | "lognormal:80,0.5" (median ms, sigma) -> (jenis, parameter).
+    """
+    kind, _, args = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    params = tuple(float(a) for a in args.split(",") if a.strip()) if args else ()
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if kind not in expected or len(params) != expected[kind]:
+        raise ValueError(f"spesifikasi latensi tidak valid: {spec!r} (contoh: 50, uniform:20,200, lognormal:80,0.5)")
+    return kind, params
+
+
+@dataclass
+class Faults:
+    """Konfigurasi gangguan; rate = peluang per request (0..1), diundi berurutan 429 → 5xx → timeout → html."""
+
+    latency: str = "0"
+    # override latensi per jenis endpoint ("detail" | "units" | "listing" | "download")
+    route_latency: dict[str, str] = field(default_factory=dict)
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_timeout: float = 0.0
+    rate_html: float = 0.0
+    # request "timeout" ditahan selama ini (lebih lama dari timeout client) lalu dijawab 504
+    timeout_seconds: float = 30.0
+    retry_after: int = 1
+
+    def validate(self) -> Faults:
+        parse_latency(self.latency)
+        for spec in self.route_latency.values():
+            parse_latency(spec)
+        for name in ("rate_429", "rate_5xx", "rate_timeout", "rate_html"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} harus di antara 0 dan 1")
+        return self
+
+
+class MockKemnaker:
+    """State mock: katalog (dokumen + jumlah unit), gangguan aktif, RNG & statistik."""
+
+    def __init__(
+        self, docs: int = 1000, units_per_doc: float = 50, seed: int = 42, faults: Faults | None = None
+    ) -> None:
+        self.seed = seed
+        self.faults = (faults or Faults()).validate()
+        self.rnd = random.Random(seed)
+        self.stats: Counter[tuple[str, str]] = Counter()
+        self.documents: list[dict] = []
+        self.unit_counts: dict[str, int] = {}
+        for doc, n in synthetic.catalogue_documents(docs, units_per_doc, seed):
+            self.documents.append(doc)
+            self.unit_counts[doc["uuid"]] = n
+        self.by_uuid = {d["uuid"]: d for d in self.documents}
+
+    def units(self, uuid: str) -> list[dict]:
+        return synthetic.document_units(self.by_uuid[uuid], self.unit_counts[uuid], self.seed)
+
+    def delay(self, route: str) -> float:
+        kind, p = parse_latency(self.faults.route_latency.get(route, self.faults.latency))
+        if kind == "fixed":
+            ms = p[0]
+        elif kind == "uniform":
+            ms = self.rnd.uniform(p[0], p[1])
+        else:
+            ms = self.rnd.lognormvariate(0.0, p[1]) * p[0]
+        return max(0.0, ms) / 1000
+
+    def pick_fault(self) -> str | None:
+        f = self.faults
+        r = self.rnd.random()
+        for name, rate in (
+            ("429", f.rate_429),
+            ("5xx", f.rate_5xx),
+            ("timeout", f.rate_timeout),
+            ("html", f.rate_html),
+        ):
+            if r < rate:
+                return name
+            r -= rate
+        return None
+
+
+def _document_payload(doc: dict, units: list[dict]) -> dict:
+    number = doc["nomor_skkni"]
+    return {
+        "data": {
+            "uuid": doc["uuid"],
+            "title": doc["judul_skkni"],
+            "number": number,
+            "number_kepmen": doc["nomor_kepmen"],
+            "published_at": f"{doc['tahun']}-06-01T00:00:00Z",
+            "core_category": {"name": doc["bidang"], "category": {"name": doc["sektor"]}},
+            "sub_bidang": doc["sub_bidang"],
+            "units": [{"code": u["kode_unit"], "title": u["judul_unit"]} for u in units],
+        }
+    }
+
+
+def _listing_page(mock: MockKemnaker, base: str, limit: int, page: int) -> str:
+    start = (page - 1) * limit
+    cards = "".join(
+        f'<div class="card"><h3>{html.escape(d["judul_skkni"])}</h3>'
+        f"<p>{html.escape(d['nomor_skkni'])}</p>"
+        f'<a href="{base}/v1/public/documents/{d["uuid"]}/download">Unduh</a></div>'
+        for d in mock.documents[start : start + limit]
+    )
+    return f"<!DOCTYPE html><html><body><main>{cards}</main></body></html>"
+
+
+async def _fault_response(mock: MockKemnaker, route: str) -> Response | None:
+    """Latensi + gangguan; return response gangguan, atau None bila request dilayani normal."""
+    await asyncio.sleep(mock.delay(route))
+    fault = mock.pick_fault()
+    mock.stats[(route, fault or "ok")] += 1
+    if fault == "429":
+        return JSONResponse(
+            {"message": "Too Many Requests"}, status_code=429, headers={"Retry-After": str(mock.faults.retry_after)}
+        )
+    if fault == "5xx":
+        status = mock.rnd.choice((500, 502, 503, 504))
+        if status == 502:
+            return HTMLResponse(BAD_GATEWAY_PAGE, status_code=502)
+        return JSONResponse({"message": "Internal Server Error"}, status_code=status)
+    if fault == "timeout":
+        await asyncio.sleep(mock.faults.timeout_seconds)
+        return JSONResponse({"message": "Gateway Timeout"}, status_code=504)
+    if fault == "html":
+        return HTMLResponse(MAINTENANCE_PAGE, status_code=200)
+    return None
+
+
+def create_app(mock: MockKemnaker) -> FastAPI:
+    app = FastAPI(title="Mock Kemnaker SKKNI", docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.mock = mock
+
+    def _doc_or_404(uuid: str) -> dict:
+        doc = mock.by_uuid.get(uuid)
+        if doc is None:
+            raise HTTPException(status_code=404, detail="Dokumen tidak ditemukan")
+        return doc
+
+    @app.get("/v1/public/documents/{uuid}")
+    async def document_detail(uuid: str):
+        if (fault := await _fault_response(mock, "detail")) is not None:
+            return fault
+        doc = _doc_or_404(uuid)
+        return _document_payload(doc, mock.units(uuid))
+
+    @app.get("/v1/public/documents/{uuid}/units")
+    async def document_units(uuid: str, limit: int = 1000):
+        if (fault := await _fault_response(mock, "units")) is not None:
+            return fault
+        _doc_or_404(uuid)
+        return {"data": [{"code": u["kode_unit"], "title": u["judul_unit"]} for u in mock.units(uuid)[:limit]]}
+
+    @app.get("/v1/public/documents/{uuid}/download")
+    async def document_download(uuid: str):
+        if (fault := await _fault_response(mock, "download")) is not None:
+            return fault
+        _doc_or_404(uuid)
+        return Response(PDF_STUB, media_type="application/pdf")
+
+    @app.get("/dokumen")
+    async def listing(request: Request, limit: int = 10, page: int = 1):
+        if (fault := await _fault_response(mock, "listing")) is not None:
+            return fault
+        base = str(request.base_url).rstrip("/")
+        return HTMLResponse(_listing_page(mock, base, max(1, limit), max(1, page)))
+
+    @app.get("/__mock__/uuids")
+    def list_uuids(limit: int | None = None):
+        docs = mock.documents if limit is None else mock.documents[:limit]
+        return {"count": len(docs), "items": [d["uuid"] for d in docs]}
+
+    @app.get("/__mock__/faults")
+    def get_faults():
+        return asdict(mock.faults)
+
+    @app.put("/__mock__/faults")
+    def put_faults(body: dict[str, Any]):
+        known = {f.name for f in fields(Faults)}
+        unknown = set(body) - known
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"field tidak dikenal: {', '.join(sorted(unknown))}")
+        try:
+            mock.faults = Faults(**(asdict(mock.faults) | body)).validate()
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=str(e)) from e
+        return asdict(mock.faults)
+
+    @app.get("/__mock__/stats")
+    def get_stats(reset: bool = False):
+        items = [{"route": r, "outcome": o, "count": n} for (r, o), n in sorted(mock.stats.items())]
+        total = sum(mock.stats.values())
+        if reset:
+            mock.stats.clear()
+        return {"total": total, "items": items}
+
+    return app
+
+
+@contextmanager
+def serve_in_thread(mock: MockKemnaker, host: str = "127.0.0.1") -> Iterator[str]:
+    """Jalankan mock di thread latar (port acak); yield base URL. Untuk test & benchmark end-to-end."""
+    import uvicorn
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, 0))
+    server = uvicorn.Server(uvicorn.Config(create_app(mock), log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not server.started:
+            if not thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("mock Kemnaker gagal start")
+            time.sleep(0.01)
+        yield f"http://{host}:{sock.getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        sock.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--units-per-doc", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", default="0", help="50 | uniform:20,200 | lognormal:80,0.5 (ms)")
+    parser.add_argument("--latency-units", help="override latensi endpoint units")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-timeout", type=float, default=0.0)
+    parser.add_argument("--rate-html", type=float, default=0.0)
+    parser.add_argument("--timeout-seconds", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    faults = Faults(
+        latency=args.latency,
+        route_latency={"units": args.latency_units} if args.latency_units else {},
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_timeout=args.rate_timeout,
+        rate_html=args.rate_html,
+        timeout_seconds=args.timeout_seconds,
+    )
+    mock = MockKemnaker(args.docs, args.units_per_doc, args.seed, faults)
+    print(
+        f"[mock] {len(mock.documents)} dokumen, {sum(mock.unit_counts.values())} unit di http://{args.host}:{args.port}"
+    )
+    # state (RNG, statistik, gangguan) ada di memori proses: satu worker saja
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Ringkasan & perbandingan hasil pytest-benchmark (JSON dari --benchmark-autosave / --benchmark-json).
+
+Jalankan:  python -m benchmarks.report BASE.json [HEAD.json] [--threshold 10]
+
+Satu file: tabel p50/p95/p99 (ms) & ops/s per benchmark.
+Dua file:  selisih p50/p95 HEAD terhadap BASE; benchmark yang melambat melebihi --threshold persen
+           ditandai dan exit code 1 (bisa dipakai sebagai gate di CI).
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+import json
+import math
+import sys
+
+
+def percentile(data: Sequence[float], p: float) -> float:
+    """Persentil nearest-rank dari data yang SUDAH terurut."""
+    idx = min(len(data) - 1, max(0, math.ceil(p * len(data)) - 1))
+    return data[idx]
+
+
+def percentiles(samples: Sequence[float]) -> dict[str, float]:
+    """Durasi per round (detik) -> p50/p95/p99 (ms) & ops/s."""
+    data = sorted(samples)
+    if not data:
+        return {}
+    mean = sum(data) / len(data)
+    return {
+        "p50_ms": round(percentile(data, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(data, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(data, 0.99) * 1000, 3),
+        "ops_per_sec": round(1 / mean, 2) if mean else 0.0,
+    }
+
+
+def load(path: str) -> dict[str, dict]:
+    """fullname benchmark -> percentiles (dari extra_info, atau dihitung dari stats.data bila ada)."""
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    out: dict[str, dict] = {}
+    for b in doc.get("benchmarks", []):
+        info = dict(b.get("extra_info") or {})
+        if "p50_ms" not in info:
+            data = b["stats"].get("data")
+            info.update(percentiles(data) if data else {"p50_ms": round(b["stats"]["median"] * 1000, 3)})
+        out[b["fullname"]] = info
+    return out
+
+
+def _delta(base: float | None, head: float | None) -> float | None:
+    if not base or head is None:
+        return None
+    return (head - base) / base * 100
+
+
+def _fmt_delta(v: float | None) -> str:
+    return f"{v:+7.1f}%" if v is not None else "       -"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head", nargs="?")
+    parser.add_argument("--threshold", type=float, default=10.0, help="persen perlambatan p50 yang dianggap regresi")
+    args = parser.parse_args(argv)
+
+    base = load(args.base)
+    if args.head is None:
+        print(f"{'benchmark':<70} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10}")
+        for name, s in base.items():
+            print(
+                f"{name[-70:]:<70} {s.get('p50_ms', 0):>10.3f} {s.get('p95_ms', 0):>10.3f} "
+                f"{s.get('p99_ms', 0):>10.3f} {s.get('ops_per_sec', 0):>10.1f}"
+            )
+        return 0
+
+    head = load(args.head)
+    regressions = 0
+    print(f"{'benchmark':<70} {'p50 base':>10} {'p50 head':>10} {'Δp50':>8} {'Δp95':>8}")
+    for name in sorted(set(base) | set(head)):
+        b, h = base.get(name, {}), head.get(name, {})
+        d50 = _delta(b.get("p50_ms"), h.get("p50_ms"))
+        d95 = _delta(b.get("p95_ms"), h.get("p95_ms"))
+        flag = ""
+        if d50 is not None and d50 > args.threshold:
+            regressions += 1
+            flag = "  <-- lebih lambat"
+        print(
+            f"{name[-70:]:<70} {b.get('p50_ms', float('nan')):>10.3f} {h.get('p50_ms', float('nan')):>10.3f} "
+            f"{_fmt_delta(d50)} {_fmt_delta(d95)}{flag}"
+        )
+    print(f"\n{regressions} benchmark melambat > {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
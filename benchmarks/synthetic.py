@@ -0,0 +1,217 @@
+"""
+Generator data sintetis SKKNI yang realistis (judul Indonesia, nomor SKKNI, kode unit).
+
+Deterministik untuk seed yang sama, dan lazy (generator) supaya skala jutaan baris tidak
+membebani memori. `catalogue()` menghasilkan katalog lengkap (dokumen + unit per dokumen)
+dengan distribusi sektor yang timpang dan jumlah unit per dokumen yang menceng seperti data asli.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import math
+import random
+import uuid as uuid_mod
+
+VERBS = (
+    "Melakukan",
+    "Menyusun",
+    "Mengelola",
+    "Menerapkan",
+    "Mengidentifikasi",
+    "Melaksanakan",
+    "Merencanakan",
+    "Mengoperasikan",
+    "Memelihara",
+    "Mengevaluasi",
+    "Menganalisis",
+    "Mengendalikan",
+)
+OBJECTS = (
+    "Prosedur Keselamatan dan Kesehatan Kerja",
+    "Laporan Keuangan",
+    "Mutu Produk",
+    "Pelayanan Pelanggan",
+    "Jaringan Komputer",
+    "Instalasi Listrik",
+    "Tanaman Kopi",
+    "Gudang Bahan Baku",
+    "Data Pemasaran",
+    "Peralatan Produksi",
+    "Dokumen Ekspor Impor",
+    "Sistem Informasi",
+    "Kegiatan Pelatihan",
+    "Risiko Operasional",
+)
+QUALIFIERS = ("", "", "", "Sesuai Standar", "Tingkat Lanjut", "di Tempat Kerja", "secara Digital")
+STATUSES = ("", "", "", " BERLAKU", " DICABUT", "-DIUBAH", " TIDAK BERLAKU")
+TITLE_PREFIXES = (
+    "Standar Kompetensi Kerja Nasional Indonesia Kategori ",
+    "SKKNI ",
+    "Standar Kompetensi Kerja ",
+    "",
+)
+SECTORS = (
+    "Industri Pengolahan",
+    "Informasi dan Komunikasi",
+    "Pertanian, Kehutanan dan Perikanan",
+    "Perdagangan Besar dan Eceran",
+    "Konstruksi",
+    "Aktivitas Keuangan dan Asuransi",
+)
+NOMOR_FORMATS = (
+    "Nomor {n} Tahun {y}",
+    "SKKNI No. {n} Thn {y}",
+    "Kepmenaker No {n}/{y}",
+    "Keputusan Menteri Tenaga Kerja Nomor {n} Tahun {y}",
+)
+
+
+def unit_titles(n: int, seed: int = 42) -> Iterator[str]:
+    """Judul unit kompetensi, sebagian dengan embel-embel status (BERLAKU/DICABUT/...)."""
+    rnd = random.Random(seed)
+    for _ in range(n):
+        parts = [rnd.choice(VERBS), rnd.choice(OBJECTS), rnd.choice(QUALIFIERS)]
+        yield " ".join(p for p in parts if p) + rnd.choice(STATUSES)
+
+
+def document_titles(n: int, seed: int = 42) -> Iterator[str]:
+    """Judul dokumen SKKNI dengan variasi frasa pembuka yang dibuang oleh build_join_key_judul."""
+    rnd = random.Random(seed)
+    for _ in range(n):
+        yield f"{rnd.choice(TITLE_PREFIXES)}{rnd.choice(SECTORS)} Bidang {rnd.choice(OBJECTS)}"
+
+
+def nomor_strings(n: int, seed: int = 42) -> Iterator[str]:
+    """Nomor SKKNI/Kepmen dengan berbagai format penulisan."""
+    rnd = random.Random(seed)
+    for _ in range(n):
+        yield rnd.choice(NOMOR_FORMATS).format(n=rnd.randint(1, 450), y=rnd.randint(2004, 2025))
+
+
+def unit_codes(n: int, seed: int = 42) -> Iterator[str]:
+    """Kode unit bergaya C.10ABC00.001.1 / J.620100.004.02."""
+    rnd = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTU"
+    for _ in range(n):
+        head = rnd.choice(letters)
+        if rnd.random() < 0.5:
+            group = f"{rnd.randint(10, 99)}{''.join(rnd.choices(letters, k=3))}{rnd.randint(0, 99):02d}"
+        else:
+            group = f"{rnd.randint(100000, 999999)}"
+        yield f"{head}.{group}.{rnd.randint(1, 120):03d}.{rnd.randint(1, 3)}"
+
+
+# --- Katalog lengkap (dokumen + unit) ---
+
+# Sektor (seperti dikembalikan API: huruf besar) -> (huruf KBLI untuk kode unit, bobot, bidang)
+CATALOGUE_SECTORS: dict[str, tuple[str, int, tuple[str, ...]]] = {
+    "INDUSTRI PENGOLAHAN": (
+        "C",
+        30,
+        ("INDUSTRI MAKANAN", "INDUSTRI TEKSTIL", "INDUSTRI BARANG GALIAN BUKAN LOGAM", "INDUSTRI LOGAM DASAR"),
+    ),
+    "INFORMASI DAN KOMUNIKASI": (
+        "J",
+        14,
+        ("AKTIVITAS PEMROGRAMAN, KONSULTASI KOMPUTER", "TELEKOMUNIKASI", "PENYIARAN"),
+    ),
+    "PERTANIAN, KEHUTANAN DAN PERIKANAN": ("A", 12, ("PERTANIAN TANAMAN", "PERIKANAN", "KEHUTANAN")),
+    "PERDAGANGAN BESAR DAN ECERAN; REPARASI DAN PERAWATAN MOBIL DAN SEPEDA MOTOR": (
+        "G",
+        10,
+        ("PERDAGANGAN BESAR, BUKAN MOBIL DAN SEPEDA MOTOR", "PERDAGANGAN ECERAN"),
+    ),
+    "KONSTRUKSI": ("F", 9, ("KONSTRUKSI GEDUNG", "KONSTRUKSI BANGUNAN SIPIL", "KONSTRUKSI KHUSUS")),
+    "AKTIVITAS KEUANGAN DAN ASURANSI": ("K", 6, ("JASA KEUANGAN", "ASURANSI")),
+    "PENYEDIAAN AKOMODASI DAN PENYEDIAAN MAKAN MINUM": ("I", 6, ("PENYEDIAAN AKOMODASI", "PENYEDIAAN MAKAN MINUM")),
+    "PERTAMBANGAN DAN PENGGALIAN": ("B", 5, ("PERTAMBANGAN BATU BARA", "PERTAMBANGAN MINYAK BUMI DAN GAS ALAM")),
+    "PENGANGKUTAN DAN PERGUDANGAN": ("H", 4, ("ANGKUTAN DARAT", "PERGUDANGAN")),
+    "AKTIVITAS KESEHATAN MANUSIA DAN AKTIVITAS SOSIAL": ("Q", 4, ("AKTIVITAS KESEHATAN MANUSIA",)),
+}
+# sebagian besar dokumen asli tidak punya sub_bidang
+SUB_BIDANG_RATE = 0.3
+UNDUH_URL = "https://skkni-api.kemnaker.go.id/v1/public/documents/{uuid}/download"
+MAX_UNITS_PER_DOC = 400
+
+
+def _uuid4(rnd: random.Random) -> str:
+    return str(uuid_mod.UUID(int=rnd.getrandbits(128), version=4))
+
+
+def _unit_count(rnd: random.Random, mean: float) -> int:
+    # lognormal: kebanyakan dokumen puluhan unit, ekor panjang sampai ratusan
+    sigma = 0.6
+    mu = math.log(max(mean, 1.0)) - sigma**2 / 2
+    return max(1, min(MAX_UNITS_PER_DOC, round(rnd.lognormvariate(mu, sigma))))
+
+
+def _document(rnd: random.Random, sectors: list[str], weights: list[int]) -> dict:
+    sektor = rnd.choices(sectors, weights)[0]
+    _, _, bidang_opts = CATALOGUE_SECTORS[sektor]
+    bidang = rnd.choice(bidang_opts)
+    tahun = rnd.randint(2004, 2025)
+    nomor = f"Nomor {rnd.randint(1, 450)} Tahun {tahun}"
+    uuid = _uuid4(rnd)
+    return {
+        "uuid": uuid,
+        "judul_skkni": f"{rnd.choice(TITLE_PREFIXES)}{bidang.title()} Bidang {rnd.choice(OBJECTS)}",
+        "nomor_skkni": nomor,
+        "sektor": sektor,
+        "bidang": bidang,
+        "sub_bidang": rnd.choice(OBJECTS).upper() if rnd.random() < SUB_BIDANG_RATE else None,
+        "tahun": str(tahun),
+        "nomor_kepmen": nomor,
+        "unduh_url": UNDUH_URL.format(uuid=uuid),
+        "listing_url": "",
+    }
+
+
+def document_units(doc: dict, n: int, seed: int = 42) -> list[dict]:
+    """
+    Unit satu dokumen katalog. RNG diturunkan dari seed + uuid, jadi unit bisa dibangun ulang
+    per dokumen tanpa mengulang seluruh katalog (dipakai mock upstream).
+    """
+    rnd = random.Random(f"{seed}/{doc['uuid']}")
+    letter = CATALOGUE_SECTORS[doc["sektor"]][0]
+    group = f"{rnd.randint(10, 99)}{''.join(rnd.choices('ABCDEFGHIJKLMNOPQRSTU', k=3))}{rnd.randint(0, 99):02d}"
+    version = rnd.randint(1, 3)
+    units = []
+    for i in range(1, n + 1):
+        parts = [rnd.choice(VERBS), rnd.choice(OBJECTS), rnd.choice(QUALIFIERS)]
+        units.append(
+            {
+                "doc_uuid": doc["uuid"],
+                "kode_unit": f"{letter}.{group}.{i:03d}.{version}",
+                "judul_unit": " ".join(p for p in parts if p),
+                "nomor_skkni": doc["nomor_skkni"],
+                "sektor": doc["sektor"],
+                "bidang": doc["bidang"],
+                "sub_bidang": doc["sub_bidang"],
+                "tahun": doc["tahun"],
+                "unduh_url": doc["unduh_url"],
+            }
+        )
+    return units
+
+
+def catalogue_documents(n_docs: int, units_per_doc: float = 50, seed: int = 42) -> Iterator[tuple[dict, int]]:
+    """(dokumen, jumlah unit) per dokumen katalog, lazy; unitnya lewat document_units(doc, n, seed)."""
+    rnd = random.Random(seed)
+    sectors = list(CATALOGUE_SECTORS)
+    weights = [CATALOGUE_SECTORS[s][1] for s in sectors]
+    for _ in range(n_docs):
+        yield _document(rnd, sectors, weights), _unit_count(rnd, units_per_doc)
+
+
+def catalogue(n_docs: int, units_per_doc: float = 50, seed: int = 42) -> Iterator[tuple[dict, list[dict]]]:
+    """
+    Katalog sintetis: (dokumen, unit-unitnya) per dokumen, lazy.
+
+    Args:
+        n_docs: Jumlah dokumen (mis. 100_000).
+        units_per_doc: Rata-rata unit per dokumen (100_000 x 50 ≈ 5 juta unit).
+        seed: Seed RNG; katalog identik untuk seed & ukuran yang sama.
+    """
+    for doc, n in catalogue_documents(n_docs, units_per_doc, seed):
+        yield doc, document_units(doc, n, seed)
@@ -0,0 +1,244 @@
+"""
+Benchmark hot path crud, service & endpoint di atas katalog sintetis berskala (pytest-benchmark).
+
+Jalankan:  pytest benchmarks/test_bench_catalogue.py --benchmark-only
+Skala:     BENCH_DOCS=2000 BENCH_UNITS_PER_DOC=50 (default ≈ 100 ribu unit);
+           target produksi: BENCH_DOCS=100000 (≈ 5 juta unit, build sekali lalu dipakai ulang).
+Lokasi DB: BENCH_DB_DIR (default <tmp>/skkni-bench); lihat benchmarks/catalogue.py.
+Bandingkan antar commit: --benchmark-autosave lalu
+           python -m benchmarks.report .benchmarks/<mesin>/0001_*.json .benchmarks/<mesin>/0002_*.json
+
+Tiap benchmark mencatat p50/p95/p99 (ms) & ops/s di extra_info (ikut tersimpan di JSON autosave).
+Benchmark tulis berjalan di dalam SAVEPOINT yang di-rollback, jadi katalog tetap utuh.
+"""
+
+from collections.abc import Iterable, Sequence
+import os
+import tempfile
+
+from benchmarks.catalogue import ensure_catalogue
+
+DOCS = int(os.getenv("BENCH_DOCS", "2000"))
+UNITS_PER_DOC = float(os.getenv("BENCH_UNITS_PER_DOC", "50"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "30"))
+DB_DIR = os.getenv("BENCH_DB_DIR", os.path.join(tempfile.gettempdir(), "skkni-bench"))
+
+# Engine app dibuat saat import app.core.db: arahkan ke katalog sebelum modul app dimuat
+DB_PATH = ensure_catalogue(DOCS, UNITS_PER_DOC, out_dir=DB_DIR)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.db import crud, models  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.report import percentiles  # noqa: E402
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _check_engine():
+    if engine.url.database != str(DB_PATH):
+        pytest.skip(f"app.core.db sudah terhubung ke {engine.url}; jalankan benchmarks terpisah dari tests/")
+
+
+@pytest.fixture(scope="module")
+def db():
+    with SessionLocal() as s:
+        yield s
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def sample(db):
+    """Nilai filter nyata dari katalog (sektor terbesar, bidang, tahun, dokumen terbesar, 500 kode unit)."""
+    sektor, bidang, tahun = db.execute(
+        select(models.Document.sektor, models.Document.bidang, models.Document.tahun)
+        .group_by(models.Document.sektor, models.Document.bidang, models.Document.tahun)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).one()
+    doc_uuid = db.execute(
+        select(models.Unit.doc_uuid).group_by(models.Unit.doc_uuid).order_by(func.count().desc()).limit(1)
+    ).scalar_one()
+    kode = db.execute(select(models.Unit.kode_unit).order_by(models.Unit.id).limit(500)).scalars().all()
+    return {"sektor": sektor, "bidang": bidang, "tahun": tahun, "doc_uuid": doc_uuid, "kode_unit": list(kode)}
+
+
+def _run(benchmark, fn, *args, rows: int | None = None, rounds: int = ROUNDS, **kwargs):
+    out = benchmark.pedantic(fn, args=args, kwargs=kwargs, rounds=rounds, iterations=1, warmup_rounds=2)
+    benchmark.extra_info["catalogue_units"] = round(DOCS * UNITS_PER_DOC)
+    # --benchmark-disable (smoke CI): fn hanya dijalankan sekali, tanpa statistik
+    if benchmark.stats:
+        benchmark.extra_info.update(percentiles(benchmark.stats.stats.data))
+        if rows:
+            benchmark.extra_info["rows_per_sec"] = round(rows / benchmark.stats.stats.mean)
+    return out
+
+
+# --- crud: baca ---
+
+
+@pytest.mark.benchmark(group="crud-get-units")
+@pytest.mark.parametrize("case", ["all", "sektor", "sektor+tahun", "doc_uuid", "q", "fuzzy", "facets"])
+def test_get_units(benchmark, db, sample, case):
+    kwargs = {
+        "all": {},
+        "sektor": {"sektor": sample["sektor"]},
+        "sektor+tahun": {"sektor": sample["sektor"], "tahun": sample["tahun"]},
+        "doc_uuid": {"doc_uuid": sample["doc_uuid"]},
+        "q": {"q": "Mutu Produk"},
+        "fuzzy": {"q": "mengelola gudang bahn baku", "fuzzy": True},
+        "facets": {"facets": ("sektor", "bidang", "tahun")},
+    }[case]
+    total, items, _ = _run(benchmark, crud.get_units_with_facets, db, limit=50, **kwargs)
+    assert total >= len(items) > 0
+
+
+@pytest.mark.benchmark(group="crud-get-documents")
+@pytest.mark.parametrize("case", ["all", "sektor", "q", "fuzzy"])
+def test_get_documents(benchmark, db, sample, case):
+    kwargs = {
+        "all": {},
+        "sektor": {"sektor": sample["sektor"]},
+        "q": {"q": "Laporan Keuangan"},
+        "fuzzy": {"q": "laporan keungan", "fuzzy": True},
+    }[case]
+    total, items = _run(benchmark, crud.get_documents, db, limit=20, **kwargs)
+    assert total >= len(items) > 0
+
+
+@pytest.mark.benchmark(group="crud-taxonomy")
+@pytest.mark.parametrize("fn", [crud.get_distinct_sectors, crud.get_distinct_bidang, crud.get_distinct_sub_bidang])
+def test_taxonomy(benchmark, db, fn):
+    assert _run(benchmark, fn, db)
+
+
+@pytest.mark.benchmark(group="crud-lookup")
+def test_lookup_units(benchmark, db, sample):
+    items, missing, _ = _run(benchmark, crud.lookup_units, db, kode_units=sample["kode_unit"], rows=500)
+    assert items and not missing
+
+
+# --- service: merge unit↔dokumen (jalur SkkniService.search_units include_merged) ---
+
+
+@pytest.mark.benchmark(group="service-merged")
+@pytest.mark.parametrize("case", ["all", "sektor", "q"])
+def test_units_merged(benchmark, db, sample, case):
+    kwargs = {"all": {}, "sektor": {"sektor": sample["sektor"].lower()}, "q": {"q": "Mutu"}}[case]
+    total, items = _run(benchmark, crud.get_units_merged, db, limit=50, **kwargs)
+    assert total >= len(items) > 0
+
+
+# --- crud: tulis (di dalam SAVEPOINT yang di-rollback) ---
+
+
+@pytest.fixture()
+def write_db():
+    conn = engine.connect()
+    outer = conn.begin()
+    # pysqlite tidak mengirim BEGIN sendiri; tanpa ini RELEASE SAVEPOINT (commit di crud) langsung
+    # permanen dan tulisan benchmark bocor ke katalog cache
+    conn.exec_driver_sql("BEGIN")
+    s = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        yield s
+    finally:
+        s.close()
+        outer.rollback()
+        conn.close()
+
+
+def _doc_units(db: Session, limit_docs: int) -> dict[str, list[dict]]:
+    uuids: Sequence[str] = (
+        db.execute(select(models.Document.uuid).order_by(models.Document.uuid).limit(limit_docs)).scalars().all()
+    )
+    # unduh_url ikut row_hash unit tapi disimpan di dokumen: sertakan seperti payload worker
+    rows: Iterable[tuple[models.Unit, str | None]] = db.execute(
+        select(models.Unit, models.Document.unduh_url)
+        .join(models.Document, models.Document.uuid == models.Unit.doc_uuid)
+        .where(models.Unit.doc_uuid.in_(uuids))
+    ).tuples()
+    out: dict[str, list[dict]] = {}
+    for u, unduh_url in rows:
+        out.setdefault(u.doc_uuid, []).append(
+            {"unduh_url": unduh_url}
+            | {
+                c: getattr(u, c)
+                for c in (
+                    "doc_uuid",
+                    "kode_unit",
+                    "judul_unit",
+                    "nomor_skkni",
+                    "sektor",
+                    "bidang",
+                    "sub_bidang",
+                    "tahun",
+                    "updated_at",
+                )
+            }
+        )
+    return out
+
+
+@pytest.mark.benchmark(group="crud-write")
+def test_sync_units_noop(benchmark, write_db):
+    units_by_doc = _doc_units(write_db, 100)
+    n = sum(len(v) for v in units_by_doc.values())
+    changes = _run(benchmark, crud.sync_units, write_db, units_by_doc, rows=n, rounds=max(3, ROUNDS // 3))
+    assert all(cs.is_empty for cs in changes)
+
+
+@pytest.mark.benchmark(group="crud-write")
+def test_upsert_units_changed(benchmark, write_db):
+    units = [u for rows in _doc_units(write_db, 20).values() for u in rows][:1000]
+    state = {"round": 0}
+
+    def setup():
+        # judul berubah tiap round supaya selalu ada delta (update + re-index trigram + changelog)
+        state["round"] += 1
+        return ([u | {"judul_unit": f"{u['judul_unit']} Revisi {state['round']}"} for u in units],), {}
+
+    def upsert(batch):
+        crud.upsert_units(write_db, batch)
+
+    benchmark.pedantic(upsert, setup=setup, rounds=max(3, ROUNDS // 3), iterations=1)
+    if benchmark.stats:
+        benchmark.extra_info.update(percentiles(benchmark.stats.stats.data))
+        benchmark.extra_info["rows_per_sec"] = round(len(units) / benchmark.stats.stats.mean)
+
+
+# --- endpoint (ASGI penuh lewat TestClient: middleware, validasi, serialisasi) ---
+
+
+@pytest.mark.benchmark(group="endpoint")
+@pytest.mark.parametrize(
+    "path,params",
+    [
+        ("/skkni/search-units", {"limit": 50}),
+        ("/skkni/search-units", {"limit": 50, "q": "Mutu Produk"}),
+        ("/skkni/search-units", {"limit": 50, "facets": "sektor,bidang,tahun"}),
+        ("/skkni/search-units", {"limit": 50, "include_merged": True}),
+        ("/skkni/search-documents", {"limit": 20, "q": "Laporan"}),
+        ("/skkni/sectors", {}),
+        ("/skkni/bidang", {}),
+        ("/skkni/sub-bidang", {}),
+    ],
+    ids=["units", "units-q", "units-facets", "units-merged", "documents-q", "sectors", "bidang", "sub-bidang"],
+)
+def test_endpoint(benchmark, client, path, params):
+    r = _run(benchmark, client.get, path, params=params)
+    assert r.status_code == 200
+
+
+@pytest.mark.benchmark(group="endpoint")
+def test_endpoint_lookup(benchmark, client, sample):
+    r = _run(benchmark, client.post, "/skkni/units/lookup", json={"kode_unit": sample["kode_unit"]}, rows=500)
+    assert r.status_code == 200
@@ -0,0 +1,80 @@
+"""
+Benchmark throughput normalizer app/utils/parsing.py (pytest-benchmark).
+
+Jalankan:  pytest benchmarks/test_bench_parsing.py --benchmark-only
+Skala:     BENCH_N=1000000 (default) — judul & nomor realistis dari benchmarks.synthetic.
+Bandingkan antar commit: --benchmark-autosave lalu --benchmark-compare.
+"""
+
+import os
+
+import pytest
+
+from app.utils import parsing
+from benchmarks import synthetic
+
+N = int(os.getenv("BENCH_N", "1000000"))
+
+
+@pytest.fixture(scope="module")
+def unit_titles():
+    return list(synthetic.unit_titles(N))
+
+
+@pytest.fixture(scope="module")
+def document_titles():
+    return list(synthetic.document_titles(N))
+
+
+@pytest.fixture(scope="module")
+def nomor_strings():
+    return list(synthetic.nomor_strings(N))
+
+
+def _run(benchmark, fn, data):
+    out = benchmark.pedantic(fn, args=(data,), rounds=3, iterations=1, warmup_rounds=0)
+    assert len(out) == len(data)
+    benchmark.extra_info["rows"] = len(data)
+    # --benchmark-disable (smoke CI): fn hanya dijalankan sekali, tanpa statistik
+    if benchmark.stats:
+        benchmark.extra_info["rows_per_sec"] = round(len(data) / benchmark.stats.stats.mean)
+
+
+def _per_item(fn):
+    def run(values):
+        return [fn(v) for v in values]
+
+    return run
+
+
+@pytest.mark.benchmark(group="norm")
+@pytest.mark.parametrize("mode", ["single", "batch"])
+def test_norm(benchmark, unit_titles, mode):
+    _run(benchmark, parsing.norm_batch if mode == "batch" else _per_item(parsing.norm), unit_titles)
+
+
+@pytest.mark.benchmark(group="slug")
+@pytest.mark.parametrize("mode", ["single", "batch"])
+def test_slug(benchmark, unit_titles, mode):
+    _run(benchmark, parsing.slug_batch if mode == "batch" else _per_item(parsing.slug), unit_titles)
+
+
+@pytest.mark.benchmark(group="strip_status_tokens")
+@pytest.mark.parametrize("mode", ["single", "batch"])
+def test_strip_status_tokens(benchmark, unit_titles, mode):
+    fn = parsing.strip_status_tokens_batch if mode == "batch" else _per_item(parsing.strip_status_tokens)
+    _run(benchmark, fn, unit_titles)
+
+
+@pytest.mark.benchmark(group="join_key_nomor")
+@pytest.mark.parametrize("mode", ["single", "batch"])
+def test_build_join_key_nomor(benchmark, nomor_strings, mode):
+    fn = parsing.build_join_key_nomor_batch if mode == "batch" else _per_item(parsing.build_join_key_nomor)
+    _run(benchmark, fn, nomor_strings)
+
+
+@pytest.mark.benchmark(group="join_key_judul")
+@pytest.mark.parametrize("mode", ["single", "batch"])
+def test_build_join_key_judul(benchmark, document_titles, mode):
+    fn = parsing.build_join_key_judul_batch if mode == "batch" else _per_item(parsing.build_join_key_judul)
+    _run(benchmark, fn, document_titles)
@@ -1,4 +1,8 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
 import os
+from uuid import uuid4
 
 import pytest
 
@@ -7,10 +11,13 @@ os.environ.setdefault("DATABASE_URL", "sqlite:///./test_unit.db")
 os.environ.setdefault("HEADLESS", "true")
 os.environ.setdefault("CACHE_TTL_DAYS", "30")
 os.environ.setdefault("MAX_CONCURRENCY", "2")
+os.environ.setdefault("SQL_PROFILING", "true")
 
 from fastapi.testclient import TestClient
+from sqlalchemy import and_, delete, or_, select
 
 from app.core.db import Base, SessionLocal, engine  # type: ignore[attr-defined]
+from app.db import crud, models
 
 # Import after env is set
 from app.main import app
@@ -39,6 +46,72 @@ def db():
         db.close()
 
 
+SEED_TS = datetime(2024, 1, 1)
+
+
+@dataclass
+class Seeded:
+    documents: list[dict]
+    units: list[dict]
+
+    @property
+    def doc_uuid(self) -> str:
+        return self.documents[0]["uuid"]
+
+
+def _default_document() -> dict:
+    return {"uuid": str(uuid4()), "judul_skkni": "SKKNI Uji", "updated_at": SEED_TS}
+
+
+@pytest.fixture()
+def seed_catalogue(db):
+    """
+    Factory data katalog: seed_catalogue(documents=[override, ...], units=[override, ...]) -> Seeded.
+
+    Field yang tidak di-override diisi default (uuid/kode acak, judul, updated_at); unit tanpa
+    `doc_uuid` masuk ke dokumen pertama panggilan itu (dibuat bila tidak ada). Semua dokumen,
+    unit & trigram yang dibuat dihapus saat teardown.
+    """
+    doc_uuids: set[str] = set()
+    unit_keys: set[tuple[str, str]] = set()
+
+    def make(documents: Iterable[dict] = (), units: Iterable[dict] = ()) -> Seeded:
+        docs = [_default_document() | d for d in documents]
+        unit_overrides = list(units)
+        if not docs and any("doc_uuid" not in u for u in unit_overrides):
+            docs.append(_default_document())
+        default_doc = docs[0]["uuid"] if docs else None
+        rows = [
+            {
+                "doc_uuid": default_doc,
+                "kode_unit": f"UJI.{uuid4().hex[:12]}",
+                "judul_unit": "Unit Uji",
+                "updated_at": SEED_TS,
+            }
+            | u
+            for u in unit_overrides
+        ]
+        if docs:
+            crud.upsert_documents(db, docs)
+            doc_uuids.update(d["uuid"] for d in docs)
+        if rows:
+            crud.upsert_units(db, rows)
+            unit_keys.update((u["doc_uuid"], u["kode_unit"]) for u in rows)
+        return Seeded(docs, rows)
+
+    yield make
+
+    db.rollback()
+    # unit dengan doc_uuid di luar dokumen seed (mis. dokumen tak dikenal) dihapus per kunci
+    orphans = [and_(models.Unit.doc_uuid == d, models.Unit.kode_unit == k) for d, k in unit_keys if d not in doc_uuids]
+    unit_ids = select(models.Unit.id).where(or_(models.Unit.doc_uuid.in_(doc_uuids), *orphans))
+    db.execute(delete(models.UnitTrigram).where(models.UnitTrigram.unit_id.in_(unit_ids)))
+    db.execute(delete(models.Unit).where(models.Unit.id.in_(unit_ids)))
+    db.execute(delete(models.DocumentTrigram).where(models.DocumentTrigram.doc_uuid.in_(doc_uuids)))
+    db.execute(delete(models.Document).where(models.Document.uuid.in_(doc_uuids)))
+    db.commit()
+
+
 @pytest.fixture()
 def mock_repo(monkeypatch):
     """
@@ -0,0 +1,201 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from app.utils.playwright_helper import BrowserPool, capture_json_responses, make_route_handler  # noqa: E402
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        return FakeContext()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePool(BrowserPool):
+    async def _launch_browser(self):
+        return FakeBrowser()
+
+
+def test_pool_reuses_and_recycles_pages():
+    async def run():
+        pool = FakePool(size=1, max_uses=2)
+        async with pool.page() as p1:
+            pass
+        async with pool.page() as p2:
+            pass
+        assert p1 is p2
+        # max_uses tercapai -> context baru
+        async with pool.page() as p3:
+            pass
+        assert p3 is not p1
+        assert pool.stats()["recycles"] == 1
+
+        # page crash -> recycle
+        p3.closed = True
+        p4 = await pool.acquire()
+        assert p4 is not p3
+        await pool.release(p4)
+
+        # browser putus -> launch ulang
+        pool._browser.connected = False
+        async with pool.page():
+            pass
+        assert pool.stats()["launches"] == 2
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_pool_bounds_concurrent_pages_and_recycles_on_error():
+    async def run():
+        pool = FakePool(size=2, max_uses=100)
+        active = 0
+        peak = 0
+
+        async def work():
+            nonlocal active, peak
+            async with pool.page():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+        assert peak == 2
+        assert pool.stats() == {"size": 2, "in_use": 0, "launches": 1, "recycles": 0}
+
+        with pytest.raises(ValueError):
+            async with pool.page() as page:
+                raise ValueError("scrape gagal")
+        slots = list(pool._idle._queue)
+        assert any(s.broken and s.page is page for s in slots)
+        await pool.close()
+
+    asyncio.run(run())
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.result = None
+
+    async def abort(self):
+        self.result = "abort"
+
+    async def continue_(self):
+        self.result = "continue"
+
+
+def test_route_handler_blocks_non_essential_resources():
+    handler = make_route_handler()
+    cases = {
+        ("https://skkni.kemnaker.go.id/logo.png", "image"): "abort",
+        ("https://skkni.kemnaker.go.id/app.css", "stylesheet"): "abort",
+        ("https://www.googletagmanager.com/gtm.js", "script"): "abort",
+        ("https://skkni.kemnaker.go.id/app.js", "script"): "continue",
+        ("https://skkni-api.kemnaker.go.id/v1/public/documents", "fetch"): "continue",
+    }
+
+    async def run():
+        out = {}
+        for key in cases:
+            route = FakeRoute(*key)
+            await handler(route)
+            out[key] = route.result
+        return out
+
+    assert asyncio.run(run()) == cases
+
+
+def test_pool_installs_blocking_on_new_contexts():
+    async def run():
+        pool = FakePool(size=1, block=True)
+        async with pool.page():
+            pass
+        slot = pool._idle._queue[0]
+        assert [p for p, _ in slot.context.routes] == ["**/*"]
+        await pool.close()
+
+    asyncio.run(run())
+
+
+class FakeResponse:
+    def __init__(self, url, data, resource_type="fetch", ctype="application/json"):
+        self.url = url
+        self.status = 200
+        self.headers = {"content-type": ctype}
+        self.request = FakeRequest(url, resource_type)
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+
+class FakeNavPage:
+    def __init__(self, responses):
+        self.responses = responses
+        self.listeners = []
+
+    def on(self, event, fn):
+        self.listeners.append(fn)
+
+    def remove_listener(self, event, fn):
+        self.listeners.remove(fn)
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        for r in self.responses:
+            for fn in list(self.listeners):
+                fn(r)
+
+
+def test_capture_json_responses_filters_matching_api_calls():
+    page = FakeNavPage(
+        [
+            FakeResponse("https://api/v1/public/documents?page=1", {"data": [1]}),
+            FakeResponse("https://api/v1/public/documents?page=2", "<html>", ctype="text/html"),
+            FakeResponse("https://api/v1/public/documents/logo", {}, resource_type="image"),
+            FakeResponse("https://api/v1/other", {"x": 1}),
+        ]
+    )
+    got = asyncio.run(capture_json_responses(page, "https://skkni/dokumen", "/v1/public/documents"))
+    assert got == [{"url": "https://api/v1/public/documents?page=1", "status": 200, "data": {"data": [1]}}]
+    assert page.listeners == []
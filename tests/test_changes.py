@@ -0,0 +1,56 @@
+from datetime import datetime
+import json
+
+from fastapi.testclient import TestClient
+
+from app.db import crud
+
+DOC_UUID = "11111111-2222-3333-4444-000000000043"
+TS = datetime(2024, 6, 1)
+
+
+def _unit(kode, judul):
+    return {"doc_uuid": DOC_UUID, "kode_unit": kode, "judul_unit": judul, "updated_at": TS}
+
+
+def test_change_feed_pages_through_inserts_updates_deletes(client: TestClient, db):
+    since = crud.get_latest_change_seq(db)
+
+    crud.upsert_documents(db, [{"uuid": DOC_UUID, "judul_skkni": "SKKNI Changelog", "updated_at": TS}])
+    crud.sync_units(db, {DOC_UUID: [_unit("C.1", "Satu"), _unit("C.2", "Dua")]})
+    # tanpa perubahan -> tidak ada entri baru
+    crud.upsert_documents(db, [{"uuid": DOC_UUID, "judul_skkni": "SKKNI Changelog", "updated_at": TS}])
+    crud.sync_units(db, {DOC_UUID: [_unit("C.1", "Satu Baru")]})
+
+    r = client.get("/skkni/changes", params={"since": since, "limit": 3})
+    assert r.status_code == 200
+    page1 = r.json()
+    assert page1["has_more"] is True
+    assert [(c["entity"], c["op"], c["key"]) for c in page1["items"]] == [
+        ("document", "insert", DOC_UUID),
+        ("unit", "insert", f"{DOC_UUID}/C.1"),
+        ("unit", "insert", f"{DOC_UUID}/C.2"),
+    ]
+
+    r = client.get("/skkni/changes", params={"since": page1["next_since"], "limit": 3})
+    page2 = r.json()
+    assert page2["has_more"] is False
+    assert [(c["op"], c["key"]) for c in page2["items"]] == [
+        ("update", f"{DOC_UUID}/C.1"),
+        ("delete", f"{DOC_UUID}/C.2"),
+    ]
+    assert page2["items"][0]["data"]["judul_unit"] == "Satu Baru"
+    assert page2["next_since"] == page2["latest_seq"]
+
+    seqs = [c["seq"] for c in page1["items"] + page2["items"]]
+    assert seqs == sorted(seqs)
+
+    s = client.get("/skkni/changes/stream", params={"since": since, "chunk_size": 2})
+    streamed = [json.loads(line) for line in s.text.splitlines()]
+    assert [c["seq"] for c in streamed] == seqs
+
+
+def test_change_feed_empty_keeps_cursor(client: TestClient, db):
+    latest = crud.get_latest_change_seq(db)
+    data = client.get("/skkni/changes", params={"since": latest}).json()
+    assert data == {"since": latest, "next_since": latest, "has_more": False, "latest_seq": latest, "items": []}
@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+
+def test_export_units_ndjson_resume(client: TestClient, seed_catalogue):
+    doc_uuid = seed_catalogue(units=[{"kode_unit": f"EXP.{i:03d}"} for i in range(7)]).doc_uuid
+
+    r = client.get("/skkni/export", params={"entity": "units", "doc_uuid": doc_uuid, "chunk_size": 3})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [x["kode_unit"] for x in rows] == [f"EXP.{i:03d}" for i in range(7)]
+
+    # resume dari id baris ke-4
+    r2 = client.get(
+        "/skkni/export",
+        params={"entity": "units", "doc_uuid": doc_uuid, "cursor": rows[3]["id"], "chunk_size": 2},
+    )
+    rest = [json.loads(line) for line in r2.text.splitlines()]
+    assert [x["kode_unit"] for x in rest] == [f"EXP.{i:03d}" for i in range(4, 7)]
+
+
+def test_export_documents_csv_filtered(client: TestClient, seed_catalogue):
+    doc_uuid = seed_catalogue(documents=[{"sektor": "EKSPOR"}]).doc_uuid
+
+    r = client.get("/skkni/export", params={"entity": "documents", "format": "csv", "sektor": "EKSPOR"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [x["uuid"] for x in rows] == [doc_uuid]
+
+
+def test_export_units_rejects_non_integer_cursor(client: TestClient):
+    r = client.get("/skkni/export", params={"entity": "units", "cursor": "abc"})
+    assert r.status_code == 422
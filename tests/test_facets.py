@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+# (sektor, bidang, tahun) per dokumen; tiap dokumen punya 2 unit dengan taksonomi yang sama
+TAXONOMY = [("FACET-A", "BIDANG-1", "2021"), ("FACET-A", "BIDANG-2", "2022"), ("FACET-B", "BIDANG-1", "2022")]
+
+
+def _seed(seed_catalogue):
+    for n, (sektor, bidang, tahun) in enumerate(TAXONOMY):
+        taxonomy = {"sektor": sektor, "bidang": bidang, "tahun": tahun}
+        seed_catalogue(documents=[taxonomy], units=[taxonomy | {"kode_unit": f"FCT.{n}.{i}"} for i in range(2)])
+
+
+def test_search_units_facets_follow_filters(client: TestClient, seed_catalogue):
+    _seed(seed_catalogue)
+    r = client.get("/skkni/search-units", params={"q": "FCT.", "tahun": "2022", "facets": "sektor,bidang,tahun"})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["count"] == 4
+    assert data["facets"]["sektor"] == [{"name": "FACET-A", "count": 2}, {"name": "FACET-B", "count": 2}]
+    assert {x["name"]: x["count"] for x in data["facets"]["bidang"]} == {"BIDANG-1": 2, "BIDANG-2": 2}
+    assert data["facets"]["tahun"] == [{"name": "2022", "count": 4}]
+
+
+def test_search_documents_facets_and_validation(client: TestClient, seed_catalogue):
+    _seed(seed_catalogue)
+    r = client.get("/skkni/search-documents", params={"sektor": "FACET-A", "facets": "bidang"})
+    data = r.json()
+    assert data["count"] == 2
+    assert set(data["facets"]) == {"bidang"}
+
+    assert "facets" not in client.get("/skkni/search-documents", params={"sektor": "FACET-A"}).json()
+    assert client.get("/skkni/search-documents", params={"facets": "warna"}).status_code == 422
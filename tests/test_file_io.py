@@ -0,0 +1,70 @@
+import csv
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from app.db import crud
+from app.utils import file_io
+from app.utils.parsing import make_unit_id
+
+UNITS = [
+    {"kode_unit": "G.47PEI00.001.1", "judul_unit": "Identifikasi Perilaku Konsumen", "nomor_skkni": "Nomor 257"},
+    {"kode_unit": "G.47PEI00.003.1", "judul_unit": "Menentukan Target & Pasar", "nomor_skkni": None},
+]
+
+
+def test_write_csv_from_generator_and_tuples(tmp_path):
+    path = tmp_path / "units.csv"
+    n = file_io.write_csv((u for u in UNITS), str(path))
+    assert n == 2
+    rows = list(csv.DictReader(open(path, encoding="utf-8")))
+    assert rows[1]["judul_unit"] == "Menentukan Target & Pasar"
+    assert rows[1]["nomor_skkni"] == ""
+
+    # tuple dari cursor DB-API butuh `fields`
+    path2 = tmp_path / "tuples.csv"
+    file_io.write_csv(iter([("a", 1), ("b", 2)]), str(path2), fields=["k", "v"])
+    assert open(path2, encoding="utf-8").read().splitlines() == ["k,v", "a,1", "b,2"]
+
+
+def test_write_csv_late_keys_go_to_overflow_column(tmp_path):
+    path = tmp_path / "mixed.csv"
+    rows = [{"a": 1}, {"a": 2, "b": "x"}, {"c": 3, "a": 4}]
+    assert file_io.write_csv(iter(rows), str(path)) == 3
+    out = list(csv.DictReader(open(path, encoding="utf-8")))
+    assert list(out[0]) == ["a", file_io.OVERFLOW_COLUMN]
+    assert [r["a"] for r in out] == ["1", "2", "4"]
+    assert [r[file_io.OVERFLOW_COLUMN] for r in out] == ["", '{"b": "x"}', '{"c": 3}']
+
+
+def test_save_csv_uses_unit_fields(tmp_path):
+    path = tmp_path / "save.csv"
+    file_io.save_csv(iter(UNITS), str(path))
+    out = list(csv.DictReader(open(path, encoding="utf-8")))
+    assert list(out[0]) == list(crud.UNIT_FIELDS)
+    assert out[0]["kode_unit"] == "G.47PEI00.001.1"
+
+
+def test_write_xlsx_write_only(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "units.xlsx"
+    assert file_io.write_xlsx(iter(UNITS), str(path)) == 2
+    ws = openpyxl.load_workbook(path).active
+    assert [c.value for c in ws[1]] == ["kode_unit", "judul_unit", "nomor_skkni", file_io.OVERFLOW_COLUMN]
+    assert ws.max_row == 3
+
+
+def test_odoo_csv_and_xml_use_unit_xml_id(tmp_path):
+    expected_id = make_unit_id("G.47PEI00.001.1", "Identifikasi Perilaku Konsumen", "Nomor 257")
+
+    csv_path = tmp_path / "odoo.csv"
+    file_io.write_odoo_csv(UNITS, str(csv_path))
+    rows = list(csv.DictReader(open(csv_path, encoding="utf-8")))
+    assert rows[0]["id"] == expected_id
+    assert rows[0]["code"] == "G.47PEI00.001.1"
+
+    xml_path = tmp_path / "odoo.xml"
+    assert file_io.write_odoo_xml(UNITS, str(xml_path)) == 2
+    records = ET.parse(xml_path).getroot().findall("./data/record")
+    assert records[0].get("id") == expected_id
+    assert records[1].find("field[@name='name']").text == "Menentukan Target & Pasar"
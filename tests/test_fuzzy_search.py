@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.db import crud, models
+
+TS = datetime(2024, 1, 1)
+
+
+def _seed(seed_catalogue) -> str:
+    return seed_catalogue(
+        documents=[{"judul_skkni": "SKKNI Budidaya Kopi Arabika", "sektor": "PERTANIAN"}],
+        units=[
+            {"kode_unit": "FZ.001", "judul_unit": "Melakukan Pemangkasan Tanaman Kopi"},
+            {"kode_unit": "FZ.002", "judul_unit": "Menyusun Laporan Keuangan"},
+        ],
+    ).doc_uuid
+
+
+def test_fuzzy_units_tolerates_typos(client: TestClient, seed_catalogue):
+    _seed(seed_catalogue)
+
+    plain = client.get("/skkni/search-units", params={"q": "pemangkasan tanaman kopy"}).json()
+    assert plain["count"] == 0
+
+    r = client.get("/skkni/search-units", params={"q": "pemangksan tanaman kopy", "fuzzy": True})
+    assert r.status_code == 200
+    items = r.json()["items"]
+    assert items[0]["kode_unit"] == "FZ.001"
+    assert 0 < items[0]["score"] <= 1
+    assert all(x["kode_unit"] != "FZ.002" for x in items)
+
+
+def test_fuzzy_documents_with_filter(client: TestClient, seed_catalogue):
+    doc_uuid = _seed(seed_catalogue)
+
+    r = client.get(
+        "/skkni/search-documents", params={"q": "budi daya kopi arabica", "fuzzy": True, "sektor": "PERTANIAN"}
+    )
+    assert [x["uuid"] for x in r.json()["items"]] == [doc_uuid]
+
+    r2 = client.get("/skkni/search-documents", params={"q": "budi daya kopi arabica", "fuzzy": True, "sektor": "LAIN"})
+    assert r2.json()["count"] == 0
+
+
+def test_trigram_index_follows_title_changes(db, seed_catalogue):
+    doc_uuid = _seed(seed_catalogue)
+    crud.upsert_units(
+        db,
+        [{"doc_uuid": doc_uuid, "kode_unit": "FZ.002", "judul_unit": "Mengelola Gudang Bahan Baku", "updated_at": TS}],
+    )
+    total, items = crud.get_units(db, q="gudang bahan", fuzzy=True)
+    assert "FZ.002" in [x["kode_unit"] for x in items]
+    total, items = crud.get_units(db, q="laporan keuangan", fuzzy=True, doc_uuid=doc_uuid)
+    assert total == 0
+
+    unit = db.query(models.Unit).filter_by(doc_uuid=doc_uuid, kode_unit="FZ.002").one()
+    db.query(models.UnitTrigram).filter_by(unit_id=unit.id).delete()
+    db.commit()
+    assert crud.backfill_derived_columns(db) >= 1
+    assert db.query(models.UnitTrigram).filter_by(unit_id=unit.id).count() > 0
+
+
+def test_fuzzy_filter_applies_before_ranking_with_many_candidates(db, seed_catalogue):
+    # 600 kandidat dengan skor lebih tinggi di dokumen lain; yang terfilter ada di luar 500 teratas
+    seed_catalogue(units=[{"judul_unit": "Mengoperasikan Mesin Sangrai"}] * 600)
+    target = seed_catalogue(
+        units=[{"kode_unit": f"FT.{i}", "judul_unit": "Mengoperasikan Mesin Sangrai Kopi"} for i in range(3)]
+    ).doc_uuid
+    total, items, facets = crud.get_units_with_facets(
+        db, q="mengoperasikan mesin sangrai", fuzzy=True, doc_uuid=target, facets=["sektor"]
+    )
+    assert total == 3
+    assert sorted(x["kode_unit"] for x in items) == ["FT.0", "FT.1", "FT.2"]
+
+    total_all, _ = crud.get_units(db, q="mengoperasikan mesin sangrai", fuzzy=True, limit=5)
+    assert total_all >= 603  # total sebenarnya, bukan jumlah kandidat yang terpotong
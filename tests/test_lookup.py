@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core import db as core_db
+from app.db import models
+from app.utils.parsing import make_unit_id
+
+
+def test_lookup_units_by_code_and_xml_id(client: TestClient, seed_catalogue):
+    seed_catalogue(units=[{"kode_unit": "LKP.001"}, {"kode_unit": "LKP.002", "judul_unit": "Unit Dua"}])
+    xml_id = make_unit_id("LKP.002", "Unit Dua", "")
+
+    r = client.post(
+        "/skkni/units/lookup",
+        json={"kode_unit": ["LKP.001", "LKP.404", "LKP.001"], "unit_xml_id": [xml_id, "__export__.nope"]},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert sorted(x["kode_unit"] for x in data["items"]) == ["LKP.001", "LKP.002"]
+    assert data["missing"] == {"kode_unit": ["LKP.404"], "unit_xml_id": ["__export__.nope"]}
+
+
+def test_lookup_units_rejects_oversized_batch(client: TestClient):
+    r = client.post("/skkni/units/lookup", json={"kode_unit": [f"K{i}" for i in range(1001)]})
+    assert r.status_code == 422
+
+
+def test_init_db_adds_and_backfills_unit_xml_id(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE units (id INTEGER PRIMARY KEY, doc_uuid VARCHAR, kode_unit VARCHAR, judul_unit TEXT, nomor_skkni VARCHAR, updated_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO units (doc_uuid, kode_unit, judul_unit, updated_at) VALUES ('d', 'K.1', 'Judul', '2024-01-01 00:00:00')"
+            )
+        )
+    monkeypatch.setattr(core_db, "engine", engine)
+    monkeypatch.setattr(core_db, "SessionLocal", sessionmaker(bind=engine))
+
+    core_db.init_db()
+
+    assert "unit_xml_id" in {c["name"] for c in inspect(engine).get_columns("units")}
+    with core_db.SessionLocal() as s:
+        assert s.get(models.Unit, 1).unit_xml_id == make_unit_id("K.1", "Judul", "")
@@ -0,0 +1,73 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.db import crud, models
+
+
+def _seed(seed_catalogue) -> tuple[str, str]:
+    doc_a, doc_b = str(uuid4()), str(uuid4())
+    seed_catalogue(
+        documents=[
+            {
+                "uuid": doc_a,
+                "nomor_skkni": "Nomor 321 Tahun 2023",
+                "sektor": "MERGE SEKTOR A",
+                "bidang": "MERGE BIDANG A",
+                "unduh_url": f"https://skkni-api.kemnaker.go.id/v1/public/documents/{doc_a}/download",
+            },
+            {"uuid": doc_b, "nomor_skkni": "SKKNI No. 322 Thn 2024", "sektor": "MERGE SEKTOR B", "tahun": "2024"},
+        ],
+        units=[
+            # join via pdf key (doc_uuid)
+            {"doc_uuid": doc_a, "kode_unit": "MRG.001"},
+            # taxonomy milik unit sendiri tetap diprioritaskan
+            {"doc_uuid": doc_a, "kode_unit": "MRG.002", "judul_unit": "Unit Merge Dua", "sektor": "SEKTOR UNIT"},
+            # doc_uuid tidak dikenal → join via nomor key
+            {
+                "doc_uuid": "unknown-doc",
+                "kode_unit": "MRG.003",
+                "judul_unit": "Unit Merge Tiga",
+                "nomor_skkni": "Nomor 322 Tahun 2024",
+            },
+        ],
+    )
+    return doc_a, doc_b
+
+
+def test_join_keys_stored_at_upsert(db, seed_catalogue):
+    doc_a, doc_b = _seed(seed_catalogue)
+    doc = db.get(models.Document, doc_b)
+    unit = db.query(models.Unit).filter_by(kode_unit="MRG.003").one()
+    assert doc.nomor_key == unit.nomor_key == "3222024"
+    assert db.get(models.Document, doc_a).pdf_key == doc_a
+
+
+def test_search_units_include_merged(client: TestClient, seed_catalogue):
+    _seed(seed_catalogue)
+    r = client.get("/skkni/search-units", params={"q": "MRG.", "include_merged": True})
+    assert r.status_code == 200
+    items = {x["kode_unit"]: x for x in r.json()["items"]}
+    assert items["MRG.001"]["sektor"] == "MERGE SEKTOR A"
+    assert items["MRG.001"]["bidang"] == "MERGE BIDANG A"
+    assert items["MRG.002"]["sektor"] == "SEKTOR UNIT"
+    assert items["MRG.003"]["tahun"] == "2024"
+
+    r2 = client.get("/skkni/search-units", params={"q": "MRG.", "include_merged": True, "sektor": "merge sektor"})
+    assert sorted(x["kode_unit"] for x in r2.json()["items"]) == ["MRG.001", "MRG.003"]
+    assert r2.json()["count"] == 2
+
+    r3 = client.get("/skkni/search-units", params={"include_merged": True, "fuzzy": True, "q": "x"})
+    assert r3.status_code == 422
+
+
+def test_units_merged_exact_filters(db, seed_catalogue):
+    _seed(seed_catalogue)
+    total, items = crud.get_units_merged(db, kode_unit="MRG.002")
+    assert total == 1 and items[0]["judul_unit"] == "Unit Merge Dua"
+    # kode_unit sama persis, bukan substring / fuzzy lintas kolom
+    assert crud.get_units_merged(db, kode_unit="MRG.00")[0] == 0
+    assert crud.get_units_merged(db, judul_unit="MRG.001")[0] == 0
+    assert [x["kode_unit"] for x in crud.get_units_merged(db, judul_unit="Unit Merge Tiga")[1]] == ["MRG.003"]
+    # nomor dicocokkan lewat join key, format penulisan bebas
+    assert [x["kode_unit"] for x in crud.get_units_merged(db, nomor_skkni="SKKNI No 322/2024")[1]] == ["MRG.003"]
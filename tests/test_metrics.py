@@ -0,0 +1,53 @@
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.core import metrics
+from app.core.config import settings
+
+
+def _samples(text: str) -> dict:
+    out = {}
+    for fam in text_string_to_metric_families(text):
+        for s in fam.samples:
+            out[(s.name, tuple(sorted(s.labels.items())))] = s.value
+    return out
+
+
+def test_metrics_endpoint_reports_route_latency_and_db(client: TestClient):
+    client.get("/skkni/search-units", params={"limit": 1})
+    client.get("/skkni/does-not-exist")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+
+    samples = _samples(r.text)
+    key = ("skkni_http_requests_total", (("method", "GET"), ("route", "/skkni/search-units"), ("status", "200")))
+    assert samples[key] >= 1
+    assert ("skkni_http_requests_total", (("method", "GET"), ("route", "__unmatched__"), ("status", "404"))) in samples
+    assert any(
+        name == "skkni_db_query_duration_seconds_count" and dict(lbl)["operation"] == "SELECT" for name, lbl in samples
+    )
+    assert samples[("skkni_http_requests_in_flight", ())] == 0
+    # /metrics sendiri tidak diukur
+    assert not any(dict(lbl).get("route") == "/metrics" for _, lbl in samples)
+
+
+def test_worker_metrics_written_to_textfile(tmp_path, monkeypatch):
+    path = tmp_path / "prom" / "skkni_worker.prom"
+    monkeypatch.setattr(settings, "METRICS_TEXTFILE", str(path))
+    monkeypatch.setattr(settings, "PUSHGATEWAY_URL", "")
+
+    m = metrics.WorkerMetrics()
+    with m.upstream_latency.labels(endpoint="detail").time():
+        pass
+    m.documents.inc(3)
+    m.units.inc(30)
+    m.record_cache("read_db", hit=False)
+    m.finish(documents=3, units=30)
+    assert m.publish() == [str(path)]
+
+    samples = _samples(path.read_text())
+    assert samples[("skkni_worker_documents_total", ())] == 3
+    assert samples[("skkni_worker_units_per_second", ())] > 0
+    assert samples[("skkni_worker_upstream_request_duration_seconds_count", (("endpoint", "detail"),))] == 1
+    assert samples[("skkni_worker_cache_requests_total", (("cache", "read_db"), ("result", "miss")))] == 1
@@ -0,0 +1,82 @@
+import httpx
+import pytest
+
+from app.repositories import skkni_repository as repo
+from app.services import skkni_scraper
+from benchmarks import synthetic
+from benchmarks.mock_kemnaker import Faults, MockKemnaker, parse_latency, serve_in_thread
+
+
+@pytest.fixture()
+def mock():
+    return MockKemnaker(docs=25, units_per_doc=4, seed=7)
+
+
+@pytest.fixture()
+def upstream(mock, monkeypatch):
+    with serve_in_thread(mock) as base:
+        monkeypatch.setattr(repo, "BASE", base)
+        monkeypatch.setattr(skkni_scraper, "LIST_URL", f"{base}/dokumen")
+        monkeypatch.setattr(skkni_scraper, "API_DOC_URL", base + "/v1/public/documents/{uuid}")
+        repo.close_client()
+        repo.breaker.reset()
+        yield base
+        repo.close_client()
+        repo.breaker.reset()
+
+
+def _set_faults(base, **faults):
+    r = httpx.put(f"{base}/__mock__/faults", json=faults)
+    assert r.status_code == 200, r.text
+
+
+def test_repository_fetchers_read_catalogue(upstream, mock):
+    doc, n = next(synthetic.catalogue_documents(25, 4, seed=7))
+    raw = repo.fetch_document_detail(doc["uuid"])
+    assert repo.normalize_document(raw)["judul_skkni"] == doc["judul_skkni"]
+
+    units = repo.fetch_units_for_document(doc["uuid"])
+    expected = synthetic.document_units(doc, n, seed=7)
+    assert [u["kode_unit"] for u in units] == [u["kode_unit"] for u in expected]
+
+
+def test_scraper_listing_and_enrich(upstream, mock):
+    docs = skkni_scraper.scrape_document_listing(1, 3, 10)
+    assert [d["uuid"] for d in docs] == [d["uuid"] for d in mock.documents]
+
+    enriched, units = skkni_scraper.enrich_documents_from_api(docs[:3])
+    first = mock.documents[0]
+    assert (enriched[0]["sektor"], enriched[0]["bidang"]) == (first["sektor"], first["bidang"])
+    assert len(units) == sum(mock.unit_counts[d["uuid"]] for d in mock.documents[:3])
+
+
+def test_injected_faults(upstream, mock):
+    uuid = mock.documents[0]["uuid"]
+
+    _set_faults(upstream, rate_html=1.0)
+    with pytest.raises(ValueError, match="Non-JSON"):
+        repo.fetch_document_detail(uuid)
+
+    _set_faults(upstream, rate_html=0.0, rate_429=1.0, retry_after=3)
+    r = httpx.get(f"{upstream}/v1/public/documents/{uuid}")
+    assert r.status_code == 429 and r.headers["retry-after"] == "3"
+
+    _set_faults(upstream, rate_429=0.0, rate_5xx=1.0)
+    with pytest.raises(httpx.HTTPStatusError):
+        repo.fetch_units_for_document(uuid)
+    assert repo.breaker.snapshot()["failure_rate"] > 0
+
+    _set_faults(upstream, rate_5xx=0.0, rate_timeout=1.0, timeout_seconds=0.05)
+    assert httpx.get(f"{upstream}/v1/public/documents/{uuid}/units").status_code == 504
+
+    stats = httpx.get(f"{upstream}/__mock__/stats").json()
+    outcomes = {(i["route"], i["outcome"]) for i in stats["items"]}
+    assert {("detail", "html"), ("detail", "429"), ("units", "5xx"), ("units", "timeout")} <= outcomes
+
+
+def test_fault_config_validation(upstream):
+    assert httpx.put(f"{upstream}/__mock__/faults", json={"rate_5xx": 2}).status_code == 422
+    assert httpx.put(f"{upstream}/__mock__/faults", json={"latency": "gamma:1"}).status_code == 422
+    assert httpx.put(f"{upstream}/__mock__/faults", json={"nope": 1}).status_code == 422
+    assert parse_latency("lognormal:80,0.5") == ("lognormal", (80.0, 0.5))
+    assert Faults(latency="uniform:1,2").validate().latency == "uniform:1,2"
@@ -0,0 +1,93 @@
+import random
+import re
+
+import pytest
+
+from app.utils import parsing
+
+# --- Implementasi lama (referensi beku): versi baru wajib menghasilkan output identik ---
+
+
+def _legacy_norm(s):
+    return re.sub(r"\s+", " ", (s or "").strip())
+
+
+def _legacy_slug(s):
+    return re.sub(r"[^a-z0-9]+", "_", (s or "").lower()).strip("_")
+
+
+def _legacy_join_key_nomor(nomor):
+    s = (nomor or "").lower()
+    for w in parsing.STOPWORDS_NOMOR:
+        s = s.replace(w, "")
+    return re.sub(r"[^\w]+", "", s)
+
+
+def _legacy_join_key_judul(judul):
+    s = (judul or "").lower()
+    for p in parsing.PHRASES_JUDUL:
+        s = s.replace(p, "")
+    return re.sub(r"[^\w]+", "", s)
+
+
+def _legacy_strip_status_tokens(s):
+    t = s or ""
+    for tok in parsing.STATUS_TOKENS:
+        t = t.replace(f" {tok}", "").replace(f"-{tok}", "")
+        t = re.sub(rf"\b{tok}\b", "", t, flags=re.IGNORECASE)
+    return _legacy_norm(t)
+
+
+CASES = [
+    (parsing.norm, parsing.norm_batch, _legacy_norm),
+    (parsing.slug, parsing.slug_batch, _legacy_slug),
+    (parsing.build_join_key_nomor, parsing.build_join_key_nomor_batch, _legacy_join_key_nomor),
+    (parsing.build_join_key_judul, parsing.build_join_key_judul_batch, _legacy_join_key_judul),
+    (parsing.strip_status_tokens, parsing.strip_status_tokens_batch, _legacy_strip_status_tokens),
+]
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .-_/\n\t ΣςİıK\x00"
+_FRAGMENTS = (
+    *parsing.STOPWORDS_NOMOR,
+    *parsing.PHRASES_JUDUL,
+    *parsing.STATUS_TOKENS,
+    "Berlaku",
+    " TIDAK BERLAKU",
+    "-DIUBAH",
+    "Nomor 12 Tahun 2020",
+    "nnomoror",
+    "nnoo.",
+)
+
+
+def _fuzz_strings(n, seed=20240101):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        parts = [
+            rnd.choice(_FRAGMENTS) if rnd.random() < 0.5 else "".join(rnd.choices(_ALPHABET, k=rnd.randint(0, 6)))
+            for _ in range(rnd.randint(0, 8))
+        ]
+        out.append(("" if rnd.random() < 0.5 else " ").join(parts))
+    return out + ["", None]
+
+
+FUZZ = _fuzz_strings(20_000)
+
+
+@pytest.mark.parametrize("single,batch,legacy", CASES, ids=lambda f: getattr(f, "__name__", ""))
+def test_normalizers_match_legacy_outputs(single, batch, legacy):
+    expected = [legacy(x) for x in FUZZ]
+    assert [single(x) for x in FUZZ] == expected
+    assert batch(FUZZ) == expected
+    # tanpa item ber-separator → jalur gabungan satu-blob
+    clean = [x for x in FUZZ if x and "\x00" not in x]
+    assert batch(clean) == [legacy(x) for x in clean]
+    assert batch([]) == []
+
+
+def test_known_examples():
+    assert parsing.build_join_key_nomor("SKKNI Nomor 257 Tahun 2025") == "2572025"
+    assert parsing.build_join_key_judul("SKKNI Industri Bahan Bangunan") == "industribahanbangunan"
+    assert parsing.strip_status_tokens("Menentukan Target Pasar BERLAKU") == "Menentukan Target Pasar"
+    assert parsing.norm("ABC \n DEF ") == "ABC DEF"
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.db import read_replica
+from app.db import crud
+from app.services import read_db
+
+DOC_UUID = "11111111-2222-3333-4444-000000000050"
+
+
+@pytest.fixture()
+def read_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "READ_DB_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "READ_DB_CHECK_SECONDS", 0.0)
+    read_replica.reset()
+    yield tmp_path
+    read_replica.reset()
+
+
+def _add_doc(db, uuid: str, sektor: str):
+    crud.upsert_documents(
+        db, [{"uuid": uuid, "judul_skkni": f"SKKNI {sektor}", "sektor": sektor, "updated_at": datetime(2024, 1, 1)}]
+    )
+
+
+def test_build_read_db_publishes_and_prunes(db, read_dir):
+    _add_doc(db, DOC_UUID, "SEKTOR READ A")
+    crud.bump_sync_generation(db)
+
+    manifest, built = read_db.build_read_db(keep=2)
+    assert built
+    assert manifest["generation"] == crud.get_sync_generation(db)
+    assert (read_dir / manifest["file"]).exists()
+    assert read_db.build_read_db()[1] is False  # generasi sama -> tidak dibangun ulang
+
+    for _ in range(2):
+        crud.bump_sync_generation(db)
+        read_db.build_read_db(keep=2)
+    assert len(list(read_dir.glob(f"{read_db.FILE_PREFIX}*.db"))) == 2
+
+
+def test_api_switches_to_new_generation(client: TestClient, db, read_dir):
+    _add_doc(db, DOC_UUID, "SEKTOR READ A")
+    crud.bump_sync_generation(db)
+    first, _ = read_db.build_read_db()
+
+    def sectors() -> set[str]:
+        return {s["name"] for s in client.get("/skkni/sectors").json()["items"]}
+
+    assert "SEKTOR READ A" in sectors()
+    assert client.get("/healthz/read-db").json()["generation"] == first["generation"]
+
+    # tulisan ke DB utama belum terlihat sampai generasi berikutnya diterbitkan
+    _add_doc(db, DOC_UUID.replace("0050", "0051"), "SEKTOR READ B")
+    assert "SEKTOR READ B" not in sectors()
+
+    crud.bump_sync_generation(db)
+    second, _ = read_db.build_read_db()
+    assert "SEKTOR READ B" in sectors()
+    assert read_replica.generation == second["generation"] == first["generation"] + 1
+
+
+def test_read_replica_records_engine_cache(db, read_dir):
+    def count(result: str) -> float:
+        return REGISTRY.get_sample_value("skkni_cache_requests_total", {"cache": "read_replica", "result": result}) or 0
+
+    read_db.build_read_db(force=True)
+    hits, misses = count("hit"), count("miss")
+    for _ in range(3):
+        read_replica.session().close()
+    assert (count("hit") - hits, count("miss") - misses) == (2, 1)
+
+
+def test_read_session_is_read_only(db, read_dir):
+    read_db.build_read_db(force=True)
+    session = read_replica.session()
+    assert session is not None
+    with session, pytest.raises(OperationalError):
+        session.execute(text("DELETE FROM documents"))
@@ -0,0 +1,162 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+from app.repositories import skkni_repository as repo
+
+UNITS = {"data": [{"code": "J.620100.001.01", "title": "Menganalisis Tools"}, {"code": "", "title": ""}]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):  # noqa: N802
+        body = json.dumps(UNITS if self.path.split("?")[0].endswith("/units") else {"data": {"uuid": "x"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def upstream(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    monkeypatch.setattr(repo, "BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    repo.close_client()
+    repo.reset_client_stats()
+    yield
+    repo.close_client()
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_client_is_shared_and_reuses_connection(upstream):
+    assert repo.get_client() is repo.get_client()
+    for _ in range(3):
+        units = repo.fetch_units_for_document("doc-1")
+    assert units == [{"doc_uuid": "doc-1", "kode_unit": "J.620100.001.01", "judul_unit": "Menganalisis Tools"}]
+    assert repo.fetch_document_detail("doc-1") == {"uuid": "x"}
+
+    stats = repo.client_stats()
+    assert stats["requests"] == 4
+    assert stats["connections"] == 1
+    assert stats["reused"] == 3
+
+    repo.close_client()
+    assert repo.get_client() is not None
+
+
+def test_async_client_reuses_connection(upstream):
+    async def run():
+        try:
+            for _ in range(3):
+                await repo.afetch_units_for_document("doc-2")
+            return repo.client_stats()
+        finally:
+            await repo.aclose_client()
+
+    stats = asyncio.run(run())
+    assert stats["requests"] == 3
+    assert stats["connections"] == 1
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        [{"code": "A.1", "title": "Satu"}],
+        {"meta": {"rows": 1}, "data": {"rows": [{"kode_unit": "A.1", "judul_unit": "Satu", "extra": [1, {"x": 2}]}]}},
+        {"items": [{"unitCode": "A.1", "nama": "Satu"}, 5, {"code": "", "title": ""}]},
+    ],
+)
+def test_iter_units_payload_matches_full_decode(payload):
+    body = json.dumps(payload).encode()
+    # potong body jadi chunk kecil supaya token terbelah di batas chunk
+    chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+    streamed = repo.normalize_units("d", repo.iter_units_payload(chunks))
+    full = repo.normalize_units(
+        "d", [u for u in repo._extract_list_from_payload(payload, "d", "") if isinstance(u, dict)]
+    )
+    assert streamed == full == [{"doc_uuid": "d", "kode_unit": "A.1", "judul_unit": "Satu"}]
+
+
+def test_fetch_units_streams_large_payload(upstream, monkeypatch):
+    monkeypatch.setattr(repo, "STREAM_MIN_BYTES", 1)
+    seen = []
+    real = repo.iter_units_payload
+
+    def spy(chunks, uuid="", url=""):
+        seen.append(uuid)
+        return real(chunks, uuid, url)
+
+    monkeypatch.setattr(repo, "iter_units_payload", spy)
+    units = repo.fetch_units_for_document("doc-3")
+    assert seen == ["doc-3"]
+    assert [u["kode_unit"] for u in units] == ["J.620100.001.01"]
+
+    async def run():
+        try:
+            return await repo.afetch_units_for_document("doc-3")
+        finally:
+            await repo.aclose_client()
+
+    assert asyncio.run(run()) == units
+
+
+def test_track_fetch_counts_requests_and_bytes(upstream):
+    with repo.track_fetch() as trace:
+        repo.fetch_document_detail("doc-3")
+        repo.fetch_units_for_document("doc-3")
+    assert trace.requests == 2
+    assert trace.bytes == len(json.dumps({"data": {"uuid": "x"}})) + len(json.dumps(UNITS))
+    assert trace.hedges == 0
+    # di luar blok tidak ada yang tercatat
+    repo.fetch_document_detail("doc-3")
+    assert trace.requests == 2
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"items": [], "data": [{"kode_unit": "D.1", "judul_unit": "Data"}]},
+        {"rows": [{"kode_unit": "R.1", "judul_unit": "Rows"}], "result": [{"kode_unit": "S.1", "judul_unit": "Res"}]},
+        {
+            "data": {"rows": [{"kode_unit": "R.1", "judul_unit": "Nested"}]},
+            "items": [{"kode_unit": "I.1", "judul_unit": "I"}],
+        },
+        {
+            "data": {
+                "rows": [{"kode_unit": "R.1", "judul_unit": "R"}],
+                "items": [{"kode_unit": "I.1", "judul_unit": "I"}],
+            }
+        },
+        {"data": "x", "result": [{"kode_unit": "S.1", "judul_unit": "Res"}], "items": 3},
+    ],
+)
+def test_iter_units_payload_follows_key_priority(payload):
+    body = json.dumps(payload).encode()
+    streamed = list(repo.iter_units_payload([body[i : i + 5] for i in range(0, len(body), 5)]))
+    assert streamed == repo._extract_list_from_payload(payload, "d", "")
+
+
+def test_iter_units_payload_streams_top_priority_list_early():
+    body = json.dumps({"data": [{"kode_unit": f"A.{i}"} for i in range(50)], "meta": {}}).encode()
+    chunks = [body[i : i + 16] for i in range(0, len(body), 16)]
+    consumed = []
+
+    def source():
+        for c in chunks:
+            consumed.append(c)
+            yield c
+
+    first = next(repo.iter_units_payload(source()))
+    assert first == {"kode_unit": "A.0"}
+    assert len(consumed) < len(chunks)
@@ -0,0 +1,215 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.repositories import skkni_repository as repo
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, ahedged_call, hedged_call
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_rejects_and_recovers_via_half_open_probe():
+    clock = FakeClock()
+    cb = CircuitBreaker("t", failure_rate=0.5, min_calls=4, window=10, open_seconds=5, clock=clock)
+    for ok in (True, False, False, False):
+        cb.before_call()
+        cb.record_success() if ok else cb.record_failure()
+    assert cb.state == "open"
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()
+
+    clock.now = 6
+    assert cb.state == "half_open"
+    cb.before_call()  # probe lewat
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()  # probe kedua ditolak selama probe pertama berjalan
+    cb.record_failure()
+    assert cb.snapshot()["state"] == "open"
+
+    clock.now = 12
+    cb.before_call()
+    cb.record_success()
+    snap = cb.snapshot()
+    assert snap["state"] == "closed"
+    assert snap["opened"] == 2
+    assert snap["rejected"] == 2
+
+
+def test_latency_percentile():
+    t = LatencyTracker(window=100)
+    assert t.percentile(0.95) is None
+    for i in range(1, 101):
+        t.record(i / 100)
+    assert t.percentile(0.95) == 0.95
+    assert t.percentile(0.5) == 0.5
+
+
+def test_hedged_call_returns_fastest_and_cleans_up_loser():
+    calls = []
+    closed = []
+    released = threading.Event()
+
+    def fn():
+        n = len(calls)
+        calls.append(n)
+        if n == 0:
+            released.wait(1)  # attempt pertama "macet"
+        return f"r{n}"
+
+    def cleanup(r):
+        closed.append(r)
+
+    hedges = []
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        assert hedged_call(fn, 0.02, ex, cleanup=cleanup, on_hedge=lambda: hedges.append(1)) == "r1"
+        released.set()
+    assert hedges == [1]
+    assert closed == ["r0"]
+
+    # cepat -> tanpa hedge
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        assert hedged_call(lambda: "ok", 1.0, ex) == "ok"
+
+
+def test_ahedged_call_cancels_slow_attempt():
+    started = []
+    cancelled = []
+
+    async def fn():
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(1 if n == 0 else 0)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return n
+
+    assert asyncio.run(ahedged_call(fn, 0.02)) == 1
+    assert cancelled == [0]
+
+
+def test_repository_breaker_fails_fast_on_upstream_errors(monkeypatch):
+    hits = []
+
+    def handler(request):
+        hits.append(request.url.path)
+        return httpx.Response(503)
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(repo, "get_client", lambda: client)
+    monkeypatch.setattr(
+        repo, "breaker", CircuitBreaker("test", failure_rate=0.5, min_calls=2, window=10, open_seconds=60)
+    )
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            repo.fetch_document_detail("doc-x")
+    with pytest.raises(CircuitOpenError):
+        repo.fetch_document_detail("doc-x")
+    assert len(hits) == 2
+    assert repo.upstream_state()["breaker"]["state"] == "open"
+
+
+def test_hedge_delay_uses_latency_percentile(monkeypatch):
+    tracker = LatencyTracker()
+    monkeypatch.setattr(repo, "_latency", tracker)
+    monkeypatch.setattr(repo.settings, "HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(repo.settings, "HEDGE_MIN_DELAY", 0.1)
+    assert repo._hedge_delay() is None
+    for s in (0.2, 0.2, 0.2, 0.2, 3.0):
+        tracker.record(s)
+    assert repo._hedge_delay() == 3.0
+    monkeypatch.setattr(repo.settings, "HEDGE_ENABLED", False)
+    assert repo._hedge_delay() is None
+
+
+def test_hedge_gets_own_connection_when_pool_is_busy(monkeypatch):
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if len(hits) == 1:
+                time.sleep(1.5)  # request pertama lambat dan memegang satu-satunya slot primer
+            body = b'{"data": {}}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(repo.settings, "MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(repo.settings, "HTTP2", False)
+    monkeypatch.setattr(repo, "breaker", CircuitBreaker("t"))
+    monkeypatch.setattr(repo, "_hedge_delay", lambda: 0.05)
+    client = httpx.Client(**repo._client_kwargs())
+    monkeypatch.setattr(repo, "get_client", lambda: client)
+    before = repo.client_stats()["hedges"]
+    try:
+        t0 = time.perf_counter()
+        r = repo._send(f"http://127.0.0.1:{server.server_port}/doc")
+        elapsed = time.perf_counter() - t0
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    assert r.status_code == 200
+    assert repo.client_stats()["hedges"] == before + 1
+    assert elapsed < 1.0
+
+
+def test_cancelled_half_open_probe_releases_breaker(monkeypatch):
+    clock = FakeClock()
+    cb = CircuitBreaker("t", min_calls=1, open_seconds=5, clock=clock)
+    cb.before_call()
+    cb.record_failure()
+    clock.now = 6
+    monkeypatch.setattr(repo, "breaker", cb)
+    monkeypatch.setattr(repo, "_hedge_delay", lambda: None)
+
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(repo, "get_async_client", lambda: client)
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(repo._asend("https://x/doc"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert cb.state == "half_open"
+    cb.before_call()  # probe baru boleh lewat, tidak macet dengan retry_in=0
+
+
+def test_stale_half_open_probe_expires_after_cooldown():
+    clock = FakeClock()
+    cb = CircuitBreaker("t", min_calls=1, open_seconds=5, clock=clock)
+    cb.before_call()
+    cb.record_failure()
+    clock.now = 6
+    cb.before_call()  # probe tanpa hasil (hilang)
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()
+    clock.now = 12
+    cb.before_call()
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+
+from app.services import skkni_scraper
+
+PAGE_1 = """
+<html><body>
+  <div class="card"><h3>SKKNI <b>Kopi</b></h3>
+    <a href="/v1/public/documents/aaaa-0001/download">Unduh</a></div>
+  <li><a href="https://cdn.example/v1/public/documents/aaaa-0002/download">Dokumen Dua</a></li>
+  <a href="/tentang">Tentang</a>
+</body></html>
+"""
+PAGE_2 = """
+<html><body>
+  <article><h2></h2><a href="/v1/public/documents/aaaa-0002/download">Duplikat</a></article>
+  <article><a href="/v1/public/documents/aaaa-0003/download"></a></article>
+</body></html>
+"""
+
+
+def test_parse_listing_page_titles_and_urls():
+    items = list(skkni_scraper.parse_listing_page(PAGE_1, "http://list?page=1"))
+    assert [it["uuid"] for it in items] == ["aaaa-0001", "aaaa-0002"]
+    # heading card menang atas teks link (get_text(strip=True) menggabung potongan teks)
+    assert items[0]["judul_skkni"] == "SKKNIKopi"
+    assert items[0]["unduh_url"].endswith("/v1/public/documents/aaaa-0001/download")
+    assert items[0]["unduh_url"].startswith("http")
+    assert items[1]["judul_skkni"] == "Dokumen Dua"
+    assert items[1]["unduh_url"] == "https://cdn.example/v1/public/documents/aaaa-0002/download"
+
+
+def test_parse_listing_page_title_skips_script_style_and_comments():
+    page = """
+    <div class="card"><h3>Judul <!-- c --> SKKNI<script>x=1</script><style>h3{}</style> &amp; Co</h3>
+      <a href="/v1/public/documents/bbbb-0001/download">Unduh</a></div>
+    """
+    items = list(skkni_scraper.parse_listing_page(page, "http://list?page=1"))
+    assert items[0]["judul_skkni"] == "JudulSKKNI& Co"
+
+
+def test_aiter_document_listing_concurrent_ordered_dedupe():
+    pages = {"1": PAGE_1, "2": PAGE_2}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        page = request.url.params["page"]
+        if page == "1":
+            # halaman pertama lebih lambat: urutan hasil tetap mengikuti nomor halaman
+            await asyncio.sleep(0.05)
+        return httpx.Response(200, text=pages[page])
+
+    async def run() -> list[dict]:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [it async for it in skkni_scraper.aiter_document_listing(1, 2, 10, client=client, concurrency=2)]
+
+    items = asyncio.run(run())
+    assert [it["uuid"] for it in items] == ["aaaa-0001", "aaaa-0002", "aaaa-0003"]
+    assert items[1]["listing_url"].endswith("page=1")
+    assert items[2]["judul_skkni"] == "Dokumen aaaa-0003"
+
+
+def test_aiter_enriched_documents_keeps_input_order():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        uuid = request.url.path.rsplit("/", 1)[-1]
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # dokumen awal paling lambat
+        await asyncio.sleep(0.01 * (5 - int(uuid[-1])))
+        in_flight -= 1
+        if uuid == "doc-3":
+            return httpx.Response(404)
+        data = {
+            "title": f"Judul {uuid}",
+            "number": "12",
+            "published_at": "2023-02-01",
+            "core_category": {"name": "Bidang X", "category": {"name": "Sektor Y"}},
+            "units": [{"code": f"U.{uuid}", "title": " Unit A "}],
+        }
+        return httpx.Response(200, json={"data": data})
+
+    docs = [{"uuid": f"doc-{i}", "judul_skkni": f"L{i}", "listing_url": "http://x/dokumen?page=1"} for i in range(5)]
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [r async for r in skkni_scraper.aiter_enriched_documents(docs, client=client, concurrency=2)]
+
+    results = asyncio.run(run())
+    assert [doc["uuid"] for doc, _ in results] == [d["uuid"] for d in docs]
+    assert peak <= 2
+    doc0, units0 = results[0]
+    assert doc0["nomor_skkni"] == "Nomor 12 Tahun 2023"
+    assert (doc0["sektor"], doc0["bidang"]) == ("Sektor Y", "Bidang X")
+    assert units0[0]["judul_unit"] == "Unit A"
+    assert units0[0]["listing_url"] == "http://x/dokumen-unit?page=1"
+    # non-200 -> data minimal tanpa unit
+    assert results[3] == (docs[3] | {"nomor_skkni": None, "tahun": None}, [])
@@ -0,0 +1,98 @@
+import sqlite3
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.core.config import settings
+from app.core.db import engine
+from app.db import crud
+from app.services import snapshot
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture()
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_build_snapshot_parquet_skips_same_generation(db, snapshot_dir, seed_catalogue):
+    import pyarrow.parquet as pq
+
+    seed_catalogue(units=[{}] * 5)
+    crud.bump_sync_generation(db)
+
+    manifest, built = snapshot.build_snapshot(batch_size=2)
+    assert built
+    table = pq.read_table(snapshot_dir / manifest["dir"] / "units.parquet")
+    assert table.num_rows == manifest["files"]["units"]["rows"] >= 5
+    assert table.schema.field("updated_at").type == pa.timestamp("us")
+
+    _, built_again = snapshot.build_snapshot(batch_size=2)
+    assert not built_again
+
+    crud.bump_sync_generation(db)
+    manifest2, built3 = snapshot.build_snapshot(batch_size=2)
+    assert built3
+    assert manifest2["generation"] == manifest["generation"] + 1
+
+
+def test_build_snapshot_reads_one_consistent_version(snapshot_dir, seed_catalogue, monkeypatch):
+    import pyarrow.parquet as pq
+
+    seed_catalogue(units=[{}] * 2)
+    iter_units = crud.iter_units
+    writes = []
+
+    def sync_between_entities(*args, **kwargs):
+        # sync lain commit setelah documents diekspor, sebelum units dibaca
+        con = sqlite3.connect(engine.url.database, timeout=0.1, isolation_level=None)
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute(
+                "INSERT INTO documents (uuid, judul_skkni, updated_at) VALUES ('snp-late', 'Late', '2024-05-02')"
+            )
+            con.execute(
+                "INSERT INTO units (doc_uuid, kode_unit, judul_unit, updated_at) "
+                "VALUES ('snp-late', 'SNP.LATE', 'Late', '2024-05-02')"
+            )
+            con.execute("COMMIT")
+            writes.append("committed")
+        except sqlite3.OperationalError:
+            con.execute("ROLLBACK")
+            writes.append("locked")
+        finally:
+            con.close()
+        return iter_units(*args, **kwargs)
+
+    monkeypatch.setattr(crud, "iter_units", sync_between_entities)
+    manifest, _ = snapshot.build_snapshot(batch_size=2, force=True)
+    out = snapshot_dir / manifest["dir"]
+    doc_uuids = set(pq.read_table(out / "documents.parquet").column("uuid").to_pylist())
+    unit_docs = set(pq.read_table(out / "units.parquet").column("doc_uuid").to_pylist())
+    assert writes
+    assert ("snp-late" in unit_docs) == ("snp-late" in doc_uuids)
+
+
+def test_build_snapshot_arrow_memory_map(snapshot_dir, seed_catalogue):
+    doc_uuid = seed_catalogue(documents=[{}]).doc_uuid
+    manifest, _ = snapshot.build_snapshot(fmt="arrow", compression=None, force=True)
+    path = snapshot_dir / manifest["dir"] / "documents.arrow"
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert doc_uuid in table.column("uuid").to_pylist()
+
+
+def test_snapshot_endpoints(client: TestClient, snapshot_dir, seed_catalogue):
+    assert client.get("/skkni/snapshots/latest").status_code == 404
+
+    seed_catalogue(units=[{}])
+    snapshot.build_snapshot(force=True)
+    r = client.get("/skkni/snapshots/latest")
+    assert r.status_code == 200
+    assert set(r.json()["files"]) == {"documents", "units"}
+
+    f = client.get("/skkni/snapshots/latest/units")
+    assert f.status_code == 200
+    assert f.content[:4] == b"PAR1"
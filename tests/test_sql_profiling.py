@@ -0,0 +1,58 @@
+import logging
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core import db as core_db
+from app.core.config import settings
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = core_db.fingerprint("SELECT *  FROM units WHERE id IN (1, 2, 3) AND kode_unit = 'A.1'")
+    b = core_db.fingerprint("SELECT * FROM units\n WHERE id IN (7, 8) AND kode_unit = 'B.2'")
+    assert a == b == "SELECT * FROM units WHERE id IN (?...) AND kode_unit = ?"
+    assert core_db.fingerprint("INSERT INTO t (a) VALUES (?), (?), (?)") == "INSERT INTO t (a) VALUES (?), ..."
+
+
+def test_request_headers_and_statement_stats(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG_API_KEY", "rahasia")
+    core_db.reset_statement_stats()
+    r = client.get("/skkni/search-units", params={"limit": 1})
+    assert r.status_code == 200
+    assert int(r.headers["x-db-queries"]) >= 1
+    assert float(r.headers["x-db-time"]) >= 0
+
+    headers = {"X-API-Key": "rahasia"}
+    stats = client.get("/debug/sql-stats", params={"sort": "count"}, headers=headers).json()
+    assert stats["count"] >= 1
+    item = stats["items"][0]
+    assert {"fingerprint", "count", "total_ms", "avg_ms", "max_ms"} <= set(item)
+
+    assert client.post("/debug/sql-stats/reset", headers=headers).status_code == 200
+    assert core_db.get_statement_stats() == []
+
+
+def test_debug_endpoints_require_key(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG_API_KEY", "")
+    assert client.get("/debug/sql-stats").status_code == 404
+    monkeypatch.setattr(settings, "DEBUG_API_KEY", "rahasia")
+    assert client.get("/debug/sql-stats").status_code == 401
+    assert client.post("/debug/sql-stats/reset", headers={"X-API-Key": "salah"}).status_code == 401
+
+
+def test_track_queries_counts_only_inside_block():
+    with core_db.SessionLocal() as s:
+        s.execute(text("SELECT 1"))
+        with core_db.track_queries() as acc:
+            s.execute(text("SELECT 2"))
+            s.execute(text("SELECT 3"))
+    assert acc.count == 2
+
+
+def test_slow_query_logged_with_plan(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.0)
+    with caplog.at_level(logging.WARNING, logger="app.sql"), core_db.SessionLocal() as s:
+        s.execute(text("SELECT id FROM units WHERE kode_unit = :k"), {"k": "X.1"})
+    msgs = [r.getMessage() for r in caplog.records if "slow query" in r.getMessage()]
+    assert msgs
+    assert "plan:" in msgs[-1]
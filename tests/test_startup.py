@@ -0,0 +1,71 @@
+"""Anggaran cold start: import app.main + startup + request pertama, di subprocess bersih."""
+
+import json
+import os
+import subprocess
+import sys
+
+# Longgar untuk runner CI yang lambat; perketat lewat env di mesin yang stabil
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5.0"))
+
+# Modul berat yang hanya dibutuhkan worker / scraper / ekspor, bukan jalur serving API
+HEAVY_MODULES = (
+    "playwright",
+    "pyarrow",
+    "openpyxl",
+    "pandas",
+    "bs4",
+    "lxml",
+    "httpx",
+    "app.repositories.skkni_repository",
+    "app.services.skkni_scraper",
+    "app.services.snapshot",
+    "app.utils.playwright_helper",
+)
+
+_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+t_import = time.perf_counter() - t0
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+
+from app.core.db import init_db
+from fastapi.testclient import TestClient
+
+t1 = time.perf_counter()
+migrated = init_db()
+t_init = time.perf_counter() - t1
+with TestClient(app.main.app) as client:
+    t2 = time.perf_counter()
+    status = client.get("/skkni/sectors").status_code
+    t_first = time.perf_counter() - t2
+print(json.dumps({{"import": t_import, "init_db": t_init, "first_request": t_first,
+                   "migrated": migrated, "status": status, "heavy": heavy}}))
+"""
+
+
+def _cold_start(db_url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": db_url, "SQL_PROFILING": "false"}
+    out = subprocess.run(
+        [sys.executable, "-c", _SCRIPT.format(heavy=HEAVY_MODULES)],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_cold_start_within_budget_and_schema_check_cached(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'startup.db'}"
+    first = _cold_start(db_url)
+    assert first["migrated"] is True
+    assert first["heavy"] == []
+
+    second = _cold_start(db_url)
+    assert second["migrated"] is False  # fingerprint skema cocok -> migrasi dilewati
+    assert second["status"] == 200
+    total = second["import"] + second["init_db"] + second["first_request"]
+    assert total < STARTUP_BUDGET_SECONDS, second
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app import worker
+from app.db import crud, models
+
+DOC_UUID = "11111111-2222-3333-4444-000000000041"
+TS = datetime(2024, 3, 1)
+
+
+def _unit(kode, judul, ts=TS):
+    return {"doc_uuid": DOC_UUID, "kode_unit": kode, "judul_unit": judul, "sektor": "DIFF", "updated_at": ts}
+
+
+def _row(db, kode):
+    stmt = select(models.Unit).where(models.Unit.doc_uuid == DOC_UUID, models.Unit.kode_unit == kode)
+    return db.execute(stmt).scalars().one()
+
+
+def test_sync_units_writes_only_deltas_and_tombstones(db):
+    crud.upsert_documents(db, [{"uuid": DOC_UUID, "judul_skkni": "SKKNI Diff", "updated_at": TS}])
+    first = crud.sync_units(db, {DOC_UUID: [_unit("D.1", "Satu"), _unit("D.2", "Dua"), _unit("D.3", "Tiga")]})
+    assert first[0].summary() == {"doc_uuid": DOC_UUID, "added": 3, "changed": 0, "removed": 0, "unchanged": 0}
+
+    later = datetime(2024, 4, 1)
+    incoming = [_unit("D.1", "Satu", later), _unit("D.2", "Dua Baru", later), _unit("D.4", "Empat", later)]
+
+    # dry run: change set tanpa menulis
+    (cs,) = crud.sync_units(db, {DOC_UUID: incoming}, dry_run=True)
+    assert (len(cs.added), len(cs.changed), cs.removed, cs.unchanged) == (1, 1, ["D.3"], 1)
+    db.expire_all()
+    assert _row(db, "D.3").deleted_at is None
+
+    crud.sync_units(db, {DOC_UUID: incoming})
+    db.expire_all()
+    # baris yang tidak berubah tidak ditulis ulang (updated_at lama)
+    assert _row(db, "D.1").updated_at == TS
+    assert _row(db, "D.2").judul_unit == "Dua Baru"
+    assert _row(db, "D.2").updated_at == later
+    assert _row(db, "D.3").deleted_at is not None
+
+    total, items = crud.get_units(db, doc_uuid=DOC_UUID)
+    assert sorted(x["kode_unit"] for x in items) == ["D.1", "D.2", "D.4"]
+    assert crud.lookup_units(db, kode_units=["D.3"])[1] == ["D.3"]
+
+    # unit yang muncul lagi dihidupkan kembali
+    (cs,) = crud.sync_units(db, {DOC_UUID: [*incoming, _unit("D.3", "Tiga", later)]})
+    assert [u["kode_unit"] for u in cs.added] == ["D.3"]
+    db.expire_all()
+    assert _row(db, "D.3").deleted_at is None
+
+
+def test_upsert_units_is_partial_and_skips_unchanged(db):
+    doc = "11111111-2222-3333-4444-000000000042"
+    crud.upsert_documents(db, [{"uuid": doc, "judul_skkni": "SKKNI Parsial", "updated_at": TS}])
+    assert crud.upsert_documents(db, [{"uuid": doc, "judul_skkni": "SKKNI Parsial", "updated_at": TS}]) == 0
+    crud.upsert_units(db, [{"doc_uuid": doc, "kode_unit": "P.1", "judul_unit": "A", "updated_at": TS}])
+    crud.upsert_units(db, [{"doc_uuid": doc, "kode_unit": "P.2", "judul_unit": "B", "updated_at": TS}])
+    assert crud.get_units(db, doc_uuid=doc)[0] == 2
+    assert crud.count_changed_documents(db, [{"uuid": doc, "judul_skkni": "SKKNI Parsial"}]) == (0, 0)
+    assert crud.count_changed_documents(db, [{"uuid": doc, "judul_skkni": "Lain"}, {"uuid": "x"}]) == (1, 1)
+
+
+def test_worker_dry_run_does_not_write(db, monkeypatch, tmp_path, capsys):
+    seed = tmp_path / "seed.txt"
+    seed.write_text("doc-dry-run\n")
+    monkeypatch.setenv("SEED_FILE", str(seed))
+    monkeypatch.setattr(worker, "fetch_document_detail", lambda uuid: {"uuid": uuid, "judul": "Dry Run"})
+    monkeypatch.setattr(
+        worker,
+        "fetch_units_for_document",
+        lambda uuid: [{"doc_uuid": uuid, "kode_unit": "DR.1", "judul_unit": "Unit"}],
+    )
+
+    worker.main(["--dry-run"])
+    out = capsys.readouterr().out
+    assert "DRY RUN dokumen: 1 baru" in out
+    assert "1 baru, 0 berubah, 0 dihapus" in out
+    assert db.get(models.Document, "doc-dry-run") is None
@@ -0,0 +1,53 @@
+from fastapi.testclient import TestClient
+
+from app import worker
+
+GOOD = "11111111-2222-3333-4444-000000000045"
+BAD = "11111111-2222-3333-4444-000000000046"
+
+
+def _fake_detail(uuid):
+    if uuid == BAD:
+        raise TimeoutError("upstream lambat")
+    return {"uuid": uuid, "judul": "SKKNI Ledger", "nomor": "Nomor 45 Tahun 2024"}
+
+
+def _fake_units(uuid):
+    return [{"doc_uuid": uuid, "kode_unit": f"LED.{i}", "judul_unit": f"Unit {i}"} for i in range(3)]
+
+
+def test_worker_records_run_ledger(client: TestClient, tmp_path, monkeypatch):
+    seed = tmp_path / "seed.txt"
+    seed.write_text(f"{GOOD}\n{BAD}\n")
+    monkeypatch.setenv("SEED_FILE", str(seed))
+    monkeypatch.setattr(worker, "fetch_document_detail", _fake_detail)
+    monkeypatch.setattr(worker, "fetch_units_for_document", _fake_units)
+
+    worker.main([])
+
+    r = client.get("/sync/runs/latest", params={"top": 5})
+    assert r.status_code == 200
+    body = r.json()
+    run = body["run"]
+    assert run["status"] == "ok"
+    assert (run["total_uuids"], run["ok_count"], run["error_count"]) == (2, 1, 1)
+    assert run["units_fetched"] == 3
+    assert run["units_upsert_ms"] is not None and run["finished_at"] is not None
+
+    (slow,) = body["slowest"]
+    assert slow["uuid"] == GOOD and slow["unit_count"] == 3 and slow["units_added"] == 3
+    assert slow["total_ms"] >= slow["detail_ms"]
+    (failed,) = body["failed"]
+    assert failed["uuid"] == BAD and failed["error_class"] == "TimeoutError"
+
+    runs = client.get("/sync/runs").json()
+    assert runs["items"][0]["id"] == run["id"]
+    history = client.get(f"/sync/documents/{GOOD}").json()
+    assert history["items"][0]["run_id"] == run["id"]
+    errors = client.get(f"/sync/runs/{run['id']}/items", params={"status": "error"}).json()
+    assert [i["uuid"] for i in errors["items"]] == [BAD]
+
+
+def test_sync_runs_unknown_run(client: TestClient):
+    assert client.get("/sync/runs/999999").status_code == 404
+    assert client.get("/sync/runs/abc").status_code == 422